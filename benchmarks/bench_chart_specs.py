@@ -0,0 +1,160 @@
+"""Benchmark chart spec emission against the chart library builders.
+
+Compares the previous pyecharts / altair builders with the plain dict specs
+emitted for the rolling forecasts charts (one chart per entity) and the
+trend chart.
+
+Usage:
+    python benchmarks/bench_chart_specs.py --n_entities 1000
+
+Requires the same environment variables as the API (e.g. `AWS_DEFAULT_REGION`).
+"""
+
+import argparse
+import time
+import types
+from datetime import date, datetime
+
+import numpy as np
+import polars as pl
+
+from indexhub.api.routers.trends import _create_trend_chart
+from indexhub.api.services import chart_builders
+from indexhub.api.services.chart_specs import dump_spec
+
+TYPES = ["ai", "best_plan", "baseline", "plan"]
+TYPE_TO_COLOR = dict(
+    zip(TYPES, ["#003DFD", "#b512b8", "#11a9ba", "#0a0a0a"], strict=True)
+)
+
+
+def _create_rolling_forecasts_chart_pyecharts(runs, plot_dates):
+    from pyecharts import options as opts
+    from pyecharts.charts import Line
+
+    line_chart = Line(init_opts=opts.InitOpts(bg_color="white"))
+    line_chart.add_xaxis(runs[plot_dates[-1]]["time"])
+    for type, color in TYPE_TO_COLOR.items():
+        for date_ in plot_dates:
+            is_latest = date_ == plot_dates[-1]
+            line_chart.add_yaxis(
+                f"{type} ({date_.strftime('%Y-%m-%d')})",
+                runs[date_][f"residual_{type}"],
+                label_opts=opts.LabelOpts(is_show=False),
+                color=color,
+                linestyle_opts=opts.LineStyleOpts(width=3)
+                if is_latest
+                else opts.LineStyleOpts(width=1, type_="dashed"),
+                is_symbol_show=True,
+                symbol_size=7 if is_latest else 1,
+            )
+    line_chart.set_global_opts(
+        legend_opts=opts.LegendOpts(orient="vertical", pos_right="0%"),
+        yaxis_opts=opts.AxisOpts(name="Residuals", is_scale=True),
+    )
+    return line_chart.dump_options()
+
+
+def _create_trend_chart_altair(chart_data: pl.DataFrame):
+    import altair as alt
+
+    base = alt.Chart(chart_data.to_pandas()).encode(x="time:T")
+    chart = alt.layer(
+        base.mark_line(color="gray").encode(y="actual:Q"),
+        base.mark_line().encode(y="target:Q"),
+        base.mark_area(opacity=0.3).encode(y="10%:Q", y2="90%:Q"),
+    ).properties(height=100, width="container")
+    return chart.to_json()
+
+
+def _make_rolling_forecasts(n_entities: int, n_runs: int = 4, fh: int = 12):
+    rng = np.random.default_rng(0)
+    frames = []
+    for run in range(n_runs):
+        times = [date(2022 + (run + m) // 12, (run + m) % 12 + 1, 1) for m in range(fh)]
+        n = n_entities * fh
+        frames.append(
+            pl.DataFrame(
+                {
+                    "entity": np.repeat([str(i) for i in range(n_entities)], fh),
+                    "time": times * n_entities,
+                    "updated_at": [datetime(2023, run + 1, 1)] * n,
+                    **{f"residual_{type}": rng.random(n).round(3) for type in TYPES},
+                }
+            )
+        )
+    rolling_forecasts = pl.concat(frames).with_columns(
+        pl.col("entity").cast(pl.Categorical)
+    )
+    return rolling_forecasts.sort(["entity", "time", "updated_at"])
+
+
+def main(n_entities: int):
+    pl.toggle_string_cache(True)
+    rolling_forecasts = _make_rolling_forecasts(n_entities)
+    user = types.SimpleNamespace(id="", storage_tag="bench", storage_bucket_name="")
+    chart_builders.get_aws_secret = lambda **kwargs: {}
+    chart_builders.SOURCE_TAG_TO_READER["bench"] = lambda **kwargs: rolling_forecasts
+
+    start = time.perf_counter()
+    charts = chart_builders.create_rolling_forecasts_chart(user=user, objective_id="")
+    elapsed = time.perf_counter() - start
+    size = sum(len(chart) for chart in charts.values() if chart)
+    print(f"spec:      {n_entities} rolling charts in {elapsed:.3f}s ({size} bytes)")
+
+    # Previous implementation: one pyecharts Line per entity
+    start = time.perf_counter()
+    plot_dates = sorted(rolling_forecasts.get_column("updated_at").unique())[-3:]
+    series = (
+        rolling_forecasts.filter(pl.col("updated_at").is_in(plot_dates))
+        .groupby(["entity", "updated_at"], maintain_order=True)
+        .agg([pl.col("time"), *[f"residual_{type}" for type in TYPES]])
+    )
+    entity_to_runs = {}
+    for row in series.iter_rows(named=True):
+        entity_to_runs.setdefault(row["entity"], {})[row["updated_at"]] = row
+    size_pyecharts = 0
+    for runs in entity_to_runs.values():
+        chart = _create_rolling_forecasts_chart_pyecharts(runs, plot_dates)
+        size_pyecharts += len(chart)
+    elapsed_pyecharts = time.perf_counter() - start
+    print(
+        f"pyecharts: {n_entities} rolling charts in {elapsed_pyecharts:.3f}s"
+        f" ({size_pyecharts} bytes)"
+    )
+    print(f"speedup:   {elapsed_pyecharts / elapsed:.1f}x")
+
+    # Trend chart of the last 24 periods of one entity
+    trend_data = pl.DataFrame(
+        {
+            "time": pl.date_range(
+                date(2021, 1, 1), date(2022, 12, 1), "1mo", eager=True
+            ),
+            "actual": np.arange(24, dtype=float),
+            "target": np.arange(24, dtype=float) + 0.5,
+            "10%": np.arange(24, dtype=float) - 1,
+            "90%": np.arange(24, dtype=float) + 1,
+        }
+    )
+    n_charts = 100
+    start = time.perf_counter()
+    for _ in range(n_charts):
+        dump_spec(_create_trend_chart(trend_data))
+    elapsed = time.perf_counter() - start
+    print(f"spec:      {n_charts} trend charts in {elapsed:.3f}s")
+    try:
+        start = time.perf_counter()
+        for _ in range(n_charts):
+            _create_trend_chart_altair(trend_data)
+        elapsed_altair = time.perf_counter() - start
+        print(f"altair:    {n_charts} trend charts in {elapsed_altair:.3f}s")
+        print(f"speedup:   {elapsed_altair / elapsed:.1f}x")
+    except ImportError:
+        print("altair:    not installed, skipped")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n_entities", type=int, default=1000)
+    args = parser.parse_args()
+    main(n_entities=args.n_entities)
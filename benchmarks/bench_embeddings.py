@@ -0,0 +1,81 @@
+"""Benchmark the in-process time series embeddings of preprocessed panels.
+
+Embeds a synthetic panel of seasonal, trending, flat and intermittent series
+with `_create_embs` (as `run_preprocess` does) and reports the time taken
+and the share of nearest neighbours from the same family of series.
+
+Usage:
+    python benchmarks/bench_embeddings.py --n_entities 100000 --n_periods 104
+
+Requires the same environment variables as the API (e.g. `AWS_DEFAULT_REGION`).
+"""
+
+import argparse
+import time
+from datetime import date, timedelta
+
+import numpy as np
+import polars as pl
+
+from indexhub.api.services.embeddings import _create_embs
+from indexhub.api.services.vectors import _create_similarity_index
+
+N_FAMILIES = 4
+
+
+def _make_panel(n_entities: int, n_periods: int):
+    rng = np.random.default_rng(0)
+    t = np.arange(n_periods)
+    families = np.arange(n_entities) % N_FAMILIES
+    patterns = np.stack(
+        [
+            np.sin(2 * np.pi * t / 52),
+            t / n_periods,
+            np.zeros(n_periods),
+            np.zeros(n_periods),
+        ]
+    )
+    scale = rng.lognormal(3, 1, size=(n_entities, 1))
+    noise = 0.05 * rng.standard_normal((n_entities, n_periods))
+    y = scale * (1 + 0.5 * patterns[families] + noise)
+    # Intermittent demand
+    y[families == 3] *= rng.random(((families == 3).sum(), n_periods)) < 0.3
+    times = [date(2020, 1, 6) + timedelta(weeks=int(i)) for i in t]
+    panel = pl.DataFrame(
+        {
+            "entity": np.repeat([str(i) for i in range(n_entities)], n_periods),
+            "time": times * n_entities,
+            "target": y.ravel(),
+        }
+    ).with_columns(pl.col("entity").cast(pl.Categorical))
+    return panel, families
+
+
+def main(n_entities: int, n_periods: int, n_queries: int = 200):
+    pl.toggle_string_cache(True)
+    panel, families = _make_panel(n_entities, n_periods)
+
+    start = time.perf_counter()
+    embs = _create_embs(panel)
+    elapsed = time.perf_counter() - start
+    print(f"embed:   {n_entities} x {n_periods} series in {elapsed:.3f}s")
+
+    index = _create_similarity_index(embs, "entity", uri=None)
+    start = time.perf_counter()
+    matches = []
+    for entity_id in range(0, n_entities, max(n_entities // n_queries, 1)):
+        similar = index.search(str(entity_id), k=10)
+        matches.extend(
+            families[int(row["entity_id"])] == families[entity_id] for row in similar
+        )
+    elapsed = time.perf_counter() - start
+    print(f"search:  {len(matches) // 10} queries in {elapsed:.3f}s")
+    print(f"purity:  {np.mean(matches):.3f} of neighbours in the same family")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n_entities", type=int, default=100000)
+    parser.add_argument("--n_periods", type=int, default=104)
+    args = parser.parse_args()
+    main(n_entities=args.n_entities, n_periods=args.n_periods)
@@ -0,0 +1,68 @@
+"""Benchmark JSON encoding of the table and chart endpoint responses.
+
+Compares the previous `JSONResponse(jsonable_encoder(...))` path, where chart
+options were encoded a second time as JSON strings, with `encode_json` and
+`encode_chart_json` used by `cached_response`.
+
+Usage:
+    python benchmarks/bench_json.py --n_entities 2000 --fh 12 --repeat 5
+
+Requires the same environment variables as the API (e.g. `AWS_DEFAULT_REGION`).
+"""
+
+import argparse
+import time
+
+from bench_responses import _make_rolling_charts, _make_table_view
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from indexhub.api.services.serialization import encode_chart_json, encode_json
+
+
+def _bench(name: str, encoders, repeat: int):
+    for encoder_name, encode in encoders.items():
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            body = encode()
+            times.append(time.perf_counter() - start)
+        print(
+            f"{name} {encoder_name}: {len(body) / 1e6:.2f}MB, "
+            f"encode {min(times):.3f}s (best of {repeat})"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n_entities", type=int, default=2000)
+    parser.add_argument("--fh", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    table_view = _make_table_view(args.n_entities, args.fh)
+    _bench(
+        "table_view",
+        {
+            "jsonable_encoder": lambda: JSONResponse(
+                content=jsonable_encoder(table_view)
+            ).body,
+            "orjson": lambda: encode_json(table_view),
+        },
+        args.repeat,
+    )
+    charts = _make_rolling_charts(args.n_entities, args.fh)
+    _bench(
+        "rolling_forecast",
+        {
+            "jsonable_encoder": lambda: JSONResponse(
+                content=jsonable_encoder(charts)
+            ).body,
+            "embedded": lambda: encode_chart_json(charts),
+        },
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
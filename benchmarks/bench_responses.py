@@ -0,0 +1,96 @@
+"""Benchmark payload size and serialisation time of large API responses.
+
+Builds a table view response (`_get_forecast_table_view` rows) and a rolling
+forecasts chart response (one ECharts option JSON per entity), then reports
+the JSON encoding time and the identity, gzip and brotli payload sizes served
+by `cached_response`.
+
+Usage:
+    python benchmarks/bench_responses.py --n_entities 2000 --fh 12
+
+Requires the same environment variables as the API (e.g. `AWS_DEFAULT_REGION`).
+"""
+
+import argparse
+import json
+import time
+from datetime import date
+
+import numpy as np
+import polars as pl
+
+from indexhub.api.services.response_cache import ENCODING_TO_COMPRESSOR, brotli
+from indexhub.api.services.serialization import encode_chart_json, encode_json
+
+
+def _make_table_view(n_entities: int, fh: int):
+    rng = np.random.default_rng(0)
+    n = n_entities * fh
+    rows = pl.DataFrame(
+        {
+            "state": np.repeat([f"State {i % 50}" for i in range(n_entities)], fh),
+            "product": np.repeat([f"Product {i}" for i in range(n_entities)], fh),
+            "time": pl.date_range(date(2023, 1, 1), date(2033, 1, 1), "1mo", eager=True)
+            .head(fh)
+            .to_list()
+            * n_entities,
+            "fh": np.tile(np.arange(1, fh + 1), n_entities),
+            "baseline": rng.random(n) * 100,
+            "forecast": rng.random(n) * 100,
+            "forecast_10": rng.random(n) * 100,
+            "forecast_90": rng.random(n) * 100,
+            "plan": rng.random(n) * 100,
+            "use": rng.choice(["AI", "Baseline"], n),
+        }
+    ).with_columns(pl.col(pl.Float64).round(2))
+    return {"rows": rows.with_row_count("id").to_dicts(), "group_by": ["state"]}
+
+
+def _make_rolling_charts(n_entities: int, fh: int):
+    rng = np.random.default_rng(0)
+    charts = {}
+    for i in range(n_entities):
+        option = {
+            "xAxis": {"data": [f"2023-{m:02d}-01" for m in range(1, fh + 1)]},
+            "series": [
+                {"name": name, "type": "line", "data": rng.random(fh).round(2).tolist()}
+                for name in ("ai", "best_plan", "plan", "actual")
+            ],
+        }
+        charts[f"Product {i}"] = json.dumps(option)
+    return charts
+
+
+def _bench(name: str, content, encode=encode_json):
+    start = time.perf_counter()
+    body = encode(content)
+    encode_time = time.perf_counter() - start
+    print(f"{name}: identity {len(body) / 1e6:.2f}MB, encode {encode_time:.3f}s")
+    for encoding, compress in ENCODING_TO_COMPRESSOR.items():
+        if encoding == "br" and brotli is None:
+            continue
+        start = time.perf_counter()
+        compressed = compress(body)
+        compress_time = time.perf_counter() - start
+        print(
+            f"  {encoding}: {len(compressed) / 1e6:.2f}MB "
+            f"({len(compressed) / len(body):.1%}), compress {compress_time:.3f}s"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n_entities", type=int, default=2000)
+    parser.add_argument("--fh", type=int, default=12)
+    args = parser.parse_args()
+
+    _bench("table_view", _make_table_view(args.n_entities, args.fh))
+    _bench(
+        "rolling_forecast",
+        _make_rolling_charts(args.n_entities, args.fh),
+        encode=encode_chart_json,
+    )
+
+
+if __name__ == "__main__":
+    main()
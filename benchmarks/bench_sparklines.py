@@ -0,0 +1,107 @@
+"""Benchmark sparkline generation for the objective table.
+
+Compares the previous per-entity pyecharts `Line` builder with the columnar
+`_create_sparklines` builder used by `/tables`.
+
+Usage:
+    python benchmarks/bench_sparklines.py --n_entities 10000
+
+Requires the same environment variables as the API (e.g. `AWS_DEFAULT_REGION`).
+"""
+
+import argparse
+import time
+from datetime import date
+
+import numpy as np
+import polars as pl
+
+from indexhub.api.routers.tables import _create_sparklines
+
+
+def _create_sparkline_pyecharts(y_data):
+    from pyecharts import options as opts
+    from pyecharts.charts import Line
+
+    color = "#44aa7e" if y_data[0] <= y_data[-1] else "#9e2b2b"
+    sparkline = Line()
+    sparkline.add_xaxis(list(range(len(y_data))))
+    sparkline.add_yaxis(
+        "",
+        y_data,
+        is_symbol_show=False,
+        linestyle_opts=opts.LineStyleOpts(width=3),
+        color=color,
+    )
+    markpoint_data = [
+        {"coord": [0, y_data[0]], "value": y_data[0]},
+        {"coord": [len(y_data) - 1, y_data[-1]], "value": y_data[-1]},
+    ]
+    sparkline.set_series_opts(
+        markpoint_opts=opts.MarkPointOpts(
+            data=markpoint_data,
+            symbol="circle",
+            symbol_size=7,
+            label_opts=opts.LabelOpts(position="outside", font_size=12),
+        ),
+    )
+    sparkline.set_global_opts(
+        legend_opts=opts.LegendOpts(is_show=False),
+        xaxis_opts=opts.AxisOpts(is_show=False),
+        yaxis_opts=opts.AxisOpts(is_show=False),
+        tooltip_opts=opts.TooltipOpts(is_show=False),
+    )
+    return sparkline.dump_options()
+
+
+def _make_panel(n_entities: int, n_periods: int, start: date) -> pl.DataFrame:
+    entities = pl.DataFrame({"entity": [str(i) for i in range(n_entities)]})
+    times = pl.date_range(
+        start, date(start.year + n_periods // 12 + 1, 1, 1), "1mo", eager=True
+    )[:n_periods]
+    panel = (
+        entities.join(times.to_frame("time"), how="cross")
+        .with_columns(
+            pl.col("entity").cast(pl.Categorical),
+            pl.Series(
+                "target", np.random.default_rng(0).random(n_entities * n_periods) * 100
+            ),
+        )
+        .sort(["entity", "time"])
+    )
+    return panel
+
+
+def main(n_entities: int):
+    pl.toggle_string_cache(True)
+    artifacts = {
+        "y": _make_panel(n_entities, n_periods=36, start=date(2020, 1, 1)),
+        "forecasts": _make_panel(n_entities, n_periods=6, start=date(2023, 1, 1)),
+    }
+    outputs = {"y": "y", "forecasts": {"best_models": "forecasts"}}
+
+    def read(object_path: str):
+        return artifacts[object_path]
+
+    start = time.perf_counter()
+    sparklines = _create_sparklines(read=read, outputs=outputs)
+    elapsed = time.perf_counter() - start
+    print(f"columnar:  {n_entities} sparklines in {elapsed:.3f}s")
+
+    # Previous implementation: one pyecharts Line per entity
+    start = time.perf_counter()
+    groupby = pl.concat(
+        [artifacts["y"].groupby("entity").tail(12), artifacts["forecasts"]]
+    ).groupby("entity")
+    for _, df in groupby:
+        _create_sparkline_pyecharts(df.get_column("target").round(1).to_list())
+    elapsed_pyecharts = time.perf_counter() - start
+    print(f"pyecharts: {n_entities} sparklines in {elapsed_pyecharts:.3f}s")
+    print(f"speedup:   {elapsed_pyecharts / elapsed:.1f}x ({len(sparklines)} rows)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n_entities", type=int, default=10000)
+    args = parser.parse_args()
+    main(n_entities=args.n_entities)
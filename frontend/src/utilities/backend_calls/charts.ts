@@ -17,7 +17,7 @@ export const getTrendChart = async (
   });
 
   const response_json = await get_trend_chart_response.json();
-  return JSON.parse(response_json);
+  return response_json;
 };
 
 export const getSegmentationChart = async (
@@ -42,7 +42,7 @@ export const getSegmentationChart = async (
   );
 
   const response_json = await get_segmentation_chart_response.json();
-  return JSON.parse(response_json);
+  return response_json;
 };
 
 export const getRollingForecastChart = async (
@@ -66,6 +66,28 @@ export const getRollingForecastChart = async (
   return response_json;
 };
 
+export const getRollingForecastEntityCharts = async (
+  objective_id: string,
+  entities: string[],
+  access_token_indexhub_api: string
+) => {
+  const get_rolling_forecast_entity_charts_url = `${process.env.REACT_APP__FASTAPI__DOMAIN}/charts/${objective_id}/rolling_forecast/entities`;
+  const get_rolling_forecast_entity_charts_response = await fetch(
+    get_rolling_forecast_entity_charts_url,
+    {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+        Authorization: `Bearer ${access_token_indexhub_api}`,
+      },
+      body: JSON.stringify({ entities: entities }),
+    }
+  );
+
+  const response_json = await get_rolling_forecast_entity_charts_response.json();
+  return response_json;
+};
+
 export const getCombinedEntitiesAndInventoryChart = async (
   objective_id: string,
   entities: Record<string, string[] | string | null>,
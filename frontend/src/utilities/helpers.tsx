@@ -5,3 +5,20 @@ export function capitalizeFirstLetter(string: string) {
 export function roundToTwoDecimalPlaces(value: number) {
   return Math.round((value + Number.EPSILON) * 100) / 100;
 }
+
+export function mergeChangedRows<T extends { id: any }>(
+  rows: T[] | null,
+  changed: T[],
+  deleted: T["id"][]
+) {
+  // Replace changed rows in place, drop deleted rows and append new rows
+  const merged = (rows || [])
+    .filter((row) => !deleted.includes(row.id))
+    .map((row) => changed.find((changedRow) => changedRow.id === row.id) || row);
+  return [
+    ...merged,
+    ...changed.filter(
+      (changedRow) => !merged.some((row) => row.id === changedRow.id)
+    ),
+  ];
+}
@@ -37,7 +37,7 @@ import { getAIRecommendationTable } from "../../../utilities/backend_calls/table
 import { getForecastObjectiveStats } from "../../../utilities/backend_calls/stats";
 import { colors } from "../../../theme/theme";
 import {
-  getRollingForecastChart,
+  getRollingForecastEntityCharts,
   getSegmentationChart,
   getTrendChart,
 } from "../../../utilities/backend_calls/charts";
@@ -154,13 +154,21 @@ const ForecastObjective = () => {
     }
   };
 
-  const getRollingForecastChartApi = async () => {
-    if (objective_id) {
-      const rollingForecastChart = await getRollingForecastChart(
+  const getRollingForecastChartApi = async (entities: string[]) => {
+    // Only load the charts of entities not loaded yet
+    const missing_entities = entities.filter(
+      (entity) => !rollingForecastChart || !(entity in rollingForecastChart)
+    );
+    if (objective_id && missing_entities.length > 0) {
+      const rollingForecastEntityCharts = await getRollingForecastEntityCharts(
         objective_id,
+        missing_entities,
         access_token_indexhub_api
       );
-      setRollingForecastChart(rollingForecastChart);
+      setRollingForecastChart((rollingForecastChart) => ({
+        ...rollingForecastChart,
+        ...rollingForecastEntityCharts,
+      }));
     }
   };
 
@@ -273,7 +281,6 @@ const ForecastObjective = () => {
               setPanelSourceDataFields(response["panel_source_data_fields"]);
               getMainTrendChartApi();
               getForecastObjectiveStatsApi();
-              getRollingForecastChartApi();
               getAIRecommendationTableApi(1);
             } else {
               setError(response["detail"]);
@@ -329,6 +336,17 @@ const ForecastObjective = () => {
     }
   }, [expandedEntityIndex, AIRecommendationTable]);
 
+  useEffect(() => {
+    if (AIRecommendationTable) {
+      // Load rolling forecast charts for the entities on the current page
+      getRollingForecastChartApi(
+        AIRecommendationTable["results"].map(
+          (entity_data: any) => entity_data["entity"]
+        )
+      );
+    }
+  }, [AIRecommendationTable]);
+
   if (!error) {
     if (objective && panelSourceDataFields) {
       return (
@@ -1206,13 +1224,11 @@ const ForecastObjective = () => {
                                                   onClick={() => {
                                                     setExpandedChartJSONspec(
                                                       rollingForecastChart
-                                                        ? JSON.parse(
-                                                            rollingForecastChart[
-                                                              entity_data[
-                                                                "entity"
-                                                              ]
+                                                        ? rollingForecastChart[
+                                                            entity_data[
+                                                              "entity"
                                                             ]
-                                                          )
+                                                          ]
                                                         : null
                                                     );
                                                     setExpandedChartModalHeader(
@@ -1237,11 +1253,11 @@ const ForecastObjective = () => {
                                                   entity_data["entity"]
                                                 ] ? (
                                                   <ReactEcharts
-                                                    option={JSON.parse(
+                                                    option={
                                                       rollingForecastChart[
                                                         entity_data["entity"]
                                                       ]
-                                                    )}
+                                                    }
                                                     style={{
                                                       height: "100%",
                                                       width: "100%",
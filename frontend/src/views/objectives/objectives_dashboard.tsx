@@ -26,7 +26,10 @@ import { ReadyState } from "react-use-websocket";
 import { useWebSocket } from "react-use-websocket/dist/lib/use-websocket";
 import { AppState } from "../..";
 import { colors } from "../../theme/theme";
-import { capitalizeFirstLetter } from "../../utilities/helpers";
+import {
+  capitalizeFirstLetter,
+  mergeChangedRows,
+} from "../../utilities/helpers";
 import Toast from "../../components/toast";
 import NewObjective from "./new_objective";
 
@@ -66,24 +69,21 @@ const ObjectivesDashboard = () => {
 
   useEffect(() => {
     if (lastMessage?.data) {
-      const objectives: Record<"objectives", Objective[]> = JSON.parse(
-        lastMessage.data
-      );
-      objectives["objectives"].map((objective: Objective) => {
+      const message: Record<string, any> = JSON.parse(lastMessage.data);
+      const parseObjective = (objective: Objective) => {
         objective["fields"] = JSON.parse(objective["fields"]);
         objective["sources"] = JSON.parse(objective["sources"]);
-      });
-      setObjectives(objectives["objectives"]);
+        return objective;
+      };
 
-      if (Object.keys(JSON.parse(lastMessage.data)).includes("objectives")) {
-        const statuses: string[] = [];
-        const objectives: Objective[] = JSON.parse(lastMessage.data).objectives;
-        objectives.forEach((objective) => {
-          statuses.push(objective["status"]);
-        });
-        if (statuses.includes("RUNNING")) {
-          setTimeout(getObjectivesByUserId, 5000);
-        }
+      if (message["objectives"]) {
+        setObjectives(message["objectives"].map(parseObjective));
+      } else {
+        // Only changed objectives are pushed after the initial list
+        const changed: Objective[] = message["changed"].map(parseObjective);
+        setObjectives((objectives) =>
+          mergeChangedRows(objectives, changed, message["deleted"])
+        );
       }
     }
   }, [lastMessage]);
@@ -25,6 +25,7 @@ import {
 import { useSelector } from "react-redux";
 import useWebSocket, { ReadyState } from "react-use-websocket";
 import { AppState } from "../../index";
+import { mergeChangedRows } from "../../utilities/helpers";
 import { Card } from "@chakra-ui/card";
 import { FontAwesomeIcon } from "@fortawesome/react-fontawesome";
 import { ReactComponent as S3Logo } from "../../assets/images/svg/s3.svg";
@@ -130,23 +131,21 @@ export default function DataAndIntegrations() {
 
   useEffect(() => {
     if (lastMessage?.data) {
-      const sources: Record<"sources", Source[]> = JSON.parse(lastMessage.data);
-
-      sources["sources"].map((source: Record<string, any>) => {
+      const message: Record<string, any> = JSON.parse(lastMessage.data);
+      const parseSource = (source: Record<string, any>) => {
         source["data_fields"] = JSON.parse(source["data_fields"]);
         source["conn_fieldls"] = JSON.parse(source["conn_fields"]);
-      });
-      setSources(sources["sources"]);
+        return source as Source;
+      };
 
-      if (Object.keys(JSON.parse(lastMessage.data)).includes("sources")) {
-        const statuses: string[] = [];
-        const sources: Source[] = JSON.parse(lastMessage.data).sources;
-        sources.forEach((source) => {
-          statuses.push(source.status);
-        });
-        if (statuses.includes("RUNNING")) {
-          setTimeout(getSourcesByUserId, 5000);
-        }
+      if (message["sources"]) {
+        setSources(message["sources"].map(parseSource));
+      } else {
+        // Only changed sources are pushed after the initial list
+        const changed: Source[] = message["changed"].map(parseSource);
+        setSources((sources) =>
+          mergeChangedRows(sources, changed, message["deleted"])
+        );
       }
     }
   }, [lastMessage]);
@@ -5,7 +5,7 @@ from sqlmodel import SQLModel, create_engine
 from indexhub.api import models  # noqa
 
 
-def create_sql_engine():
+def get_psql_uri() -> str:
     PSQL_USERNAME = os.environ["PSQL_USERNAME"]
     PSQL_PASSWORD = os.environ["PSQL_PASSWORD"]
     PSQL_HOST = os.environ["PSQL_HOST"]
@@ -16,7 +16,11 @@ def create_sql_engine():
         f"postgresql://{PSQL_USERNAME}:{PSQL_PASSWORD}@"
         f"{PSQL_HOST}:{PSQL_PORT}/{PSQL_DBNAME}?sslmode={PSQL_SSLMODE}"
     )
-    engine = create_engine(PSQL_URI, echo=True)
+    return PSQL_URI
+
+
+def create_sql_engine():
+    engine = create_engine(get_psql_uri(), echo=True)
     return engine
 
 
@@ -1,23 +1,25 @@
 import json
 import logging
 from enum import Enum
-from typing import List, Mapping
+from typing import Any, Dict, List, Mapping, Optional
 
-from fastapi import Request
-from pydantic import BaseModel
-from sqlmodel import Session
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
 
-from indexhub.api.db import create_sql_engine
-from indexhub.api.models.user import User
 from indexhub.api.routers import router
-from indexhub.api.routers.objectives import get_objective
-from indexhub.api.routers.sources import get_source
+from indexhub.api.routers.objectives import (
+    _get_objective_context,
+    _prefetch_artifacts,
+)
 from indexhub.api.services.chart_builders import (
     create_multi_forecast_chart,
     create_rolling_forecasts_chart,
     create_segmentation_chart,
     create_single_forecast_chart,
 )
+from indexhub.api.services.io import run_io
+from indexhub.api.services.response_cache import RESPONSE_CACHE, cached_response
+from indexhub.api.services.serialization import encode_chart_json
 
 
 def _logger(name, level=logging.INFO):
@@ -44,6 +46,32 @@ OBJECTIVE_TAG_TO_BUILDERS = {
 }
 
 
+# Artifacts read by each chart builder, prefetched concurrently before building
+OBJECTIVE_TAG_TO_ARTIFACTS = {
+    "reduce_errors": {
+        "single_forecast": lambda outputs, objective_id: [
+            outputs.get("serving", {}).get("chart_cube")
+            or outputs.get("serving", {}).get("chart"),
+            outputs.get("entities"),
+            outputs["best_plan"].replace("best_plan.parquet", "plan.parquet"),
+        ],
+        "multi_forecast": lambda outputs, objective_id: [
+            outputs["y"],
+            outputs["forecasts"]["best_models"],
+            outputs["backtests"]["best_models"],
+        ],
+        "segment": lambda outputs, objective_id: [
+            outputs["forecasts"]["best_models"],
+            outputs["scores"]["best_models"],
+            f"artifacts/{objective_id}/rolling_uplift.parquet",
+        ],
+        "rolling_forecast": lambda outputs, objective_id: [
+            f"artifacts/{objective_id}/rolling_forecasts.parquet",
+        ],
+    }
+}
+
+
 class ChartTag(str, Enum):
     single_forecast = "single_forecast"
     multi_forecast = "multi_forecast"
@@ -58,8 +86,16 @@ class AggregationMethod(str, Enum):
 
 
 class TrendChartParams(BaseModel):
-    filter_by: Mapping[str, List[str]] = None
-    agg_by: str = None
+    filter_by: Optional[Mapping[str, List[str]]] = None
+    agg_by: Optional[str] = None
+
+
+# Upper bound on entities per rolling forecast charts request
+MAX_CHART_ENTITIES = 100
+
+
+class EntityChartParams(BaseModel):
+    entities: List[str]
 
 
 class SegmentationFactor(str, Enum):
@@ -83,28 +119,115 @@ OBJECTIVE_TAG_TO_PARAMS = {
 }
 
 
+def _canonicalise_params(
+    objective_tag: str, chart_tag: ChartTag, params: Mapping[str, Any]
+) -> Dict[str, Any]:
+    """Fill in defaults and sort filters so equivalent params share a cache key."""
+    params_model = OBJECTIVE_TAG_TO_PARAMS.get(objective_tag, {}).get(chart_tag)
+    if params_model is not None:
+        try:
+            params = params_model(**params).dict(exclude_none=True)
+        except ValidationError as err:
+            raise HTTPException(status_code=400, detail=str(err)) from err
+    params = dict(params)
+    if params.get("filter_by"):
+        params["filter_by"] = {
+            col: sorted(set(values))
+            for col, values in sorted(params["filter_by"].items())
+        }
+    return params
+
+
+@router.get("/charts/cache/stats")
+def get_chart_cache_stats():
+    return RESPONSE_CACHE.stats(route_prefix="charts/")
+
+
 @router.post("/charts/{objective_id}/{chart_tag}")
 async def get_chart(objective_id: str, chart_tag: ChartTag, request: Request):
     try:
-        chart_json = None
-        engine = create_sql_engine()
-        with Session(engine) as session:
-            # Get the metadata on tag to define which chart to return
-            objective = get_objective(objective_id)["objective"]
-            params = json.loads(await request.body())
-            build = OBJECTIVE_TAG_TO_BUILDERS[objective.tag][chart_tag]
-            user = session.get(User, objective.user_id)
-            source = get_source(json.loads(objective.sources)["panel"])["source"]
-            chart_json = build(
+        response = None
+        # Get the metadata on tag to define which chart to return
+        objective, user, source = await run_io(_get_objective_context, objective_id)
+        params = _canonicalise_params(
+            objective.tag, chart_tag, json.loads(await request.body())
+        )
+        build = OBJECTIVE_TAG_TO_BUILDERS[objective.tag][chart_tag]
+        outputs = json.loads(objective.outputs)
+        artifacts = OBJECTIVE_TAG_TO_ARTIFACTS[objective.tag][chart_tag]
+
+        async def build_chart():
+            await _prefetch_artifacts(user, artifacts(outputs, objective_id))
+            # Build off the event loop
+            chart = await run_io(
+                build,
                 fields=json.loads(objective.fields),
-                outputs=json.loads(objective.outputs),
+                outputs=outputs,
                 source_fields=json.loads(source.data_fields),
                 user=user,
                 objective_id=objective_id,
                 **params,
             )
+            # Chart options are already JSON, embed them rather than re-encode
+            return encode_chart_json(chart)
+
+        response = await cached_response(
+            request, objective, f"charts/{chart_tag.value}", params, build_chart
+        )
     except Exception as err:
         logger.exception(f"Error in get_chart: {err}")
         raise err
 
-    return chart_json
+    return response
+
+
+@router.post("/charts/{objective_id}/{chart_tag}/entities")
+async def get_entity_charts(
+    objective_id: str, chart_tag: ChartTag, params: EntityChartParams, request: Request
+):
+    """Build the per-entity charts of `chart_tag` for a page of entities only.
+
+    Returns a mapping of entity to chart JSON like the `rolling_forecast` chart.
+    """
+    if chart_tag != ChartTag.rolling_forecast:
+        raise HTTPException(
+            status_code=400, detail=f"Chart {chart_tag.value} is not per entity"
+        )
+    if len(params.entities) > MAX_CHART_ENTITIES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {MAX_CHART_ENTITIES} entities can be requested",
+        )
+    try:
+        response = None
+        objective, user, source = await run_io(_get_objective_context, objective_id)
+        build = OBJECTIVE_TAG_TO_BUILDERS[objective.tag][chart_tag]
+        outputs = json.loads(objective.outputs)
+        artifacts = OBJECTIVE_TAG_TO_ARTIFACTS[objective.tag][chart_tag]
+        entities = sorted(set(params.entities))
+
+        async def build_charts():
+            await _prefetch_artifacts(user, artifacts(outputs, objective_id))
+            charts = await run_io(
+                build,
+                fields=json.loads(objective.fields),
+                outputs=outputs,
+                source_fields=json.loads(source.data_fields),
+                user=user,
+                objective_id=objective_id,
+                entities=entities,
+            )
+            return encode_chart_json(charts)
+
+        response = await cached_response(
+            request,
+            objective,
+            f"charts/{chart_tag.value}/entities",
+            {"entities": entities},
+            build_charts,
+        )
+    except Exception as err:
+        logger.exception(f"Error in get_entity_charts: {err}")
+        raise err
+
+    return response
@@ -1,18 +1,27 @@
-import io
+import mimetypes
+from typing import Optional
 
-import boto3
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, conint
 from sqlmodel import Session
 
 from indexhub.api.db import create_sql_engine
 from indexhub.api.models.user import User
 from indexhub.api.routers import router
 from indexhub.api.routers.objectives import get_objective
-from indexhub.api.services.io import SOURCE_TAG_TO_READER
+from indexhub.api.services.io import STORAGE_TAG_TO_LISTER, STORAGE_TAG_TO_STREAMER
 from indexhub.api.services.secrets_manager import get_aws_secret
 
 
+class ListExportsParams(BaseModel):
+    limit: conint(ge=1, le=1000) = 100
+    continuation_token: Optional[str] = None
+
+
 @router.post("/exports/list-exports/{objective_id}")
-def list_exports(objective_id: str):
+def list_exports(objective_id: str, params: Optional[ListExportsParams] = None):
+    params = params or ListExportsParams()
     engine = create_sql_engine()
     with Session(engine) as session:
         objective = get_objective(objective_id)["objective"]
@@ -21,23 +30,28 @@ def list_exports(objective_id: str):
         storage_creds = get_aws_secret(
             tag=user.storage_tag, secret_type="storage", user_id=user.id
         )
-        s3_client = boto3.client(
-            "s3",
-            aws_access_key_id=storage_creds["AWS_ACCESS_KEY_ID"],
-            aws_secret_access_key=storage_creds["AWS_SECRET_KEY_ID"],
-        )
-        prefix = f"exports/{objective_id}/"
-        objects = s3_client.list_objects_v2(
-            Bucket=user.storage_bucket_name, Prefix=prefix
-        )
 
-        files = [file["Key"].replace(prefix, "") for file in objects["Contents"]]
-
-    return files
+    prefix = f"exports/{objective_id}/"
+    page = STORAGE_TAG_TO_LISTER[user.storage_tag](
+        bucket_name=user.storage_bucket_name,
+        prefix=prefix,
+        limit=params.limit,
+        continuation_token=params.continuation_token,
+        **storage_creds,
+    )
+    exports = [
+        {
+            "filename": obj["key"].replace(prefix, ""),
+            "size": obj["size"],
+            "last_modified": obj["last_modified"],
+        }
+        for obj in page["objects"]
+    ]
+    return {"exports": exports, "next_token": page["next_token"]}
 
 
 @router.post("/exports/download-file/{objective_id}/{filename}")
-def download_file(objective_id: str, filename: str):
+def download_file(objective_id: str, filename: str, request: Request):
     engine = create_sql_engine()
     with Session(engine) as session:
         objective = get_objective(objective_id)["objective"]
@@ -47,17 +61,25 @@ def download_file(objective_id: str, filename: str):
             tag=user.storage_tag, secret_type="storage", user_id=user.id
         )
 
-        # Read file
-        path = f"exports/{objective_id}/{filename}"
-        data = SOURCE_TAG_TO_READER[user.storage_tag](
-            bucket_name=user.storage_bucket_name,
-            object_path=path,
-            file_ext="csv",
-            **storage_creds,
-        )
-        f = io.BytesIO()
-        data.write_csv(f, datetime_format="%Y-%m-%d")
-        f.seek(0)
-        output = f.read()
-
-    return output
+    # Stream the file as stored rather than parsing and re-serialising it
+    path = f"exports/{objective_id}/{filename}"
+    chunks, obj = STORAGE_TAG_TO_STREAMER[user.storage_tag](
+        bucket_name=user.storage_bucket_name,
+        object_path=path,
+        byte_range=request.headers.get("range"),
+        **storage_creds,
+    )
+    headers = {
+        "Accept-Ranges": "bytes",
+        "Content-Length": str(obj["ContentLength"]),
+        "Content-Disposition": f'attachment; filename="{filename}"',
+        "ETag": obj["ETag"],
+    }
+    status_code = 200
+    if "ContentRange" in obj:
+        headers["Content-Range"] = obj["ContentRange"]
+        status_code = 206
+    media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    return StreamingResponse(
+        chunks, status_code=status_code, media_type=media_type, headers=headers
+    )
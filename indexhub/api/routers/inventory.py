@@ -5,7 +5,7 @@ from functools import partial
 from typing import Any, List, Mapping, Optional, Tuple, Union
 
 import polars as pl
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
 from pydantic import BaseModel
 from pyecharts import options as opts
 from pyecharts.charts import Line
@@ -17,8 +17,20 @@ from indexhub.api.routers import router
 from indexhub.api.routers.objectives import get_objective
 from indexhub.api.routers.sources import get_source
 from indexhub.api.routers.stats import AGG_METHODS
+from indexhub.api.services.chart_builders import _read_forecast_chart_data
+from indexhub.api.services.entities import (
+    _get_entity_levels,
+    _make_entities_path,
+    _read_entities,
+    _split_entities,
+)
 from indexhub.api.services.io import SOURCE_TAG_TO_READER
 from indexhub.api.services.secrets_manager import get_aws_secret
+from indexhub.api.services.table_formats import (
+    ARROW_STREAM_MEDIA_TYPE,
+    TableFormat,
+    format_table,
+)
 
 
 def _logger(name, level=logging.INFO):
@@ -62,17 +74,14 @@ def get_entities(
         )
 
         # Get forecast entities
-        forecasts = read(object_path=outputs["forecasts"]["best_models"])
-        entity_cols = forecasts.columns[0].split("__")
+        forecast_entities = _read_entities(
+            read=read,
+            object_path=outputs.get("entities"),
+            load_panel=lambda: read(object_path=outputs["forecasts"]["best_models"]),
+        )
+        entity_cols = _get_entity_levels(forecast_entities)
         forecast_entities = (
-            forecasts.select(
-                pl.col(forecasts.columns[0])
-                .cast(pl.Utf8)
-                .str.split_exact(" - ", len(entity_cols))
-                .struct.rename_fields(entity_cols)
-                .alias("entities")
-            )
-            .unnest("entities")
+            forecast_entities.select(entity_cols)
             .unique()
             .sort(entity_cols)
             .with_row_count("id")
@@ -81,17 +90,14 @@ def get_entities(
 
         # Get inventory entities
         inventory_source = get_source(sources["inventory"])["source"]
-        inventory = read(object_path=inventory_source.output_path)
-        inv_entity_cols = inventory.columns[0].split("__")
+        inventory_entities = _read_entities(
+            read=read,
+            object_path=_make_entities_path(inventory_source.output_path),
+            load_panel=lambda: read(object_path=inventory_source.output_path),
+        )
+        inv_entity_cols = _get_entity_levels(inventory_entities)
         inventory_entities = (
-            inventory.select(
-                pl.col(inventory.columns[0])
-                .cast(pl.Utf8)
-                .str.split_exact(" - ", len(inv_entity_cols))
-                .struct.rename_fields(inv_entity_cols)
-                .alias("entities")
-            )
-            .unnest("entities")
+            inventory_entities.select(inv_entity_cols)
             .unique()
             .sort(inv_entity_cols)
             .with_row_count("id")
@@ -139,23 +145,15 @@ def _create_inventory_table(
     )
 
     # Read forecast artifacts
-    forecast = read(object_path=outputs["forecasts"]["best_models"])
-    entity_col, time_col, target_col = forecast.columns
+    forecast_chart_data = _read_forecast_chart_data(
+        read=read,
+        outputs=outputs,
+        quantile_lower=quantile_lower,
+        quantile_upper=quantile_upper,
+    )
+    entity_col, time_col = forecast_chart_data.columns[:2]
     idx_cols = entity_col, time_col
 
-    backtest = read(object_path=outputs["backtests"]["best_models"]).pipe(
-        lambda df: df.groupby(df.columns[:2]).agg(pl.mean(df.columns[-2]))
-    )
-    actual = read(object_path=outputs["y"])
-    y_baseline = read(object_path=outputs["y_baseline"])
-    quantiles = read(object_path=outputs["quantiles"]["best_models"])
-    quantiles_lower = quantiles.filter(pl.col("quantile") == quantile_lower).drop(
-        "quantile"
-    )
-    quantiles_upper = quantiles.filter(pl.col("quantile") == quantile_upper).drop(
-        "quantile"
-    )
-    best_plan = read(object_path=outputs["best_plan"])
     try:
         plan = read(
             object_path=outputs["best_plan"].replace(
@@ -170,34 +168,7 @@ def _create_inventory_table(
 
     # Join dfs and filter by entities
     forecast_df = (
-        actual.rename({target_col: "actual"})
-        .join(
-            y_baseline.rename({target_col: "baseline"}),
-            on=idx_cols,
-            how="outer",
-        )
-        .join(
-            pl.concat([backtest, forecast]).rename({target_col: "ai"}),
-            on=idx_cols,
-            how="outer",
-        )
-        # Join quantiles
-        .join(
-            quantiles_lower.rename({target_col: f"ai_{quantile_lower}"}),
-            on=idx_cols,
-            how="outer",
-        )
-        .join(
-            quantiles_upper.rename({target_col: f"ai_{quantile_upper}"}),
-            on=idx_cols,
-            how="outer",
-        )
-        .join(
-            best_plan.select(pl.all().exclude(["^fh.*$", "^use.*$"])),
-            on=idx_cols,
-            how="outer",
-        )
-        .join(
+        forecast_chart_data.join(
             plan.select(pl.all().exclude(["^fh.*$", "^use.*$"])),
             on=idx_cols,
             how="outer",
@@ -227,41 +198,36 @@ def _create_inventory_table(
     unique_entity_cols = [col for col in entity_cols if col not in inv_entity_cols]
     join_entity_cols = [col for col in entity_cols if col in inv_entity_cols]
 
+    # Entity dimension tables map merged entities to entity levels
+    forecast_entity_dim = _read_entities(
+        read=read,
+        object_path=outputs.get("entities"),
+        load_panel=lambda: forecast_df,
+    )
+    inventory_entity_dim = _read_entities(
+        read=read,
+        object_path=_make_entities_path(inventory_source.output_path),
+        load_panel=lambda: inventory_df,
+    )
+
     rows = (
         forecast_df
-        # Split entity cols
-        .with_columns(
-            pl.col(entity_col)
-            .cast(pl.Utf8)
-            .str.split_exact(" - ", len(entity_cols))
-            .struct.rename_fields(entity_cols)
-            .alias("entities")
-        )
-        .drop(entity_col)
-        .unnest("entities")
+        # Join entity levels
+        .pipe(_split_entities, entities=forecast_entity_dim)
         # Cast entity cols to categorical
         .with_columns([pl.col(col).cast(pl.Categorical) for col in entity_cols])
         # Join with inventory
         .join(
             inventory_df
-            # Split entity cols
-            .with_columns(
-                pl.col(inv_entity_col)
-                .cast(pl.Utf8)
-                .str.split_exact(" - ", len(inv_entity_cols))
-                .struct.rename_fields(inv_entity_cols)
-                .alias("entities")
-            )
-            .drop(inv_entity_col)
-            .unnest("entities")
+            # Join entity levels
+            .pipe(_split_entities, entities=inventory_entity_dim)
             # Cast entity cols to categorical
             .with_columns(
                 [pl.col(col).cast(pl.Categorical) for col in inv_entity_cols]
             ),
             on=[*join_entity_cols, time_col],
             how="left",
-        )
-        .sort(["time", *inv_entity_cols, *unique_entity_cols])
+        ).sort(["time", *inv_entity_cols, *unique_entity_cols])
         # Reorder cols
         .select(
             [
@@ -462,10 +428,14 @@ class Params(BaseModel):
     inventory_entities: List[str]
 
 
+class TableParams(Params):
+    format: TableFormat = TableFormat.rows
+
+
 @router.post("/inventory/table/{objective_id}")
 def get_inventory_table(
     objective_id: str,
-    params: Params,
+    params: TableParams,
 ) -> Mapping[str, List[Mapping[str, Any]]]:
     objective = get_objective(objective_id)["objective"]
     sources = json.loads(objective.sources)
@@ -485,9 +455,11 @@ def get_inventory_table(
             inventory_entities=params.inventory_entities,
         )
 
-        rows = rows.drop_nulls(subset=["inventory"]).with_row_count("id").to_dicts()
-
-        response = {"columns": columns, "rows": rows}
+        response = format_table(
+            rows.drop_nulls(subset=["inventory"]), params.format, columns=columns
+        )
+        if params.format == TableFormat.arrow:
+            response = Response(content=response, media_type=ARROW_STREAM_MEDIA_TYPE)
 
     return response
 
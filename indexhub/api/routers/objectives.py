@@ -1,6 +1,8 @@
 import json
 import os
 from datetime import datetime
+from functools import partial
+from typing import Iterable, Optional, Tuple
 
 import modal
 from fastapi import HTTPException, WebSocket
@@ -20,6 +22,9 @@ from indexhub.api.schemas import (
     SUPPORTED_ERROR_TYPE,
     SUPPORTED_FREQ,
 )
+from indexhub.api.services.changes import notify_change, serve_changes
+from indexhub.api.services.io import SOURCE_TAG_TO_ASYNC_READER, prefetch
+from indexhub.api.services.secrets_manager import get_aws_secret_async
 
 
 FREQ_TO_SP = {
@@ -64,6 +69,7 @@ def create_objective(params: CreateObjectiveParams):
         objective.created_at = ts
         objective.updated_at = ts
         session.add(objective)
+        notify_change(session, objective)
         session.commit()
         session.refresh(objective)
 
@@ -152,6 +158,30 @@ def get_objective(objective_id: str, user_id: str = None):
         return {"objective": objective, "panel_source_data_fields": panel_source_data_fields}
 
 
+def _get_objective_context(objective_id: str) -> Tuple[Objective, User, Source]:
+    """Load an objective with its user and panel source."""
+    objective = get_objective(objective_id)["objective"]
+    engine = create_sql_engine()
+    with Session(engine) as session:
+        user = session.get(User, objective.user_id)
+    source = get_source(json.loads(objective.sources)["panel"])["source"]
+    return objective, user, source
+
+
+async def _prefetch_artifacts(user: User, object_paths: Iterable[Optional[str]]):
+    """Read objective artifacts concurrently into the cache before building."""
+    storage_creds = await get_aws_secret_async(
+        tag=user.storage_tag, secret_type="storage", user_id=user.id
+    )
+    read = partial(
+        SOURCE_TAG_TO_ASYNC_READER[user.storage_tag],
+        bucket_name=user.storage_bucket_name,
+        file_ext="parquet",
+        **storage_creds,
+    )
+    await prefetch(read, [path for path in object_paths if path is not None])
+
+
 @router.delete("/objectives/{objective_id}")
 def delete_objective(objective_id: str):
     engine = create_sql_engine()
@@ -160,6 +190,7 @@ def delete_objective(objective_id: str):
         report = session.exec(query).first()
         if report is None:
             raise HTTPException(status_code=404, detail="Objective not found")
+        notify_change(session, report, op="delete")
         session.delete(report)
         session.commit()
         return {"ok": True}
@@ -168,14 +199,4 @@ def delete_objective(objective_id: str):
 @unprotected_router.websocket("/objectives/ws")
 async def ws_get_objectives(websocket: WebSocket):
     await websocket.accept()
-    while True:
-        data = await websocket.receive_json()
-        results = list_objectives(**data)
-        response = []
-        for result in results["objectives"]:
-            values = {
-                k: v for k, v in vars(result).items() if k != "_sa_instance_state"
-            }
-            response.append(values)
-        response = {"objectives": response}
-        await websocket.send_text(json.dumps(response, default=str))
+    await serve_changes(websocket, Objective, "objectives", list_objectives)
@@ -12,6 +12,7 @@ from indexhub.api.models.user import User
 from indexhub.api.routers import router
 from indexhub.api.routers.objectives import get_objective
 from indexhub.api.services.io import SOURCE_TAG_TO_READER, STORAGE_TAG_TO_WRITER
+from indexhub.api.services.response_cache import RESPONSE_CACHE
 from indexhub.api.services.secrets_manager import get_aws_secret
 
 
@@ -172,5 +173,7 @@ def execute_plan(objective_id: str, params: ExecutePlanParams):
             params.updated_plans,
         )
         pl.toggle_string_cache(False)
+    # Plan and rolling forecast artifacts changed without a new objective run
+    RESPONSE_CACHE.invalidate(objective.id)
 
     return {"path": path}
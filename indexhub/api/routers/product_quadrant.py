@@ -1,11 +1,10 @@
 import json
 import logging
+from functools import partial
 from typing import Any, List, Mapping, Optional, Tuple
 
 import polars as pl
 from pydantic import BaseModel
-from pyecharts import options as opts
-from pyecharts.charts import Line, Scatter
 from sqlmodel import Session
 
 from indexhub.api.db import create_sql_engine
@@ -13,6 +12,12 @@ from indexhub.api.models.user import User
 from indexhub.api.routers import router
 from indexhub.api.routers.objectives import get_objective
 from indexhub.api.routers.sources import get_source
+from indexhub.api.services.chart_specs import dump_spec, echarts_series
+from indexhub.api.services.entities import (
+    _make_entities_path,
+    _read_entities,
+    _split_entities,
+)
 from indexhub.api.services.io import SOURCE_TAG_TO_READER
 from indexhub.api.services.secrets_manager import get_aws_secret
 
@@ -46,26 +51,26 @@ def _create_product_quadrant_table(
     storage_creds = get_aws_secret(
         tag=user.storage_tag, secret_type="storage", user_id=user.id
     )
-    staging_data = SOURCE_TAG_TO_READER[user.storage_tag](
-        object_path=staging_path,
+    read = partial(
+        SOURCE_TAG_TO_READER[user.storage_tag],
         bucket_name=user.storage_bucket_name,
         file_ext="parquet",
         **storage_creds,
     )
+    staging_data = read(object_path=staging_path)
+    entities = _read_entities(
+        read=read,
+        object_path=_make_entities_path(staging_path),
+        load_panel=lambda: staging_data,
+    )
 
     # Create product quadrant df
+    # Aggregate by merged entity before joining entity levels
     entity_col = staging_data.columns[0]
-    entity_cols = entity_col.split("__")
     product_quadrant = (
-        staging_data.with_columns(
-            pl.col(entity_col)
-            .cast(pl.Utf8)
-            .str.split_exact(" - ", len(entity_cols))
-            .struct.rename_fields(entity_cols)
-            .alias("entities")
-        )
-        .drop(entity_col)
-        .unnest("entities")
+        staging_data.groupby(entity_col)
+        .agg([pl.col(quantity_col).sum(), pl.col(value_col).sum()])
+        .pipe(_split_entities, entities=entities)
         .groupby(product_col)
         .agg([pl.col(quantity_col).sum(), pl.col(value_col).sum()])
     )
@@ -118,25 +123,24 @@ def _create_product_quadrant_chart(
     chart_width: str = "800px",
     symbol_size: int = 5,
 ):
-    # Create scatterplot
-    scatter = Scatter(
-        init_opts=opts.InitOpts(
-            bg_color="white", height=chart_height, width=chart_width
+    # Create scatterplot with one named point per product
+    points = [
+        {"name": product, "value": [quantity, value]}
+        for product, quantity, value in zip(
+            chart_data.get_column(product_col).cast(pl.Utf8).to_list(),
+            chart_data.get_column(quantity_col).to_list(),
+            chart_data.get_column(value_col).to_list(),
+            strict=True,
         )
+    ]
+    scatter = echarts_series(
+        "scatter",
+        "Products",
+        points,
+        symbolSize=symbol_size,
+        label={"show": False},
+        itemStyle={"color": "#1B57F1"},
     )
-    products = chart_data.get_column(product_col).unique()
-    for product in products:
-        filtered = chart_data.filter(pl.col(product_col) == product)
-        x_data = filtered.get_column(quantity_col).to_list()
-        y_data = filtered.get_column(value_col).to_list()
-        scatter.add_xaxis(xaxis_data=x_data)
-        scatter.add_yaxis(
-            series_name=product,
-            y_axis=y_data,
-            symbol_size=symbol_size,
-            label_opts=opts.LabelOpts(is_show=False),
-            color="#1B57F1",
-        )
 
     quantity_caption = quantity_col.replace("_", " ").title()
     value_caption = value_col.replace("_", " ").title()
@@ -147,52 +151,52 @@ def _create_product_quadrant_chart(
     quantity_min = chart_data.get_column(quantity_col).min()
     value_min = chart_data.get_column(value_col).min()
 
-    scatter.set_global_opts(
-        legend_opts=opts.LegendOpts(is_show=False, border_width=0),
-        xaxis_opts=opts.AxisOpts(
-            name=quantity_caption,
-            name_location="middle",
-            name_gap=30,
-            type_="value",
-            min_=quantity_min,
-            max_=quantity_max,
-        ),
-        yaxis_opts=opts.AxisOpts(
-            name=value_caption, type_="value", min_=value_min, max_=value_max
-        ),
-        tooltip_opts=opts.TooltipOpts(
-            formatter="{a}: <br> "
-            + f"({quantity_caption})"
-            + " {c} "
-            + f"({value_caption})"
-        ),
-    )
-
     # Create lines
-    vertical_line = (
-        Line()
-        .add_xaxis([quantity_mean, quantity_mean])
-        .add_yaxis(
-            f"Mean of {quantity_caption}",
-            [0, value_max],
-            linestyle_opts=opts.LineStyleOpts(color="#5A5A5A", type_="dashed"),
-            is_symbol_show=False,
-        )
+    mean_line_opts = {
+        "showSymbol": False,
+        "lineStyle": {"color": "#5A5A5A", "type": "dashed"},
+        "itemStyle": {"color": "#5A5A5A"},
+    }
+    vertical_line = echarts_series(
+        "line",
+        f"Mean of {quantity_caption}",
+        [[quantity_mean, 0], [quantity_mean, value_max]],
+        **mean_line_opts,
     )
-
-    horizontal_line = (
-        Line()
-        .add_xaxis([0, quantity_max])
-        .add_yaxis(
-            f"Mean of {value_caption}",
-            [value_mean, value_mean],
-            linestyle_opts=opts.LineStyleOpts(color="#5A5A5A", type_="dashed"),
-            is_symbol_show=False,
-        )
+    horizontal_line = echarts_series(
+        "line",
+        f"Mean of {value_caption}",
+        [[0, value_mean], [quantity_max, value_mean]],
+        **mean_line_opts,
     )
 
-    scatter = scatter.overlap(vertical_line).overlap(horizontal_line)
-    return scatter.dump_options()
+    chart = {
+        "backgroundColor": "white",
+        "series": [scatter, vertical_line, horizontal_line],
+        "legend": [{"show": False, "borderWidth": 0}],
+        "tooltip": {
+            "show": True,
+            "trigger": "item",
+            "formatter": "{b}: <br> "
+            + f"({quantity_caption})"
+            + " {c} "
+            + f"({value_caption})",
+        },
+        "xAxis": [
+            {
+                "name": quantity_caption,
+                "nameLocation": "middle",
+                "nameGap": 30,
+                "type": "value",
+                "min": quantity_min,
+                "max": quantity_max,
+            }
+        ],
+        "yAxis": [
+            {"name": value_caption, "type": "value", "min": value_min, "max": value_max}
+        ],
+    }
+    return dump_spec(chart)
 
 
 @router.post("/product_quadrant/table/{objective_id}")
@@ -11,6 +11,7 @@ from indexhub.api.models.source import Source
 from indexhub.api.models.user import User
 from indexhub.api.routers import router, unprotected_router
 from indexhub.api.schemas import CONNECTION_SCHEMA, DATASET_SCHEMA
+from indexhub.api.services.changes import notify_change, serve_changes
 import os
 
 
@@ -50,6 +51,7 @@ def create_source(params: CreateSourceParams):
         source.created_at = ts
         source.updated_at = ts
         session.add(source)
+        notify_change(session, source)
         session.commit()
         session.refresh(source)
 
@@ -98,6 +100,7 @@ def delete_source(source_id: str):
         source = session.exec(query).first()
         if source is None:
             raise HTTPException(status_code=404, detail="Source not found")
+        notify_change(session, source, op="delete")
         session.delete(source)
         session.commit()
         return {"ok": True}
@@ -106,14 +109,4 @@ def delete_source(source_id: str):
 @unprotected_router.websocket("/sources/ws")
 async def ws_get_sources(websocket: WebSocket):
     await websocket.accept()
-    while True:
-        data = await websocket.receive_json()
-        results = list_sources(**data)
-        response = []
-        for result in results["sources"]:
-            values = {
-                k: v for k, v in vars(result).items() if k != "_sa_instance_state"
-            }
-            response.append(values)
-        response = {"sources": response}
-        await websocket.send_text(json.dumps(response, default=str))
+    await serve_changes(websocket, Source, "sources", list_sources)
@@ -1,17 +1,20 @@
 import json
 from functools import partial
-from typing import Any, List, Mapping
+from typing import Any, Callable, List, Mapping
 
 import polars as pl
-from sqlmodel import Session
+from fastapi import Request
 
-from indexhub.api.db import create_sql_engine
 from indexhub.api.models.user import User
 from indexhub.api.routers import router
-from indexhub.api.routers.objectives import FREQ_TO_SP, get_objective
-from indexhub.api.routers.sources import get_source
+from indexhub.api.routers.objectives import (
+    FREQ_TO_SP,
+    _get_objective_context,
+    _prefetch_artifacts,
+)
 from indexhub.api.schemas import SUPPORTED_ERROR_TYPE
-from indexhub.api.services.io import SOURCE_TAG_TO_READER
+from indexhub.api.services.io import SOURCE_TAG_TO_READER, run_io
+from indexhub.api.services.response_cache import cached_response
 from indexhub.api.services.secrets_manager import get_aws_secret
 
 
@@ -27,24 +30,13 @@ AGG_METHODS = {"sum": pl.sum, "mean": pl.mean, "median": pl.median}
 
 
 # STATS RESULT TABLES
-def _get_forecast_results(
+def _compute_forecast_results(
+    read: Callable,
     outputs: Mapping[str, str],
     fields: Mapping[str, str],
     source_fields: Mapping[str, str],
-    user: User,
     objective_id: str,
-) -> pl.DataFrame:
-    # Get credentials
-    storage_creds = get_aws_secret(
-        tag=user.storage_tag, secret_type="storage", user_id=user.id
-    )
-    read = partial(
-        SOURCE_TAG_TO_READER[user.storage_tag],
-        bucket_name=user.storage_bucket_name,
-        file_ext="parquet",
-        **storage_creds,
-    )
-
+) -> List[Mapping[str, Any]]:
     # Read artifacts
     y = read(object_path=outputs["y"]).lazy()
     forecasts = read(object_path=outputs["forecasts"]["best_models"])
@@ -211,24 +203,68 @@ def _get_forecast_results(
     return results
 
 
+def _get_forecast_results(
+    outputs: Mapping[str, str],
+    fields: Mapping[str, str],
+    source_fields: Mapping[str, str],
+    user: User,
+    objective_id: str,
+) -> List[Mapping[str, Any]]:
+    # Use the stats materialised by the forecast flow if available
+    serving = outputs.get("serving", {})
+    if "stats" in serving:
+        return serving["stats"]
+
+    # Get credentials
+    storage_creds = get_aws_secret(
+        tag=user.storage_tag, secret_type="storage", user_id=user.id
+    )
+    read = partial(
+        SOURCE_TAG_TO_READER[user.storage_tag],
+        bucket_name=user.storage_bucket_name,
+        file_ext="parquet",
+        **storage_creds,
+    )
+    results = _compute_forecast_results(
+        read=read,
+        outputs=outputs,
+        fields=fields,
+        source_fields=source_fields,
+        objective_id=objective_id,
+    )
+    return results
+
+
 OBJECTIVE_TAG_TO_GETTER = {"reduce_errors": _get_forecast_results}
 
 
 @router.get("/stats/{objective_id}")
-def get_stats(
-    objective_id: str,
+async def get_stats(
+    objective_id: str, request: Request = None
 ) -> List[Mapping[str, Any]]:
-    engine = create_sql_engine()
-    with Session(engine) as session:
-        objective = get_objective(objective_id)["objective"]
-        getter = OBJECTIVE_TAG_TO_GETTER[objective.tag]
-        user = session.get(User, objective.user_id)
-        source = get_source(json.loads(objective.sources)["panel"])["source"]
-        stats = getter(
-            json.loads(objective.outputs),
+    objective, user, source = await run_io(_get_objective_context, objective_id)
+    getter = OBJECTIVE_TAG_TO_GETTER[objective.tag]
+    outputs = json.loads(objective.outputs)
+
+    async def build():
+        if "stats" not in outputs.get("serving", {}):
+            await _prefetch_artifacts(
+                user,
+                [
+                    outputs["y"],
+                    outputs["forecasts"]["best_models"],
+                    outputs["backtests"]["best_models"],
+                    outputs["uplift"],
+                    f"artifacts/{objective_id}/rolling_uplift.parquet",
+                ],
+            )
+        return await run_io(
+            getter,
+            outputs,
             json.loads(objective.fields),
             json.loads(source.data_fields),
             user,
             objective_id,
-        )  # TODO: Cache using an in memory key-value store
-    return stats
+        )
+
+    return await cached_response(request, objective, "stats", {}, build)
@@ -1,22 +1,34 @@
 import json
 from enum import Enum
 from functools import partial, reduce
-from typing import Any, List, Mapping, Optional, Union
+from typing import Any, Callable, List, Literal, Mapping, Optional, Tuple, Union
 
 import numpy as np
-import pandas as pd
 import polars as pl
+from fastapi import Request
 from pydantic import BaseModel
-from sqlmodel import Session
 
-from indexhub.api.db import create_sql_engine
 from indexhub.api.models.user import User
 from indexhub.api.routers import router
-from indexhub.api.routers.objectives import get_objective
-from indexhub.api.routers.sources import get_source
+from indexhub.api.routers.objectives import (
+    _get_objective_context,
+    _prefetch_artifacts,
+)
 from indexhub.api.schemas import SUPPORTED_ERROR_TYPE
-from indexhub.api.services.io import SOURCE_TAG_TO_READER
+from indexhub.api.services.entities import (
+    _get_entity_levels,
+    _read_entities,
+    _split_entities,
+)
+from indexhub.api.services.entity_search import get_entity_search_index
+from indexhub.api.services.io import SOURCE_TAG_TO_READER, run_io
+from indexhub.api.services.response_cache import cached_response
 from indexhub.api.services.secrets_manager import get_aws_secret
+from indexhub.api.services.table_formats import (
+    ARROW_STREAM_MEDIA_TYPE,
+    TableFormat,
+    format_table,
+)
 
 
 MODEL_NAME_TO_SHORT = {
@@ -55,51 +67,45 @@ MODEL_NAME_TO_SHORT = {
 }
 
 
-def _create_sparkline(y_data: List[int]):
-
-    from pyecharts import options as opts
-    from pyecharts.charts import Line
-
+def _create_sparkline(y_data: List[float]) -> str:
     # Define sparkline color based on first and last values
     if y_data[0] <= y_data[-1]:
         color = "#44aa7e"  # green
     else:
         color = "#9e2b2b"  # red
 
-    # Generate sparkline
-    sparkline = Line()
-    sparkline.add_xaxis(list(range(len(y_data))))
-    sparkline.add_yaxis(
-        "",
-        y_data,
-        is_symbol_show=False,
-        linestyle_opts=opts.LineStyleOpts(width=3),
-        color=color,
-    )
-
-    # Update markpoint to show only first and last data label
-    markpoint_data = [
-        {"coord": [0, y_data[0]], "value": y_data[0]},
-        {"coord": [len(y_data) - 1, y_data[-1]], "value": y_data[-1]},
-    ]
-    sparkline.set_series_opts(
-        markpoint_opts=opts.MarkPointOpts(
-            data=markpoint_data,
-            symbol="circle",
-            symbol_size=7,
-            label_opts=opts.LabelOpts(position="outside", font_size=12),
-        ),
-    )
-    # Remove legends, axis, tooltip
-    sparkline.set_global_opts(
-        legend_opts=opts.LegendOpts(is_show=False),
-        xaxis_opts=opts.AxisOpts(is_show=False),
-        yaxis_opts=opts.AxisOpts(is_show=False),
-        tooltip_opts=opts.TooltipOpts(is_show=False),
-    )
+    # Minimal ECharts options: line without symbols, axes, legend and tooltip
+    # Markpoints show only first and last data label
+    last_idx = len(y_data) - 1
+    sparkline = {
+        "color": [color],
+        "series": [
+            {
+                "type": "line",
+                "name": "",
+                "showSymbol": False,
+                "data": [[i, value] for i, value in enumerate(y_data)],
+                "label": {"show": True},
+                "lineStyle": {"width": 3},
+                "markPoint": {
+                    "symbol": "circle",
+                    "symbolSize": 7,
+                    "label": {"show": True, "position": "outside", "fontSize": 12},
+                    "data": [
+                        {"coord": [0, y_data[0]], "value": y_data[0]},
+                        {"coord": [last_idx, y_data[-1]], "value": y_data[-1]},
+                    ],
+                },
+            }
+        ],
+        "legend": [{"show": False}],
+        "tooltip": {"show": False},
+        "xAxis": [{"show": False, "data": list(range(len(y_data)))}],
+        "yAxis": [{"show": False}],
+    }
 
     # Export chart options to JSON
-    sparkline_json = sparkline.dump_options()
+    sparkline_json = json.dumps(sparkline, separators=(",", ":"))
     return sparkline_json
 
 
@@ -108,26 +114,13 @@ class TableTag(str, Enum):
     uplift = "uplift"
 
 
-def _get_forecast_table(
+def _create_forecast_table(
+    read: Callable,
     fields: Mapping[str, str],
     outputs: Mapping[str, str],
     source_fields: Mapping[str, str],
-    user: User,
     objective_id: str,
-    filter_by: Mapping[str, List[str]],
-    entities_keywords: List[str],
-) -> pd.DataFrame:
-    # Get credentials
-    storage_creds = get_aws_secret(
-        tag=user.storage_tag, secret_type="storage", user_id=user.id
-    )
-    read = partial(
-        SOURCE_TAG_TO_READER[user.storage_tag],
-        bucket_name=user.storage_bucket_name,
-        file_ext="parquet",
-        **storage_creds,
-    )
-
+) -> pl.LazyFrame:
     # Read forecast
     forecast = read(object_path=outputs["forecasts"]["best_models"])
     best_models = outputs["best_models"]
@@ -209,36 +202,7 @@ def _get_forecast_table(
         )
     )
 
-    # Create sparklines
-    # Filter y to last 12 datetimes
-    y = read(object_path=outputs["y"])
-    y_last12 = (
-        y.with_columns(
-            [
-                pl.col(time_col).rank("ordinal").over(entity_col).alias("i"),
-                # Rounding only works for f64
-                pl.col(target_col).cast(pl.Float64),
-            ]
-        )
-        .filter(pl.col("i") > pl.col("i").max() - 12)
-        .select(pl.all().exclude("i"))
-    )
-    # Join with forecast and groupby entity_col
-    groupby = pl.concat(
-        [
-            y_last12,
-            # Rounding only works for f64
-            forecast.with_columns(pl.col(target_col).cast(pl.Float64)),
-        ]
-    ).groupby(entity_col)
-
-    sparklines = {}
-    for entity, df in groupby:
-        # Cast to f64 for rounding
-        y_data = df.get_column(target_col).round(1).to_list()
-        sparklines[entity] = _create_sparkline(y_data)
-
-    # Return entity, stats, best_model, and sparklines
+    # Return entity, stats and best_model
     table = (
         stats.sort("score__uplift_pct__rolling_mean", descending=True)
         .rename({entity_col: "entity"})
@@ -256,15 +220,100 @@ def _get_forecast_table(
                 .alias("best_model"),
             ]
         )
-        # Append sparklines to table
-        .pipe(
-            lambda df: df.with_columns(
-                pl.col("entity")
-                .apply(lambda x: sparklines.get(x, "N/A"))
-                .alias("sparklines")
-            )
+    )
+    return table
+
+
+def _create_sparklines(
+    read: Callable,
+    outputs: Mapping[str, str],
+    entities: Optional[List[str]] = None,
+) -> pl.DataFrame:
+    # Read forecast and y, only for the selected entities if provided
+    forecast = read(object_path=outputs["forecasts"]["best_models"])
+    y = read(object_path=outputs["y"])
+    entity_col, time_col, target_col = forecast.columns
+    if entities is not None:
+        forecast = forecast.filter(pl.col(entity_col).is_in(entities))
+        y = y.filter(pl.col(entity_col).is_in(entities))
+
+    # Filter y to last 12 datetimes
+    y_last12 = (
+        y.with_columns(
+            [
+                pl.col(time_col).rank("ordinal").over(entity_col).alias("i"),
+                # Rounding only works for f64
+                pl.col(target_col).cast(pl.Float64),
+            ]
+        )
+        .filter(pl.col("i") > pl.col("i").max().over(entity_col) - 12)
+        .select(pl.all().exclude("i"))
+    )
+    # Join with forecast and collect values into a list for each entity
+    sparklines = (
+        pl.concat(
+            [
+                y_last12,
+                # Rounding only works for f64
+                forecast.with_columns(pl.col(target_col).cast(pl.Float64)),
+            ]
         )
+        .groupby(entity_col)
+        .agg(pl.col(target_col).round(1))
+    )
+    sparklines = sparklines.select(
+        entity_col,
+        pl.Series(
+            "sparklines",
+            [
+                _create_sparkline(y_data)
+                for y_data in sparklines.get_column(target_col).to_list()
+            ],
+            dtype=pl.Utf8,
+        ),
     )
+    return sparklines.rename({entity_col: "entity"})
+
+
+def _get_forecast_table(
+    fields: Mapping[str, str],
+    outputs: Mapping[str, str],
+    source_fields: Mapping[str, str],
+    user: User,
+    objective_id: str,
+    filter_by: Mapping[str, List[str]],
+    entities_keywords: List[str],
+    page: int,
+    display_n: int,
+    keywords_operator: Literal["or", "and"] = "or",
+    keywords_prefix: bool = False,
+) -> Tuple[pl.DataFrame, int]:
+    # Get credentials
+    storage_creds = get_aws_secret(
+        tag=user.storage_tag, secret_type="storage", user_id=user.id
+    )
+    read = partial(
+        SOURCE_TAG_TO_READER[user.storage_tag],
+        bucket_name=user.storage_bucket_name,
+        file_ext="parquet",
+        **storage_creds,
+    )
+
+    # Read serving table materialised by the forecast flow if available
+    serving = outputs.get("serving", {})
+    if "table" in serving:
+        table = read(object_path=serving["table"]).lazy()
+    else:
+        table = _create_forecast_table(
+            read=read,
+            fields=fields,
+            outputs=outputs,
+            source_fields=source_fields,
+            objective_id=objective_id,
+        )
+
+    # The search index of this run is built from all entities, not the filtered ones
+    all_entities = table.select("entity")
 
     # Filter by specific columns
     if filter_by:
@@ -273,20 +322,34 @@ def _get_forecast_table(
         filter_expr = reduce(lambda x, y: x & y, expr)
         table = table.filter(filter_expr)
 
-    # Filter by entities keywords
+    # Filter by entities keywords using the entity search index of this run
     if entities_keywords:
-        filter_by_entities = []
-        for keyword in entities_keywords:
-            entities = (
-                forecast
-                .filter(pl.col(entity_col).cast(pl.Utf8).str.contains(keyword))
-                .get_column(entity_col)
-                .to_list()
-            )
-            filter_by_entities = [*filter_by_entities, *entities]
-        table = table.filter(pl.col("entity").is_in(filter_by_entities))
+        index = get_entity_search_index(
+            objective_id=objective_id,
+            version=outputs["forecasts"]["best_models"],
+            load_entities=lambda: all_entities.collect().get_column("entity"),
+        )
+        entities = index.search(
+            entities_keywords, operator=keywords_operator, prefix=keywords_prefix
+        )
+        table = table.filter(pl.col("entity").is_in(entities))
+
+    # Count entities and slice the requested page only
+    n_entities = table.select(pl.col("entity").n_unique()).collect()[0, 0]
+    rows = table.slice(display_n * (page - 1), display_n).collect()
+
+    # Create sparklines for the entities in the page only
+    if "sparklines" not in rows.columns:
+        sparklines = _create_sparklines(
+            read=read,
+            outputs=outputs,
+            entities=rows.get_column("entity").to_list(),
+        )
+        rows = rows.join(sparklines, on="entity", how="left").with_columns(
+            pl.col("sparklines").fill_null("N/A")
+        )
 
-    return table
+    return rows, n_entities
 
 
 def _get_uplift_table():
@@ -300,31 +363,17 @@ class Columns(BaseModel):
     type: str  # string or number
 
 
-def _get_forecast_table_view(
+def _create_forecast_table_rows(
+    read: Callable,
     fields: Mapping[str, str],
     outputs: Mapping[str, str],
-    source_fields: Mapping[str, str],
-    user: User,
     objective_id: str,
-    filter_by: Mapping[str, List[str]],
-) -> Mapping[str, Any]:
-    # Get credentials
-    storage_creds = get_aws_secret(
-        tag=user.storage_tag, secret_type="storage", user_id=user.id
-    )
-    read = partial(
-        SOURCE_TAG_TO_READER[user.storage_tag],
-        bucket_name=user.storage_bucket_name,
-        file_ext="parquet",
-        **storage_creds,
-    )
-
+) -> pl.LazyFrame:
     # Read artifacts
     forecast = read(object_path=outputs["forecasts"]["best_models"])
     quantiles = read(object_path=outputs["quantiles"]["best_models"])
     y_baseline = read(object_path=outputs["y_baseline"])
 
-    agg_method = source_fields.get("agg_method", "sum")
     entity_col, time_col, target_col = forecast.columns
     idx_cols = entity_col, time_col
 
@@ -378,8 +427,46 @@ def _get_forecast_table_view(
                 .alias("plan"),
             ]
         )
-        .rename({entity_col: "entity"})
+        .sort(idx_cols)
+    )
+    return rows
+
+
+def _get_forecast_table_view(
+    fields: Mapping[str, str],
+    outputs: Mapping[str, str],
+    source_fields: Mapping[str, str],
+    user: User,
+    objective_id: str,
+    filter_by: Mapping[str, List[str]],
+    format: TableFormat = TableFormat.rows,
+) -> Union[Mapping[str, Any], bytes]:
+    # Get credentials
+    storage_creds = get_aws_secret(
+        tag=user.storage_tag, secret_type="storage", user_id=user.id
     )
+    read = partial(
+        SOURCE_TAG_TO_READER[user.storage_tag],
+        bucket_name=user.storage_bucket_name,
+        file_ext="parquet",
+        **storage_creds,
+    )
+
+    # Read serving table view rows materialised by the forecast flow if available
+    serving = outputs.get("serving", {})
+    if "table_view" in serving:
+        rows = read(object_path=serving["table_view"]).lazy()
+    else:
+        rows = _create_forecast_table_rows(
+            read=read,
+            fields=fields,
+            outputs=outputs,
+            objective_id=objective_id,
+        )
+
+    agg_method = source_fields.get("agg_method", "sum")
+    entity_col, time_col = rows.columns[:2]
+    rows = rows.rename({entity_col: "entity"})
 
     # Filter by specific columns
     if filter_by:
@@ -388,20 +475,14 @@ def _get_forecast_table_view(
         filter_expr = reduce(lambda x, y: x & y, expr)
         rows = rows.filter(filter_expr)
 
-    # Split entity cols and process data after filter
-    entity_cols = entity_col.split("__")
+    # Join entity levels from the entity dimension table after filter
+    rows = rows.rename({"entity": entity_col})
+    entities = _read_entities(
+        read=read, object_path=outputs.get("entities"), load_panel=lambda: rows
+    )
+    entity_cols = _get_entity_levels(entities)
     rows = (
-        rows.rename({"entity": entity_col})
-        # Split entity cols
-        .with_columns(
-            pl.col(entity_col)
-            .cast(pl.Utf8)
-            .str.split_exact(" - ", len(entity_cols))
-            .struct.rename_fields(entity_cols)
-            .alias("entities")
-        )
-        .drop(entity_col)
-        .unnest("entities")
+        rows.pipe(_split_entities, entities=entities)
         .sort([*entity_cols, time_col])
         .select(
             [
@@ -442,11 +523,7 @@ def _get_forecast_table_view(
         for col, dtype in rows.schema.items()
     ]
 
-    response = {
-        "columns": columns,
-        "rows": rows.with_row_count("id").to_dicts(),
-        "group_by": entity_cols,
-    }
+    response = format_table(rows, format, columns=columns, group_by=entity_cols)
     return response
 
 
@@ -473,75 +550,106 @@ class TableResponse(BaseModel):
 class TableParams(BaseModel):
     filter_by: Mapping[str, List[str]] = None
     entities_keywords: List[str] = None
+    keywords_operator: Literal["or", "and"] = "or"
+    keywords_prefix: bool = False
     page: int
     display_n: int
 
 
 class TableViewParams(BaseModel):
     filter_by: Mapping[str, List[str]] = None
+    format: TableFormat = TableFormat.rows
+
+
+def _get_table_rows(getter: Callable, **kwargs) -> Tuple[pl.DataFrame, int]:
+    # The string cache is scoped to the worker, toggling it globally would
+    # turn it off under concurrent requests
+    with pl.StringCache():
+        return getter(**kwargs)
 
 
 @router.post("/tables/{objective_id}/{table_tag}")
-def get_objective_table(
-    params: TableParams, objective_id: str, table_tag: TableTag
+async def get_objective_table(
+    params: TableParams,
+    objective_id: str,
+    table_tag: TableTag,
+    request: Request = None,
 ) -> TableResponse:
     if params.page < 1:
         raise ValueError("`page` must be an integer greater than 0")
 
-    objective = get_objective(objective_id)["objective"]
+    objective, user, source = await run_io(_get_objective_context, objective_id)
     getter = TAGS_TO_GETTER[objective.tag][table_tag]
-    engine = create_sql_engine()
-    with Session(engine) as session:
-        user = session.get(User, objective.user_id)
-
-    source = get_source(json.loads(objective.sources)["panel"])["source"]
-    # TODO: Cache using an in memory key-value store
-    pl.toggle_string_cache(True)
-    table = getter(
-        fields=json.loads(objective.fields),
-        outputs=json.loads(objective.outputs),
-        source_fields=json.loads(source.data_fields),
-        user=user,
-        objective_id=objective_id,
-        filter_by=params.filter_by,
-        entities_keywords=params.entities_keywords
-    ).collect(streaming=True)
-    pl.toggle_string_cache(False)
-
-    start = params.display_n * (params.page - 1)
-    end = params.display_n * params.page
-    max_page = int(np.ceil(table.get_column("entity").n_unique() / params.display_n))
-    filtered_table = {
-        "pagination": {
-            "current": params.page,
-            "end": max_page,
-        },
-        "results": table[start:end].to_dicts(),
-    }
+    outputs = json.loads(objective.outputs)
+
+    async def build():
+        await _prefetch_artifacts(user, [outputs.get("serving", {}).get("table")])
+        rows, n_entities = await run_io(
+            _get_table_rows,
+            getter,
+            fields=json.loads(objective.fields),
+            outputs=outputs,
+            source_fields=json.loads(source.data_fields),
+            user=user,
+            objective_id=objective_id,
+            filter_by=params.filter_by,
+            entities_keywords=params.entities_keywords,
+            keywords_operator=params.keywords_operator,
+            keywords_prefix=params.keywords_prefix,
+            page=params.page,
+            display_n=params.display_n,
+        )
 
-    return filtered_table
+        max_page = int(np.ceil(n_entities / params.display_n))
+        filtered_table = {
+            "pagination": {
+                "current": params.page,
+                "end": max_page,
+            },
+            "results": rows.to_dicts(),
+        }
+        return filtered_table
+
+    return await cached_response(
+        request, objective, f"tables/{table_tag.value}", params.dict(), build
+    )
 
 
 @router.post("/tables/{objective_id}/{table_tag}/table_view")
-def get_objective_table_view(
-    params: TableViewParams, objective_id: str, table_tag: TableTag
+async def get_objective_table_view(
+    params: TableViewParams,
+    objective_id: str,
+    table_tag: TableTag,
+    request: Request = None,
 ) -> Mapping[str, List[Union[Mapping[str, Any], str]]]:
-    objective = get_objective(objective_id)["objective"]
+    objective, user, source = await run_io(_get_objective_context, objective_id)
     table_view = TAGS_TO_TABLE_VIEW[objective.tag][table_tag]
+    outputs = json.loads(objective.outputs)
 
-    engine = create_sql_engine()
-    with Session(engine) as session:
-        user = session.get(User, objective.user_id)
-
-    source = get_source(json.loads(objective.sources)["panel"])["source"]
-    response = table_view(
-        fields=json.loads(objective.fields),
-        outputs=json.loads(objective.outputs),
-        source_fields=json.loads(source.data_fields),
-        user=user,
-        objective_id=objective_id,
-        filter_by=params.filter_by,
-    )
-    return response
-
+    async def build():
+        await _prefetch_artifacts(
+            user,
+            [outputs.get("serving", {}).get("table_view"), outputs.get("entities")],
+        )
+        return await run_io(
+            table_view,
+            fields=json.loads(objective.fields),
+            outputs=outputs,
+            source_fields=json.loads(source.data_fields),
+            user=user,
+            objective_id=objective_id,
+            filter_by=params.filter_by,
+            format=params.format,
+        )
 
+    media_type = "application/json"
+    if params.format == TableFormat.arrow:
+        media_type = ARROW_STREAM_MEDIA_TYPE
+    return await cached_response(
+        request,
+        objective,
+        f"tables/{table_tag.value}/table_view",
+        params.dict(),
+        build,
+        media_type=media_type,
+    )
@@ -1,8 +1,10 @@
 import json
 
+import orjson
 from fastapi import WebSocket
 
 from indexhub.api.routers import unprotected_router
+from indexhub.api.services.serialization import encode_json
 
 
 @unprotected_router.websocket("/test/sources/ws")
@@ -15,4 +17,8 @@ async def ws_get_sources(websocket: WebSocket):
             response = json.load(f)
         else:
             response = {"error": "User id not provided"}
-        await websocket.send_text(json.dumps(response, default=str))
+        await websocket.send_text(
+            encode_json(
+                response, default=str, option=orjson.OPT_PASSTHROUGH_DATETIME
+            ).decode()
+        )
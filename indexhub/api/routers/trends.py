@@ -1,20 +1,28 @@
 import json
 import logging
 from functools import partial
-from typing import Callable, Mapping, Optional
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
 
-import altair as alt
 import polars as pl
+from cacheout import Cache
+from fastapi import HTTPException, Query
 from pydantic import BaseModel
-from sqlmodel import Session
+from sqlmodel import Session, select
 
 from indexhub.api.db import create_sql_engine
 from indexhub.api.demos import DEMO_BUCKET, DEMO_SCHEMAS
+from indexhub.api.models.objective import Objective
 from indexhub.api.models.user import User
 from indexhub.api.routers import router
-from indexhub.api.routers.objectives import get_objective
-from indexhub.api.services.io import SOURCE_TAG_TO_READER
+from indexhub.api.routers.objectives import _get_objective_context, get_objective
+from indexhub.api.services.chart_specs import (
+    VEGA_LITE_SCHEMA,
+    dump_spec,
+    vega_lite_values,
+)
+from indexhub.api.services.io import SOURCE_TAG_TO_READER, _single_flight
 from indexhub.api.services.secrets_manager import get_aws_secret
+from indexhub.api.services.vectors import _make_vectors_path, get_similarity_index
 
 
 def _logger(name, level=logging.INFO):
@@ -33,6 +41,9 @@ logger = _logger(name=__name__)
 
 pl.toggle_string_cache(True)
 
+# Public trends metadata and trend data indexed by entity per demo dataset
+TRENDS_CACHE = Cache(maxsize=len(DEMO_SCHEMAS) + 1, ttl=3000)
+
 
 def _load_trend_datasets(
     read: Callable,
@@ -51,17 +62,14 @@ def _load_trend_datasets(
     return actual, forecasts, quantiles, backtests
 
 
-def _create_trend_data(
+def _join_trend_data(
     actual: pl.DataFrame,
     forecasts: pl.DataFrame,
     quantiles: pl.DataFrame,
     backtests: pl.DataFrame,
-    entity_id: str,
     quantile_lower: int = 10,
     quantile_upper: int = 90,
-    display_length: int = 24,
 ) -> pl.DataFrame:
-    # pl.toggle_string_cache(True)
     entity_col, time_col, target_col = forecasts.columns
     actual = actual.rename({target_col: "actual"})
     quantiles_lower = (
@@ -84,23 +92,119 @@ def _create_trend_data(
         )
         .join(quantiles_lower, on=[entity_col, time_col], how="outer")
         .join(quantiles_upper, on=[entity_col, time_col], how="outer")
-        .filter(pl.col(entity_col) == entity_id)
-        .drop(entity_col)
-        .sort(time_col)
         # Round all floats to 2 decimal places
         # NOTE: Rounding not working for Float32
         .with_columns(pl.col([pl.Float64, pl.Float32]).cast(pl.Float64).round(2))
     )
+    return chart_data
 
-    if len(chart_data) > display_length:
-        chart_data = chart_data.tail(display_length)
 
-    # pl.toggle_string_cache(False)
+def _create_trend_data(
+    actual: pl.DataFrame,
+    forecasts: pl.DataFrame,
+    quantiles: pl.DataFrame,
+    backtests: pl.DataFrame,
+    entity_id: str,
+    quantile_lower: int = 10,
+    quantile_upper: int = 90,
+    display_length: int = 24,
+) -> pl.DataFrame:
+    entity_col, time_col, _ = forecasts.columns
+    chart_data = (
+        _join_trend_data(
+            actual.filter(pl.col(entity_col) == entity_id),
+            forecasts.filter(pl.col(entity_col) == entity_id),
+            quantiles.filter(pl.col(entity_col) == entity_id),
+            backtests.filter(pl.col(entity_col) == entity_id),
+            quantile_lower=quantile_lower,
+            quantile_upper=quantile_upper,
+        )
+        .drop(entity_col)
+        .sort(time_col)
+        .tail(display_length)
+    )
     logger.info("Created trend data")
     return chart_data
 
 
-def _create_trend_chart(chart_data: pl.DataFrame):
+def _index_trend_data(
+    actual: pl.DataFrame,
+    forecasts: pl.DataFrame,
+    quantiles: pl.DataFrame,
+    backtests: pl.DataFrame,
+    display_length: int = 24,
+) -> Dict[str, pl.DataFrame]:
+    """Trend data of every entity keyed by entity, as `_create_trend_data`."""
+    entity_col, time_col, _ = forecasts.columns
+    chart_data = (
+        _join_trend_data(actual, forecasts, quantiles, backtests)
+        .sort([entity_col, time_col])
+        .groupby(entity_col, maintain_order=True)
+        .tail(display_length)
+    )
+    return {
+        str(entity_id): data.drop(entity_col)
+        for entity_id, data in chart_data.partition_by(entity_col, as_dict=True).items()
+    }
+
+
+def _get_public_trend_data(dataset_id: str) -> Dict[str, pl.DataFrame]:
+    """Get the cached trend data of a public dataset, loading it on a miss."""
+    if dataset_id not in DEMO_SCHEMAS:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    key = f"trend_data:{dataset_id}"
+    trend_data = TRENDS_CACHE.get(key)
+    if trend_data is None:
+
+        def load():
+            read = partial(
+                SOURCE_TAG_TO_READER["s3"],
+                bucket_name=DEMO_BUCKET,
+                file_ext="parquet",
+            )
+            trend_datasets = _load_trend_datasets(read, DEMO_SCHEMAS[dataset_id])
+            trend_data = _index_trend_data(*trend_datasets)
+            TRENDS_CACHE.set(key, trend_data)
+            logger.info(f"Indexed trend data: {dataset_id}")
+            return trend_data
+
+        # Concurrent misses share one load
+        trend_data = _single_flight(key, load)
+    return trend_data
+
+
+def _get_public_trends() -> Dict[str, Any]:
+    trends = TRENDS_CACHE.get("metadata")
+    if trends is None:
+        read = partial(
+            SOURCE_TAG_TO_READER["s3"],
+            bucket_name=DEMO_BUCKET,
+            file_ext="json",
+        )
+        trends = {}
+        for dataset_id, schema in DEMO_SCHEMAS.items():
+            # Read metadata from schema
+            metadata_path = schema["metadata"]
+            metadata = dict(read(object_path=metadata_path))
+            metadata.pop("dataset_id", None)  # Silently drop dataset_id
+            trends[dataset_id] = metadata
+        TRENDS_CACHE.set("metadata", trends)
+    return trends
+
+
+def warm_public_trends():
+    """Preload the public trends metadata and trend data of every dataset."""
+    try:
+        _get_public_trends()
+        for dataset_id in DEMO_SCHEMAS:
+            _get_public_trend_data(dataset_id)
+        logger.info("Warmed public trends")
+    except Exception as exc:
+        # Warming is best effort, requests load the datasets on first use
+        logger.exception(f"Error warming public trends: {exc}")
+
+
+def _create_trend_chart(chart_data: pl.DataFrame) -> Dict[str, Any]:
     time_col = chart_data.columns[0]
 
     # Get trend direction
@@ -115,81 +219,101 @@ def _create_trend_chart(chart_data: pl.DataFrame):
     min_value = chart_data.select(chart_data.columns[1:]).min().min(axis=1)[0]
     max_value = chart_data.select(chart_data.columns[1:]).max().max(axis=1)[0]
 
-    # Create chart
-    pd_chart_df = chart_data.to_pandas()
-
-    actual_line = (
-        alt.Chart(pd_chart_df)
-        .mark_line(color="gray")
-        .encode(
-            x=alt.X(
-                f"{time_col}:T",
-                axis=alt.Axis(labelAngle=45, format="%Y-%b"),
-                title="Time",
-            ),
-            y=alt.Y(
-                "actual:Q",
-                title=None,
-                scale=alt.Scale(domain=(min_value, max_value)),
-                axis=None,
-            ),
-        )
-    )
-
-    forecast_line = (
-        alt.Chart(pd_chart_df)
-        .mark_line(color=direction)
-        .encode(
-            x=f"{time_col}:T",
-            y="target:Q",
-        )
-    )
-
-    area = (
-        alt.Chart(pd_chart_df)
-        .mark_area(opacity=0.3)
-        .encode(x=f"{time_col}:T", y="10%:Q", y2="90%:Q")
-    )
+    # Create Vega-Lite spec
+    x = {"field": time_col, "type": "temporal"}
+    target = {"field": "target", "type": "quantitative"}
+    actual_line = {
+        "mark": {"type": "line", "color": "gray"},
+        "encoding": {
+            "x": {
+                **x,
+                "axis": {"format": "%Y-%b", "labelAngle": 45},
+                "title": "Time",
+            },
+            "y": {
+                "field": "actual",
+                "type": "quantitative",
+                "axis": None,
+                "scale": {"domain": [min_value, max_value]},
+                "title": None,
+            },
+        },
+    }
+    forecast_line = {
+        "mark": {"type": "line", "color": direction},
+        "encoding": {"x": x, "y": target},
+    }
+    area = {
+        "mark": {"type": "area", "opacity": 0.3},
+        "encoding": {
+            "x": x,
+            "y": {"field": "10%", "type": "quantitative"},
+            "y2": {"field": "90%"},
+        },
+    }
 
     # Create a selection that chooses the nearest point & selects based on x-value
-    nearest = alt.selection(
-        type="single", nearest=True, on="mouseover", fields=[time_col], empty="none"
-    )
-
+    nearest = "nearest"
     # Transparent selectors across the chart. This is what tells us
     # the x-value of the cursor
-    selectors = (
-        alt.Chart(pd_chart_df)
-        .mark_point()
-        .encode(
-            x=f"{time_col}:T",
-            opacity=alt.value(0),
-        )
-        .add_selection(nearest)
-    )
-
+    selectors = {
+        "name": "selectors",
+        "mark": {"type": "point"},
+        "encoding": {"x": x, "opacity": {"value": 0}},
+    }
+    # Draw a rule at the location of the selection
+    rules = {
+        "mark": {"type": "rule", "color": "gray"},
+        "encoding": {"x": x},
+        "transform": [{"filter": {"param": nearest, "empty": False}}],
+    }
     # Draw points on the line, and highlight based on selection
-    forecast_points = forecast_line.mark_point().encode(
-        opacity=alt.condition(nearest, alt.value(1), alt.value(0))
-    )
-
+    forecast_points = {
+        "mark": {"type": "point"},
+        "encoding": {
+            "x": x,
+            "y": target,
+            "opacity": {
+                "condition": {"param": nearest, "empty": False, "value": 1},
+                "value": 0,
+            },
+        },
+    }
     # Draw text labels near the points, and highlight based on selection
-    forecast_text = forecast_line.mark_text(
-        color="#101010", align="left", dx=5, dy=-5
-    ).encode(text=alt.condition(nearest, "target:Q", alt.value(" ")))
-
-    # Draw a rule at the location of the selection
-    rules = (
-        alt.Chart(pd_chart_df)
-        .mark_rule(color="gray")
-        .encode(
-            x=f"{time_col}:T",
-        )
-        .transform_filter(nearest)
-    )
+    forecast_text = {
+        "mark": {
+            "type": "text",
+            "align": "left",
+            "color": "#101010",
+            "dx": 5,
+            "dy": -5,
+        },
+        "encoding": {
+            "x": x,
+            "y": target,
+            "text": {
+                "condition": {"param": nearest, "empty": False, **target},
+                "value": " ",
+            },
+        },
+    }
 
-    chart = (
-        alt.layer(
+    chart = {
+        "$schema": VEGA_LITE_SCHEMA,
+        "data": vega_lite_values(chart_data),
+        "params": [
+            {
+                "name": nearest,
+                "select": {
+                    "type": "point",
+                    "fields": [time_col],
+                    "nearest": True,
+                    "on": "mouseover",
+                },
+                "views": [selectors["name"]],
+            }
+        ],
+        "layer": [
             actual_line,
             forecast_line,
             area,
@@ -197,12 +321,15 @@ def _create_trend_chart(chart_data: pl.DataFrame):
             rules,
             forecast_points,
             forecast_text,
-        )
-        .configure(font="Inter")
-        .configure_axis(grid=False)
-        .configure_view(strokeWidth=0)
-        .properties(height=100, width="container")
-    )
+        ],
+        "config": {
+            "font": "Inter",
+            "axis": {"grid": False},
+            "view": {"continuousWidth": 300, "continuousHeight": 300, "strokeWidth": 0},
+        },
+        "height": 100,
+        "width": "container",
+    }
     logger.info("Created trend chart")
     return chart
 
@@ -211,6 +338,38 @@ class EmbeddingsParams(BaseModel):
     dim_size: Optional[int] = 3
 
 
+def _create_embs_spec(data: pl.DataFrame, entity_col: str, dim_size: int):
+    # Return spec for scatter gl
+    # TODO: Replace labels with cluster IDs and add entities field
+    spec = {
+        "ids": list(range(len(data))),
+        "clusters": list(range(len(data))),
+        "entityIds": data.get_column(entity_col).to_list(),
+        "projections": data.get_column(f"emb(n={dim_size})").to_list(),
+    }
+    return spec
+
+
+def _get_private_embs_loader(objective_id: int) -> Tuple[Callable, str, str]:
+    """Reader, cache key and version of the panel source embeddings of an objective."""
+    _, user, source = _get_objective_context(objective_id)
+    storage_creds = get_aws_secret(
+        tag=user.storage_tag, secret_type="storage", user_id=user.id
+    )
+    # Embeddings are written under the prefix of the source object path
+    object_path = json.loads(source.conn_fields).get("object_path") or ""
+    prefix = object_path.split("/")[0] if "/" in object_path else ""
+    path = _make_vectors_path(source.id, prefix)
+    load_embs = partial(
+        SOURCE_TAG_TO_READER[user.storage_tag],
+        bucket_name=user.storage_bucket_name,
+        object_path=path,
+        file_ext="lance",
+        **storage_creds,
+    )
+    return load_embs, f"{user.storage_bucket_name}/{path}", str(source.updated_at)
+
+
 @router.post("/trends/public/vectors/{dataset_id}")
 def get_public_embs(dataset_id: str, params: EmbeddingsParams):
     dim_size = params.dim_size
@@ -224,20 +383,53 @@ def get_public_embs(dataset_id: str, params: EmbeddingsParams):
     data = read(
         object_path=path, columns=[entity_col, f"emb(n={dim_size})", "cluster_id"]
     )
-    # Return spec for scatter gl
-    # TODO: Replace labels with cluster IDs and add entities field
-    spec = {
-        "ids": list(range(len(data))),
-        "clusters": list(range(len(data))),
-        "entityIds": data.get_column(entity_col).to_list(),
-        "projections": data.get_column(f"emb(n={dim_size})").to_list(),
-    }
-    return spec
+    return _create_embs_spec(data, entity_col=entity_col, dim_size=dim_size)
 
 
 @router.get("/trends/private/vectors/{objective_id}")
 def get_private_embs(objective_id: int, dim_size: int = 3):
-    pass
+    load_embs, _, _ = _get_private_embs_loader(objective_id)
+    data = load_embs()
+    return _create_embs_spec(data, entity_col=data.columns[0], dim_size=dim_size)
+
+
+@router.get("/trends/public/similar/{dataset_id}/{entity_id}")
+def get_public_similar_trends(
+    dataset_id: str, entity_id: str, k: int = Query(10, ge=1, le=100)
+):
+    """Retrieve the `k` entities with the most similar trends to `entity_id`.
+
+    Returns:
+        dict: The nearest entities by embedding distance, nearest first.
+
+        Example:
+        {
+            "entity_id": str,
+            "similar": [{"entity_id": str, "distance": float}, ...]
+        }
+    """
+    if dataset_id not in DEMO_SCHEMAS:
+        raise HTTPException(status_code=404, detail="Dataset not found")
+    schema = DEMO_SCHEMAS[dataset_id]
+    load_embs = partial(
+        SOURCE_TAG_TO_READER["s3"],
+        bucket_name=DEMO_BUCKET,
+        object_path=schema["vectors"],
+        file_ext="lance",
+    )
+    index = get_similarity_index(
+        f"{DEMO_BUCKET}/{schema['vectors']}", load_embs, entity_col=schema["entity_col"]
+    )
+    return {"entity_id": entity_id, "similar": index.search(entity_id, k=k)}
+
+
+@router.get("/trends/private/similar/{objective_id}/{entity_id}")
+def get_private_similar_trends(
+    objective_id: int, entity_id: str, k: int = Query(10, ge=1, le=100)
+):
+    load_embs, key, version = _get_private_embs_loader(objective_id)
+    index = get_similarity_index(key, load_embs, version=version)
+    return {"entity_id": entity_id, "similar": index.search(entity_id, k=k)}
 
 
 @router.get("/trends/public")
@@ -256,44 +448,31 @@ def list_public_trends():
             ...
         }
     """
-    read = partial(
-        SOURCE_TAG_TO_READER["s3"],
-        bucket_name=DEMO_BUCKET,
-        file_ext="json",
-    )
-    trends = {}
-    for dataset_id, schema in DEMO_SCHEMAS.items():
-        # Read metadata from schema
-        metadata_path = schema["metadata"]
-        metadata = read(object_path=metadata_path)
-        metadata.pop("dataset_id", None)    # Silently drop dataset_id
-        trends[dataset_id] = metadata
-    return trends
+    return _get_public_trends()
 
 
 @router.get("/trends/private")
 def lsit_private_trends(user_id: str):
-    pass
+    """Retrieve the objectives of a user with trends to explore."""
+    engine = create_sql_engine()
+    with Session(engine) as session:
+        query = select(Objective).where(
+            Objective.user_id == user_id, Objective.status == "SUCCESS"
+        )
+        objectives = session.exec(query).all()
+    trends = {
+        str(objective.id): {"dataset_name": objective.name} for objective in objectives
+    }
+    return trends
 
 
 @router.get("/trends/public/charts/{dataset_id}/{entity_id}")
 def get_public_trend_chart(dataset_id: str, entity_id: str):
-    # pl.toggle_string_cache(True)
-    read = partial(
-        SOURCE_TAG_TO_READER["s3"],
-        bucket_name=DEMO_BUCKET,
-        file_ext="parquet",
-    )
-    # Read artifacts
-    paths = DEMO_SCHEMAS[dataset_id]
-    trend_datasets = _load_trend_datasets(read, paths)
-    chart_data = _create_trend_data(
-        *trend_datasets,
-        entity_id=entity_id,
-    )
+    chart_data = _get_public_trend_data(dataset_id).get(entity_id)
+    if chart_data is None:
+        raise HTTPException(status_code=404, detail="Entity not found")
     # Create chart
-    chart = _create_trend_chart(chart_data).to_json()
-    # pl.toggle_string_cache(False)
+    chart = dump_spec(_create_trend_chart(chart_data))
     return chart
 
 
@@ -327,5 +506,5 @@ def get_private_trend_chart(objective_id: int, entity_id: str):
             entity_id=entity_id,
         )
         # Create chart
-        chart = _create_trend_chart(chart_data).to_json()
+        chart = dump_spec(_create_trend_chart(chart_data))
     return chart
@@ -10,6 +10,7 @@ from indexhub.api.routers import router
 from indexhub.api.routers.objectives import get_objective
 from indexhub.api.routers.plans import update_rolling_forecast
 from indexhub.api.services.io import SOURCE_TAG_TO_READER, STORAGE_TAG_TO_WRITER
+from indexhub.api.services.response_cache import RESPONSE_CACHE
 from indexhub.api.services.secrets_manager import get_aws_secret
 
 
@@ -101,4 +102,6 @@ def upload_plan(objective_id: str, filename: str, csv_content: str):
         )
 
     pl.toggle_string_cache(False)
+    # Plan and rolling forecast artifacts changed without a new objective run
+    RESPONSE_CACHE.invalidate(objective.id)
     return csv_path
@@ -0,0 +1,85 @@
+import asyncio
+import json
+import logging
+from typing import Any, Mapping, Optional, Set
+
+from fastapi import BackgroundTasks
+
+from indexhub.api.models.objective import Objective
+from indexhub.api.routers import router
+from indexhub.api.routers.objectives import (
+    _get_objective_context,
+    _prefetch_artifacts,
+)
+from indexhub.api.routers.stats import get_stats
+from indexhub.api.routers.tables import TableParams, TableTag, get_objective_table
+from indexhub.api.services.changes import CHANGE_FEED
+from indexhub.api.services.io import run_io
+
+
+def _logger(name, level=logging.INFO):
+    logger = logging.getLogger(name)
+    handler = logging.StreamHandler()
+    handler.setFormatter(
+        logging.Formatter("%(levelname)s: %(asctime)s: %(name)s  %(message)s")
+    )
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False  # Prevent the modal client from double-logging.
+    return logger
+
+
+logger = _logger(name=__name__)
+
+# First page of the AI recommendation table as requested by the dashboard
+WARMUP_TABLE_PARAMS = TableParams(page=1, display_n=5)
+
+# Warming tasks in progress, referenced so they are not garbage collected
+_WARMING: Set[asyncio.Task] = set()
+
+
+async def warm_objective(objective_id: str):
+    """Preload serving artifacts and precompute `/stats` and the first table page."""
+    try:
+        objective, user, _ = await run_io(_get_objective_context, objective_id)
+        if objective.status != "SUCCESS":
+            return
+        outputs = json.loads(objective.outputs)
+        serving = outputs.get("serving", {})
+        await _prefetch_artifacts(
+            user,
+            [
+                serving.get("table"),
+                serving.get("table_view"),
+                serving.get("chart_cube") or serving.get("chart"),
+                outputs.get("entities"),
+            ],
+        )
+        await get_stats(objective_id)
+        await get_objective_table(WARMUP_TABLE_PARAMS, objective_id, TableTag.forecast)
+        logger.info(f"Warmed cache for objective: {objective_id}")
+    except Exception as exc:
+        # Warming is best effort, the dashboard falls back to cold reads
+        logger.exception(f"Error warming objective {objective_id}: {exc}")
+
+
+def _on_objective_change(change: Mapping[str, Any], objective: Optional[Objective]):
+    # Forecast runs notify the change of their objective once completed
+    if change["op"] == "update" and objective and objective.status == "SUCCESS":
+        task = asyncio.get_running_loop().create_task(warm_objective(str(objective.id)))
+        _WARMING.add(task)
+        task.add_done_callback(_WARMING.discard)
+
+
+def warm_completed_objectives():
+    """Warm the cache of objectives as their forecast runs complete.
+
+    Must be called from the event loop, e.g. on startup.
+    """
+    CHANGE_FEED.add_listener(Objective.__tablename__, _on_objective_change)
+
+
+@router.post("/objectives/{objective_id}/warm", status_code=202)
+async def notify_objective_ready(objective_id: str, background_tasks: BackgroundTasks):
+    background_tasks.add_task(warm_objective, objective_id)
+    return {"ok": True}
@@ -2,9 +2,13 @@
 """
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
-from indexhub.api.routers import trends, users, objectives, sources, readers, charts, tables, stats, tests, plans, integrations, inventory, router, unprotected_router
+from indexhub.api.routers import trends, users, objectives, sources, readers, charts, tables, stats, tests, plans, integrations, inventory, exports, warmup, router, unprotected_router
+from indexhub.api.routers.trends import warm_public_trends
+from indexhub.api.routers.warmup import warm_completed_objectives
+from indexhub.api.services.io import IO_EXECUTOR
 
 from .db import create_db_tables
 
@@ -14,7 +18,7 @@ def root():
     return {"message": "✅"}
 
 
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse)
 app.include_router(unprotected_router)
 app.include_router(router)
 
@@ -36,5 +40,8 @@ app.add_middleware(
 
 
 @app.on_event("startup")
-def on_startup():
+async def on_startup():
     create_db_tables()
+    # Load the public trends in the background, requests load them on a miss
+    IO_EXECUTOR.submit(warm_public_trends)
+    warm_completed_objectives()
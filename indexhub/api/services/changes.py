@@ -0,0 +1,290 @@
+import asyncio
+import contextlib
+import json
+import logging
+import selectors
+import threading
+import time
+from collections import defaultdict
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+)
+
+import orjson
+import psycopg2
+from fastapi import WebSocket, WebSocketDisconnect
+from sqlalchemy import func
+from sqlmodel import Session, SQLModel, select
+
+from indexhub.api.db import create_sql_engine, get_psql_uri
+from indexhub.api.models.objective import Objective
+from indexhub.api.models.source import Source
+from indexhub.api.services.io import run_io
+from indexhub.api.services.serialization import encode_json
+
+
+def _logger(name, level=logging.INFO):
+    logger = logging.getLogger(name)
+    handler = logging.StreamHandler()
+    handler.setFormatter(
+        logging.Formatter("%(levelname)s: %(asctime)s: %(name)s  %(message)s")
+    )
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False  # Prevent the modal client from double-logging.
+    return logger
+
+
+logger = _logger(name=__name__)
+
+CHANNEL = "indexhub_changes"
+# Seconds to wait for notifications before checking the connection again
+LISTEN_TIMEOUT = 5
+
+TABLE_TO_MODEL = {model.__tablename__: model for model in (Objective, Source)}
+
+
+def notify_change(session: Session, row: SQLModel, op: str = "update"):
+    """Notify listeners of the change to `row` once `session` commits.
+
+    Only the row key is sent (NOTIFY payloads are limited to 8000 bytes),
+    listeners load the changed row themselves.
+    """
+    # Flush to assign the id of new rows
+    session.flush()
+    payload = json.dumps(
+        {
+            "table": row.__tablename__,
+            "id": row.id,
+            "user_id": str(row.user_id),
+            "op": op,
+        }
+    )
+    session.exec(select(func.pg_notify(CHANNEL, payload)))
+
+
+class ChangeFeed:
+    """Fan out row change notifications to subscribers in this process.
+
+    A daemon thread LISTENs on `CHANNEL`. Each changed row is loaded once
+    and pushed to every subscriber of its table and user as `(id, row)`,
+    where `row` is None for deleted rows. `None` is pushed after the
+    connection is re-established, as changes may have been missed.
+    Listeners are called with `(change, row)` for every change to their
+    table, whether or not there are subscribers.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[Tuple[str, str], Set[asyncio.Queue]] = defaultdict(set)
+        self._listeners: Dict[str, List[Callable]] = defaultdict(list)
+        # Publishing tasks in progress, referenced so they are not garbage collected
+        self._tasks: Set[asyncio.Task] = set()
+        self._last_task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def _start(self):
+        if self._thread is None:
+            self._loop = asyncio.get_running_loop()
+            self._thread = threading.Thread(target=self._listen, daemon=True)
+            self._thread.start()
+
+    def _listen(self):
+        reconnect = False
+        while True:
+            conn = None
+            try:
+                conn = psycopg2.connect(get_psql_uri())
+                conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {CHANNEL};")
+                logger.info(f"Listening for changes on channel: {CHANNEL}")
+                if reconnect:
+                    self._loop.call_soon_threadsafe(self._resync)
+                reconnect = True
+                with selectors.DefaultSelector() as selector:
+                    selector.register(conn, selectors.EVENT_READ)
+                    while True:
+                        if not selector.select(LISTEN_TIMEOUT):
+                            continue
+                        conn.poll()
+                        while conn.notifies:
+                            payload = conn.notifies.pop(0).payload
+                            self._loop.call_soon_threadsafe(self._dispatch, payload)
+            except Exception as exc:
+                logger.exception(f"Change feed connection lost: {exc}")
+                time.sleep(LISTEN_TIMEOUT)
+            finally:
+                if conn is not None:
+                    conn.close()
+
+    def _resync(self):
+        for queues in self._subscribers.values():
+            for queue in queues:
+                queue.put_nowait(None)
+
+    def _dispatch(self, payload: str):
+        change = json.loads(payload)
+        key = (change["table"], change["user_id"])
+        if self._subscribers.get(key) or self._listeners.get(change["table"]):
+            task = self._loop.create_task(
+                self._publish(key, change, previous=self._last_task)
+            )
+            self._last_task = task
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _publish(
+        self,
+        key: Tuple[str, str],
+        change: Mapping[str, Any],
+        previous: Optional[asyncio.Task] = None,
+    ):
+        row = None
+        error = None
+        if change["op"] != "delete":
+            try:
+                row = await run_io(_load_row, change["table"], change["id"])
+            except Exception as exc:
+                error = exc
+        # Rows are loaded concurrently but changes are published in order
+        if previous is not None:
+            await asyncio.wait({previous})
+        if error is not None:
+            logger.error(f"Error loading changed row {change}: {error}", exc_info=error)
+            return
+        for queue in self._subscribers.get(key, ()):
+            queue.put_nowait((change["id"], row))
+        for listener in self._listeners.get(change["table"], ()):
+            try:
+                listener(change, row)
+            except Exception as exc:
+                logger.exception(f"Error in change listener {listener}: {exc}")
+
+    def add_listener(
+        self, table: str, listener: Callable[[Mapping[str, Any], Any], None]
+    ):
+        """Call `listener` on the event loop for every change to `table`."""
+        self._start()
+        self._listeners[table].append(listener)
+
+    @contextlib.asynccontextmanager
+    async def subscribe(self, table: str, user_id: str) -> AsyncIterator[asyncio.Queue]:
+        """Subscribe to changes of `user_id` rows in `table` for the block."""
+        self._start()
+        key = (table, str(user_id))
+        queue = asyncio.Queue()
+        self._subscribers[key].add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers[key].discard(queue)
+            if not self._subscribers[key]:
+                del self._subscribers[key]
+
+
+CHANGE_FEED = ChangeFeed()
+
+
+def _load_row(table: str, row_id: int) -> Optional[SQLModel]:
+    engine = create_sql_engine()
+    with Session(engine) as session:
+        return session.get(TABLE_TO_MODEL[table], row_id)
+
+
+def _to_values(row: SQLModel) -> Dict[str, Any]:
+    return {k: v for k, v in vars(row).items() if k != "_sa_instance_state"}
+
+
+async def _send(websocket: WebSocket, response: Mapping[str, Any]):
+    await websocket.send_text(
+        encode_json(
+            response, default=str, option=orjson.OPT_PASSTHROUGH_DATETIME
+        ).decode()
+    )
+
+
+async def serve_changes(
+    websocket: WebSocket,
+    model: Type[SQLModel],
+    key: str,
+    list_rows: Callable[..., Mapping[str, Any]],
+):
+    """Send the user's rows, then push only the rows that change.
+
+    Clients send `{"user_id": ...}` to get all rows as `{key: [...]}`, then
+    receive `{"changed": [...], "deleted": [...]}` as rows are updated.
+    Sending the request again returns all rows, requests for another user
+    close the connection.
+    """
+
+    async def send_rows(data: Mapping[str, Any]):
+        rows = await run_io(list_rows, **data)
+        await _send(websocket, {key: [_to_values(row) for row in rows[key]]})
+
+    async def push_changes(changes: asyncio.Queue, data: Mapping[str, Any]):
+        while True:
+            change = await changes.get()
+            # Batch changes queued meanwhile into one message
+            batch = [change]
+            while not changes.empty():
+                batch.append(changes.get_nowait())
+            if None in batch:
+                await send_rows(data)
+                continue
+            changed = {row_id: row for row_id, row in batch}
+            await _send(
+                websocket,
+                {
+                    "changed": [
+                        _to_values(row) for row in changed.values() if row is not None
+                    ],
+                    "deleted": [
+                        row_id for row_id, row in changed.items() if row is None
+                    ],
+                },
+            )
+
+    data = await websocket.receive_json()
+    user_id = str(data["user_id"])
+    async with CHANGE_FEED.subscribe(model.__tablename__, user_id) as changes:
+        # Subscribed before reading the rows so no change is missed
+        await send_rows(data)
+        pusher = asyncio.create_task(push_changes(changes, data))
+        receiver = None
+        try:
+            while True:
+                receiver = asyncio.create_task(websocket.receive_json())
+                await asyncio.wait(
+                    {receiver, pusher}, return_when=asyncio.FIRST_COMPLETED
+                )
+                if pusher.done():
+                    # Pushing only stops on errors
+                    exc = pusher.exception()
+                    if not isinstance(exc, WebSocketDisconnect):
+                        logger.error(
+                            f"Error pushing {key} changes: {exc}", exc_info=exc
+                        )
+                        await websocket.close(code=1011)
+                    return
+                data = receiver.result()
+                if str(data["user_id"]) != user_id:
+                    # Changes are only pushed for the subscribed user
+                    await websocket.close(code=1008)
+                    return
+                await send_rows(data)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            pusher.cancel()
+            if receiver is not None:
+                receiver.cancel()
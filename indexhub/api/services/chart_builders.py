@@ -1,7 +1,7 @@
 import itertools
 import logging
 from functools import partial, reduce
-from typing import Any, Literal, Mapping
+from typing import Any, Callable, List, Literal, Mapping, Optional
 
 import polars as pl
 from fastapi import HTTPException
@@ -11,9 +11,10 @@ from pyecharts.charts import Grid, Line, Scatter
 from indexhub.api.models.user import User
 from indexhub.api.routers.stats import AGG_METHODS
 from indexhub.api.schemas import SUPPORTED_ERROR_TYPE
+from indexhub.api.services.chart_specs import dump_spec, echarts_series
+from indexhub.api.services.entities import _get_entity_levels
 from indexhub.api.services.io import SOURCE_TAG_TO_READER
 from indexhub.api.services.secrets_manager import get_aws_secret
-from indexhub.flows.preprocess import _reindex_panel
 
 
 def _logger(name, level=logging.INFO):
@@ -30,37 +31,20 @@ def _logger(name, level=logging.INFO):
 
 logger = _logger(name=__name__)
 
+# Series of past forecast runs shown in the forecast chart
+ROLLING_SERIES = ["ai", "best_plan", "plan", "baseline"]
 
-def create_single_forecast_chart(
+
+def _create_forecast_chart_data(
+    read: Callable,
     outputs: Mapping[str, str],
-    fields: Mapping[str, str],
-    source_fields: Mapping[str, str],
-    objective_id: str,
-    user: User,
-    filter_by: Mapping[str, Any] = None,
-    agg_by: str = None,
     quantile_lower: int = 10,
     quantile_upper: int = 90,
-    **kwargs,
-):
-    pl.toggle_string_cache(True)
-    series_name_to_legend_show = {}
-    # Get credentials
-    storage_creds = get_aws_secret(
-        tag=user.storage_tag, secret_type="storage", user_id=user.id
-    )
-    read = partial(
-        SOURCE_TAG_TO_READER[user.storage_tag],
-        bucket_name=user.storage_bucket_name,
-        file_ext="parquet",
-        **storage_creds,
-    )
-
+) -> pl.DataFrame:
     # Read artifacts
     forecast = read(object_path=outputs["forecasts"]["best_models"])
     entity_col, time_col, target_col = forecast.columns
     idx_cols = entity_col, time_col
-    agg_method = source_fields.get("agg_method", "sum")
 
     backtest = read(object_path=outputs["backtests"]["best_models"]).pipe(
         lambda df: df.groupby(df.columns[:2]).agg(pl.mean(df.columns[-2]))
@@ -75,6 +59,61 @@ def create_single_forecast_chart(
         "quantile"
     )
     best_plan = read(object_path=outputs["best_plan"])
+
+    # Join actual, baseline, ai, quantiles and best plan by entity and time
+    indexhub = pl.concat([backtest, forecast]).rename({target_col: "ai"})
+    chart_data = (
+        actual.rename({target_col: "actual"})
+        .join(
+            y_baseline.rename({target_col: "baseline"}),
+            on=idx_cols,
+            how="outer",
+        )
+        .join(indexhub, on=idx_cols, how="outer")
+        # Join quantiles
+        .join(
+            quantiles_lower.rename({target_col: f"ai_{quantile_lower}"}),
+            on=idx_cols,
+            how="outer",
+        )
+        .join(
+            quantiles_upper.rename({target_col: f"ai_{quantile_upper}"}),
+            on=idx_cols,
+            how="outer",
+        )
+        .join(
+            best_plan.select(pl.all().exclude(["^fh.*$", "^use.*$"])),
+            on=idx_cols,
+            how="outer",
+        )
+        .sort(idx_cols)
+    )
+    return chart_data
+
+
+def _read_forecast_chart_data(
+    read: Callable,
+    outputs: Mapping[str, str],
+    quantile_lower: int = 10,
+    quantile_upper: int = 90,
+) -> pl.DataFrame:
+    # Read serving chart data materialised by the forecast flow if available
+    serving = outputs.get("serving", {})
+    if "chart" in serving:
+        chart_data = read(object_path=serving["chart"])
+        quantile_cols = {f"ai_{quantile_lower}", f"ai_{quantile_upper}"}
+        if quantile_cols.issubset(chart_data.columns):
+            return chart_data
+    chart_data = _create_forecast_chart_data(
+        read=read,
+        outputs=outputs,
+        quantile_lower=quantile_lower,
+        quantile_upper=quantile_upper,
+    )
+    return chart_data
+
+
+def _read_plan(read: Callable, outputs: Mapping[str, Any]) -> pl.DataFrame:
     try:
         plan = read(
             object_path=outputs["best_plan"].replace(
@@ -85,10 +124,15 @@ def create_single_forecast_chart(
         # If plan.parquet not found, use best plan as plan
         # This happens if user has not clicked on execute plan
         logger.warning("`plan.parquet` not found, use best plan as plan.")
-        plan = read(object_path=outputs["best_plan"]).rename(
-            {entity_col: "entity", "best_plan": "plan"}
+        plan = read(object_path=outputs["best_plan"]).pipe(
+            lambda df: df.rename({df.columns[0]: "entity", "best_plan": "plan"})
         )
+    return plan
+
 
+def _read_rolling_forecasts(
+    read: Callable, objective_id: str, entity_col: str, time_col: str
+) -> pl.DataFrame:
     rolling = read(
         object_path=f"artifacts/{objective_id}/rolling_forecasts.parquet",
         columns=[
@@ -103,14 +147,22 @@ def create_single_forecast_chart(
             "actual",
         ],
     ).rename({entity_col: "entity"})
+    return rolling
+
 
+def _get_historical_dates(rolling: pl.DataFrame) -> List[str]:
     # Get historical_dates from rolling forecasts parquet
     historical_dates = [
         date.strftime("%Y-%m-%d")
         for date in rolling.get_column("updated_at").unique().to_list()
     ]
+    return historical_dates
 
-    # Postproc
+
+def _pivot_rolling_forecasts(
+    rolling: pl.DataFrame, values: List[str] = ROLLING_SERIES
+) -> pl.DataFrame:
+    """Series of past runs by entity and time, named `<series>_<updated_at>`."""
     rolling_forecasts = (
         rolling.sort(["entity", "updated_at"])
         .with_columns(pl.col("updated_at").cast(pl.Date))
@@ -119,42 +171,277 @@ def create_single_forecast_chart(
         .tail(3)
         .head(2)
         .explode(pl.all().exclude(["entity", "updated_at"]))
-        .drop("actual")
+        .melt(id_vars=["entity", "time", "updated_at"], value_vars=values)
+        .with_columns(pl.format("{}_{}", "variable", "updated_at").alias("series"))
         .pivot(
-            values=["ai", "best_plan", "plan", "baseline"],
-            columns="updated_at",
+            values="value",
+            columns="series",
             index=["entity", "time"],
+            aggregate_function="first",
         )
     )
+    return rolling_forecasts
 
-    # Postproc - join data together
-    indexhub = pl.concat([backtest, forecast]).rename({target_col: "ai"})
+
+def _read_rolling_plan(
+    read: Callable, objective_id: str, time_col: str
+) -> pl.DataFrame:
+    # Plan edits rewrite the plan of past runs in the rolling forecasts
+    rolling = read(object_path=f"artifacts/{objective_id}/rolling_forecasts.parquet")
+    rolling_plan = _pivot_rolling_forecasts(
+        rolling.select(
+            pl.col(rolling.columns[0]).alias("entity"), time_col, "updated_at", "plan"
+        ),
+        values=["plan"],
+    )
+    return rolling_plan
+
+
+def _get_numeric_columns(data: pl.DataFrame) -> List[str]:
+    return data.select(
+        pl.col([pl.Int16, pl.Int32, pl.Int64, pl.Float64, pl.Float32])
+    ).columns
+
+
+def _join_entity_levels(
+    read: Callable, outputs: Mapping[str, Any], data: pl.DataFrame
+) -> pl.DataFrame:
+    # Add the level columns of the entity dimension table on the entity column
+    entities = read(object_path=outputs["entities"])
+    entities = entities.select(
+        pl.col(entities.columns[0]).cast(pl.Utf8).alias("entity"),
+        *_get_entity_levels(entities),
+    )
+    return data.with_columns(pl.col("entity").cast(pl.Utf8)).join(
+        entities, on="entity", how="left"
+    )
+
+
+def _create_forecast_chart_cube(
+    read: Callable,
+    outputs: Mapping[str, Any],
+    objective_id: str,
+    chart_data: Optional[pl.DataFrame] = None,
+) -> pl.DataFrame:
+    """Pre-aggregate the forecast chart series by time for each entity level.
+
+    Each row holds the sum and non-null count of every series over the
+    entities whose `level` column equals `value`, or over all entities where
+    `level` is null. Filtered sums and means are then re-aggregated from these
+    partials. The plan and the plan of past runs are left out as plan edits
+    rewrite them after the run.
+    """
+    if chart_data is None:
+        chart_data = _read_forecast_chart_data(read=read, outputs=outputs)
+    entity_col, time_col = chart_data.columns[:2]
+    rolling = _read_rolling_forecasts(
+        read=read, objective_id=objective_id, entity_col=entity_col, time_col=time_col
+    )
     joined = (
-        actual.rename({target_col: "actual"})
+        chart_data.rename({entity_col: "entity"})
+        .with_columns(pl.col("entity").cast(pl.Utf8))
         .join(
-            y_baseline.rename({target_col: "baseline"}),
-            on=idx_cols,
+            _pivot_rolling_forecasts(
+                rolling, values=[col for col in ROLLING_SERIES if col != "plan"]
+            ).with_columns(pl.col("entity").cast(pl.Utf8)),
+            on=["entity", time_col],
             how="outer",
         )
-        .join(indexhub, on=idx_cols, how="outer")
-        # Join quantiles
-        .join(
-            quantiles_lower.rename({target_col: f"ai_{quantile_lower}"}),
-            on=idx_cols,
-            how="outer",
+    )
+    metric_cols = _get_numeric_columns(joined)
+
+    # Add entity levels from the entity dimension table
+    levels = []
+    if outputs.get("entities"):
+        cols = joined.columns
+        joined = _join_entity_levels(read=read, outputs=outputs, data=joined)
+        levels = [col for col in joined.columns if col not in cols]
+    # A single level is the entity itself, which would not be aggregated
+    if len(levels) < 2:
+        levels = []
+
+    partials = [
+        expr
+        for col in metric_cols
+        for expr in (
+            pl.sum(col).alias(f"{col}__sum"),
+            pl.col(col).is_not_null().sum().alias(f"{col}__count"),
         )
-        .join(
-            quantiles_upper.rename({target_col: f"ai_{quantile_upper}"}),
-            on=idx_cols,
-            how="outer",
+    ]
+    cube_cols = [
+        time_col,
+        "level",
+        "value",
+        *(expr.meta.output_name() for expr in partials),
+    ]
+    totals = (
+        joined.lazy()
+        .groupby(time_col)
+        .agg(partials)
+        .with_columns(
+            pl.lit(None, dtype=pl.Utf8).alias("level"),
+            pl.lit(None, dtype=pl.Utf8).alias("value"),
+        )
+        .select(cube_cols)
+    )
+    subtotals = [
+        joined.lazy()
+        .groupby([time_col, level])
+        .agg(partials)
+        .with_columns(
+            pl.lit(level).alias("level"), pl.col(level).cast(pl.Utf8).alias("value")
         )
+        .select(cube_cols)
+        for level in levels
+    ]
+    cube = pl.concat([totals, *subtotals]).sort(["level", "value", time_col]).collect()
+    return cube
+
+
+def _query_forecast_chart_cube(
+    cube: pl.DataFrame,
+    filter_by: Optional[Mapping[str, List[str]]] = None,
+    agg_by: Optional[str] = None,
+    agg_method: str = "sum",
+) -> Optional[pl.DataFrame]:
+    """Aggregate chart series from `cube`, None if the cube cannot answer."""
+    filter_by = filter_by or {}
+    levels = set(filter_by)
+    if agg_by:
+        levels.add(agg_by)
+    # Partials only cover sums and means over a single level
+    if agg_method not in {"sum", "mean"} or len(levels) > 1:
+        return None
+    level = levels.pop() if levels else None
+
+    if level is None:
+        rows = cube.filter(pl.col("level").is_null())
+    elif level in cube.get_column("level").unique().to_list():
+        rows = cube.filter(pl.col("level") == level)
+        if level in filter_by:
+            rows = rows.filter(pl.col("value").is_in(filter_by[level]))
+    else:
+        return None
+
+    time_col = cube.columns[0]
+    metric_cols = [
+        col[: -len("__sum")] for col in cube.columns if col.endswith("__sum")
+    ]
+    if agg_method == "sum":
+        agg_exprs = [pl.sum(f"{col}__sum").alias(col) for col in metric_cols]
+    else:
+        agg_exprs = [
+            (pl.sum(f"{col}__sum") / pl.sum(f"{col}__count")).alias(col)
+            for col in metric_cols
+        ]
+    group_by_cols = [time_col, agg_by] if agg_by else [time_col]
+    chart_data = (
+        rows.rename({"value": level or "value"}).groupby(group_by_cols).agg(agg_exprs)
+    )
+    return chart_data
+
+
+def _aggregate_plan(
+    read: Callable,
+    outputs: Mapping[str, Any],
+    objective_id: str,
+    time_col: str,
+    filter_by: Optional[Mapping[str, List[str]]] = None,
+    agg_by: Optional[str] = None,
+    agg_method: str = "sum",
+) -> pl.DataFrame:
+    """Aggregate the plan and the plan of past runs, which the cube leaves out."""
+    plan = (
+        _read_plan(read=read, outputs=outputs)
+        .select(pl.col("entity").cast(pl.Utf8), time_col, "plan")
         .join(
-            best_plan.select(pl.all().exclude(["^fh.*$", "^use.*$"])),
-            on=idx_cols,
+            _read_rolling_plan(
+                read=read, objective_id=objective_id, time_col=time_col
+            ).with_columns(pl.col("entity").cast(pl.Utf8)),
+            on=["entity", time_col],
             how="outer",
         )
-        .rename({entity_col: "entity"})
-        .join(
+    )
+    plan_cols = plan.columns[2:]
+    levels = {*(filter_by or {}), *([agg_by] if agg_by else [])} - {"entity"}
+    if levels:
+        plan = _join_entity_levels(read=read, outputs=outputs, data=plan)
+    if filter_by:
+        expr = [pl.col(col).is_in(values) for col, values in filter_by.items()]
+        plan = plan.filter(reduce(lambda x, y: x & y, expr))
+    group_by_cols = [time_col, agg_by] if agg_by else [time_col]
+    plan = plan.groupby(group_by_cols).agg(
+        [AGG_METHODS[agg_method](col) for col in plan_cols]
+    )
+    return plan
+
+
+def _aggregate_forecast_chart_data(
+    read: Callable,
+    outputs: Mapping[str, Any],
+    objective_id: str,
+    filter_by: Optional[Mapping[str, List[str]]] = None,
+    agg_by: Optional[str] = None,
+    agg_method: str = "sum",
+    quantile_lower: int = 10,
+    quantile_upper: int = 90,
+) -> pl.DataFrame:
+    # Answer from the chart cube materialised by the forecast flow if available
+    serving = outputs.get("serving", {})
+    if "chart_cube" in serving:
+        cube = read(object_path=serving["chart_cube"])
+        quantile_cols = {f"ai_{quantile_lower}__sum", f"ai_{quantile_upper}__sum"}
+        chart_data = None
+        if quantile_cols.issubset(cube.columns):
+            chart_data = _query_forecast_chart_cube(
+                cube=cube, filter_by=filter_by, agg_by=agg_by, agg_method=agg_method
+            )
+        if chart_data is not None:
+            time_col = cube.columns[0]
+            group_by_cols = [time_col, agg_by] if agg_by else [time_col]
+            plan = _aggregate_plan(
+                read=read,
+                outputs=outputs,
+                objective_id=objective_id,
+                time_col=time_col,
+                filter_by=filter_by,
+                agg_by=agg_by,
+                agg_method=agg_method,
+            )
+            # Keep the plan after the best plan as in the joined chart data,
+            # cubes of older runs may still hold the plan of past runs
+            cols = [col for col in chart_data.columns if not col.startswith("plan_")]
+            idx = cols.index("best_plan") + 1
+            chart_data = chart_data.join(plan, on=group_by_cols, how="outer").select(
+                [*cols[:idx], "plan", *cols[idx:], pl.col("^plan_.*$")]
+            )
+            return chart_data
+
+    # Read artifacts
+    forecast_chart_data = _read_forecast_chart_data(
+        read=read,
+        outputs=outputs,
+        quantile_lower=quantile_lower,
+        quantile_upper=quantile_upper,
+    )
+    entity_col, time_col = forecast_chart_data.columns[:2]
+    forecast_chart_data = forecast_chart_data.rename({entity_col: "entity"})
+    plan = _read_plan(read=read, outputs=outputs)
+    rolling = _read_rolling_forecasts(
+        read=read, objective_id=objective_id, entity_col=entity_col, time_col=time_col
+    )
+    rolling_forecasts = _pivot_rolling_forecasts(rolling)
+
+    # Filter entities before joining if only filtered by entity
+    if filter_by and set(filter_by) == {"entity"}:
+        is_entity = pl.col("entity").cast(pl.Utf8).is_in(filter_by["entity"])
+        forecast_chart_data = forecast_chart_data.filter(is_entity)
+        plan = plan.filter(is_entity)
+        rolling_forecasts = rolling_forecasts.filter(is_entity)
+
+    # Postproc - join data together
+    joined = (
+        forecast_chart_data.join(
             plan.select(pl.all().exclude(["^fh.*$", "^use.*$"])),
             on=["entity", time_col],
             how="outer",
@@ -163,6 +450,11 @@ def create_single_forecast_chart(
         .join(rolling_forecasts, on=["entity", time_col], how="outer")
     )
 
+    # Add entity levels to filter or aggregate by
+    levels = {*(filter_by or {}), *([agg_by] if agg_by else [])}
+    if not levels.issubset(joined.columns) and outputs.get("entities"):
+        joined = _join_entity_levels(read=read, outputs=outputs, data=joined)
+
     # Filter by specific columns
     if filter_by:
         expr = [pl.col(col).is_in(values) for col, values in filter_by.items()]
@@ -171,19 +463,61 @@ def create_single_forecast_chart(
         joined = joined.filter(filter_expr)
 
     # Get expression for agg by
-    agg_exprs = [
-        AGG_METHODS[agg_method](col)
-        for col in joined.select(
-            pl.col([pl.Int16, pl.Int32, pl.Int64, pl.Float64, pl.Float32])
-        ).columns
-    ]
-    # Aggredate data and round to two d.p.
-    group_by_cols = [time_col, *agg_by] if agg_by else [time_col]
-    chart_data = (
-        joined.groupby(group_by_cols)
-        .agg(agg_exprs)
-        .sort(pl.col(time_col))
-        .with_columns([pl.col(pl.Float32).round(2), pl.col(pl.Float64).round(2)])
+    agg_exprs = [AGG_METHODS[agg_method](col) for col in _get_numeric_columns(joined)]
+    group_by_cols = [time_col, agg_by] if agg_by else [time_col]
+    chart_data = joined.groupby(group_by_cols).agg(agg_exprs)
+    return chart_data
+
+
+def create_single_forecast_chart(
+    outputs: Mapping[str, str],
+    fields: Mapping[str, str],
+    source_fields: Mapping[str, str],
+    objective_id: str,
+    user: User,
+    filter_by: Mapping[str, Any] = None,
+    agg_by: str = None,
+    quantile_lower: int = 10,
+    quantile_upper: int = 90,
+    **kwargs,
+):
+    pl.toggle_string_cache(True)
+    series_name_to_legend_show = {}
+    # Get credentials
+    storage_creds = get_aws_secret(
+        tag=user.storage_tag, secret_type="storage", user_id=user.id
+    )
+    read = partial(
+        SOURCE_TAG_TO_READER[user.storage_tag],
+        bucket_name=user.storage_bucket_name,
+        file_ext="parquet",
+        **storage_creds,
+    )
+    agg_method = source_fields.get("agg_method", "sum")
+
+    chart_data = _aggregate_forecast_chart_data(
+        read=read,
+        outputs=outputs,
+        objective_id=objective_id,
+        filter_by=filter_by,
+        agg_by=agg_by,
+        agg_method=agg_method,
+        quantile_lower=quantile_lower,
+        quantile_upper=quantile_upper,
+    )
+    time_col = chart_data.columns[0]
+    historical_dates = outputs.get("serving", {}).get("historical_dates")
+    if historical_dates is None:
+        historical_dates = _get_historical_dates(
+            read(
+                object_path=f"artifacts/{objective_id}/rolling_forecasts.parquet",
+                columns=["updated_at"],
+            )
+        )
+
+    # Round to two d.p.
+    chart_data = chart_data.sort(pl.col(time_col)).with_columns(
+        [pl.col(pl.Float32).round(2), pl.col(pl.Float64).round(2)]
     )
     # Set color scheme based on guidelines
     colors = {
@@ -402,13 +736,6 @@ def create_multi_forecast_chart(
         **storage_creds,
     )
 
-    read = partial(
-        SOURCE_TAG_TO_READER[user.storage_tag],
-        bucket_name=user.storage_bucket_name,
-        file_ext="parquet",
-        **storage_creds,
-    )
-
     # Read artifacts
     forecast = read(object_path=outputs["forecasts"]["best_models"])
     backtest = read(object_path=outputs["backtests"]["best_models"]).pipe(
@@ -440,6 +767,11 @@ def create_multi_forecast_chart(
         .select(pl.exclude("^target.*$"))
     )
 
+    # Add entity levels to filter or aggregate by
+    levels = {*(filter_by or {}), *([agg_by] if agg_by else [])}
+    if not levels.issubset(joined.columns) and outputs.get("entities"):
+        joined = _join_entity_levels(read=read, outputs=outputs, data=joined)
+
     # Filter by specific columns
     if filter_by:
         expr = [pl.col(col).is_in(values) for col, values in filter_by.items()]
@@ -458,11 +790,13 @@ def create_multi_forecast_chart(
             [pl.col(pl.Int64), pl.col(pl.Float64), pl.col(pl.Float32)]
         ).columns
     ]
-    # Aggredate data and round to two d.p.
-    group_by_cols = [time_col, *agg_by] if agg_by else [time_col]
+    # Aggregate data by entity, or by the `agg_by` level, and round to two d.p.
+    group_by_cols = [time_col, agg_by] if agg_by else [time_col, entity_col]
     agg_data = (
         joined.groupby(group_by_cols)
         .agg(agg_exprs)
+        # Charts are drawn for the top k entities or `agg_by` values
+        .rename({group_by_cols[1]: "entity"})
         .sort(pl.col(time_col))
         .with_columns([pl.col(pl.Float32).round(2), pl.col(pl.Float64).round(2)])
     )
@@ -472,27 +806,30 @@ def create_multi_forecast_chart(
         agg_data.sort("actual", descending=True).head(top_k)["entity"].to_list()
     )
 
-    entity_data = []
-    for entity in top_k_entities:
-        entity_data.append(agg_data.filter(pl.col("entity") == entity))
+    # Collect the series of all top k entities in a single pass
+    entity_series = (
+        agg_data.filter(pl.col("entity").is_in(top_k_entities))
+        .sort("time")
+        .groupby("entity", maintain_order=True)
+        .agg(["time", "actual", pl.col("indexhub").round(2)])
+    )
+    entity_to_series = {
+        row["entity"]: row for row in entity_series.iter_rows(named=True)
+    }
 
-    num_charts = len(entity_data)
+    num_charts = len(top_k_entities)
 
     # Set color scheme based on guidelines
     colors = ["#0a0a0a", "#194fdc"]
     line_charts = []
-    for i, entity in enumerate(top_k_entities):
-        chart_data = (
-            entity_data[i].sort("time").with_columns([pl.col("indexhub").round(2)])
-        )
+    for entity in top_k_entities:
+        series = entity_to_series[entity]
         line_chart = Line(init_opts=opts.InitOpts(bg_color="white"))
-        line_chart.add_xaxis(chart_data["time"].to_list())
+        line_chart.add_xaxis(series["time"])
 
+        line_chart.add_yaxis("Actual", series["actual"], color=colors[0], symbol=None)
         line_chart.add_yaxis(
-            "Actual", chart_data["actual"].to_list(), color=colors[0], symbol=None
-        )
-        line_chart.add_yaxis(
-            "Indexhub", chart_data["indexhub"].to_list(), color=colors[1], symbol=None
+            "Indexhub", series["indexhub"], color=colors[1], symbol=None
         )
 
         line_chart.set_global_opts(
@@ -649,24 +986,29 @@ def create_segmentation_chart(
         )
     )
 
-    # Add x and y data for each entity
-    for entity in entities:
-        filtered = data.filter(pl.col(entity_col) == entity).with_columns(
+    # Add all entities as points of a single series named by entity
+    points = (
+        data.filter(pl.col(entity_col).cast(pl.Utf8).is_in(entities.cast(pl.Utf8)))
+        .select(
+            pl.col(entity_col).cast(pl.Utf8).alias("name"),
             # NOTE: Rounding doesn't work for float32.
-            [
-                pl.col("seg_factor").cast(pl.Float64).round(2),
-                pl.col("score__uplift__rolling_sum").cast(pl.Float64).round(2),
-            ]
-        )
-        x_data = filtered.get_column("seg_factor").to_list()
-        y_data = filtered.get_column("score__uplift__rolling_sum").to_list()
-        scatter.add_xaxis(xaxis_data=x_data)
-        scatter.add_yaxis(
-            series_name=entity,
-            y_axis=y_data,
-            symbol_size=symbol_size,
-            label_opts=opts.LabelOpts(is_show=False),
+            pl.concat_list(
+                [
+                    pl.col("seg_factor").cast(pl.Float64).round(2),
+                    pl.col("score__uplift__rolling_sum").cast(pl.Float64).round(2),
+                ]
+            ).alias("value"),
         )
+        .to_dicts()
+    )
+    # Points carry their own x values
+    scatter.add_xaxis(xaxis_data=[])
+    scatter.add_yaxis(
+        series_name="AI Uplift",
+        y_axis=points,
+        symbol_size=symbol_size,
+        label_opts=opts.LabelOpts(is_show=False),
+    )
 
     scatter.set_global_opts(
         legend_opts=opts.LegendOpts(is_show=False, border_width=0),
@@ -680,7 +1022,7 @@ def create_segmentation_chart(
             name="AI Uplift (Cumulative)", type_="value", is_scale=True
         ),
         tooltip_opts=opts.TooltipOpts(
-            formatter="{a}: <br> (Segmentation Factor) {c} (AI Uplift)"
+            formatter="{b}: <br> (Segmentation Factor) {c} (AI Uplift)"
         ),
         visualmap_opts=opts.VisualMapOpts(
             is_piecewise=True,
@@ -699,12 +1041,15 @@ def create_segmentation_chart(
     return chart_json
 
 
-def create_rolling_forecasts_chart(user: User, objective_id: str, **kwargs):
+def create_rolling_forecasts_chart(
+    user: User, objective_id: str, entities: Optional[List[str]] = None, **kwargs
+):
     """
     Creates rolling forecasts chart using the baseline and rolling forecasts artifacts.
     The line chart includes baseline and forecasts based on the `updated_at` column.
 
-    Returns a dictionary of {entity: chart_json} for each of the entities in the rolling forecasts.
+    Returns a dictionary of {entity: chart_json} for each of the entities in the rolling forecasts,
+    or only for `entities` if given.
     """
     pl.toggle_string_cache(True)
     # Get credentials
@@ -723,13 +1068,17 @@ def create_rolling_forecasts_chart(user: User, objective_id: str, **kwargs):
     )
 
     entity_col = rolling_forecasts.columns[0]
+    if entities is not None:
+        rolling_forecasts = rolling_forecasts.filter(
+            pl.col(entity_col).cast(pl.Utf8).is_in(entities)
+        )
     entities = rolling_forecasts.get_column(entity_col).unique().to_list()
 
     _type_to_colors = {
-        "ai": ["#003DFD"],
-        "best_plan": ["#b512b8"],
-        "baseline": ["#11a9ba"],
-        "plan": ["#0a0a0a"],
+        "ai": "#003DFD",
+        "best_plan": "#b512b8",
+        "baseline": "#11a9ba",
+        "plan": "#0a0a0a",
     }
     _type_to_name = {
         "ai": "AI",
@@ -737,122 +1086,111 @@ def create_rolling_forecasts_chart(user: User, objective_id: str, **kwargs):
         "baseline": "Baseline",
         "plan": "Plan",
     }
+    residual_cols = [f"residual_{type}" for type in _type_to_colors]
 
-    # Reindex panel to get all time periods for each "updated_at"
-    rolling_forecasts = rolling_forecasts.select(
-        pl.col("updated_at"), pl.col("time"), pl.all().exclude(["updated_at", "time"])
-    ).pipe(lambda x: _reindex_panel(X=x.lazy(), freq="1mo"))
-    updated_dates = rolling_forecasts.get_column("updated_at").unique().to_list()
+    updated_dates = sorted(
+        rolling_forecasts.get_column("updated_at").unique().to_list()
+    )
+    # Lines are drawn for the last three forecast runs
+    plot_dates = updated_dates[-3:]
+
+    # Collect the series of every entity and run in a single pass
+    series = (
+        rolling_forecasts.lazy()
+        .filter(pl.col("updated_at").is_in(plot_dates))
+        .groupby([entity_col, "updated_at"], maintain_order=True)
+        .agg([pl.col("time").cast(pl.Date), *residual_cols])
+        .collect()
+    )
+    entity_to_runs = {}
+    for row in series.iter_rows(named=True):
+        entity_to_runs.setdefault(row[entity_col], {})[row["updated_at"]] = row
+    empty_run = {col: [] for col in ["time", *residual_cols]}
+
+    # Chart options shared by all entities
+    series_names = {
+        (type, date): f"{_type_to_name[type]} ({date.strftime('%Y-%m-%d')})"
+        for type in _type_to_colors
+        for date in updated_dates
+    }
+    # Configure the default visibility option for chart legends
+    selected_series = {
+        series_names[(type, date)]: False
+        for type in ["ai", "plan"]
+        for date in updated_dates
+    }
+    legend = {
+        "data": [
+            series_names[(type, date)]
+            for type in _type_to_colors
+            for date in plot_dates
+        ],
+        "selected": selected_series,
+        "show": True,
+        "right": "0%",
+        "orient": "vertical",
+        "align": "right",
+        "textStyle": {"fontSize": 10},
+        "borderWidth": 0,
+    }
+    colors = [color for color in _type_to_colors.values() for _ in plot_dates]
+    y_axis = {
+        "name": "Residuals",
+        "show": True,
+        "scale": True,
+        "offset": 20,
+        "splitLine": {"show": False},
+        "axisPointer": {"show": True},
+    }
+    past_opts = {"symbolSize": 1, "lineStyle": {"width": 1, "type": "dashed"}}
+    latest_opts = {"symbolSize": 7, "lineStyle": {"width": 3}}
 
     output_json = {}
     for entity in entities:
-        try:
-            # Initial the chart objective
-            line_chart = Line(init_opts=opts.InitOpts(bg_color="white"))
-            for type, colors in _type_to_colors.items():
-                # Create each lines based on the line_type
-                colors_cycle = itertools.cycle(colors)
-                # Get the x and y values for each line
-                x_values = (
-                    rolling_forecasts.filter(pl.col(entity_col) == entity)
-                    .with_columns(pl.col("time").cast(pl.Date))
-                    .filter(pl.col("updated_at") == updated_dates[-1])
-                    .get_column("time")
-                    .to_list()
-                )
-                y1 = (
-                    rolling_forecasts.filter(pl.col(entity_col) == entity)
-                    .filter(pl.col("updated_at") == updated_dates[-1])
-                    .get_column(f"residual_{type}")
-                    .to_list()
-                )
-                y2 = (
-                    rolling_forecasts.filter(pl.col(entity_col) == entity)
-                    .filter(pl.col("updated_at") == updated_dates[-2])
-                    .get_column(f"residual_{type}")
-                    .to_list()
-                    if len(updated_dates) >= 2
-                    else None
-                )
-                y3 = (
-                    rolling_forecasts.filter(pl.col(entity_col) == entity)
-                    .filter(pl.col("updated_at") == updated_dates[-3])
-                    .get_column(f"residual_{type}")
-                    .to_list()
-                    if len(updated_dates) >= 3
-                    else None
-                )
-                # Configure the default visibility option for chart legends
-                selected_series = {
-                    f"{_type_to_name[type]} ({date.strftime('%Y-%m-%d')})": False
-                    for type in ["ai", "plan"]
-                    for date in updated_dates
-                }
-
-                line_chart.add_xaxis(x_values)
-                # Initial the check for empty values in line charts
-                check_empty = False
-                if y3 is not None:
-                    check_empty = True if all(value is None for value in y3) else False
-                    line_chart.add_yaxis(
-                        f"{_type_to_name[type]} ({updated_dates[-3].strftime('%Y-%m-%d')})",
-                        y3,
-                        label_opts=opts.LabelOpts(is_show=False),
-                        color=next(colors_cycle),
-                        linestyle_opts=opts.LineStyleOpts(width=1, type_="dashed"),
-                        is_symbol_show=True,
-                        symbol_size=1,
-                    )
-                if y2 is not None:
-                    check_empty = True if all(value is None for value in y2) else False
-                    line_chart.add_yaxis(
-                        f"{_type_to_name[type]} ({updated_dates[-2].strftime('%Y-%m-%d')})",
-                        y2,
-                        label_opts=opts.LabelOpts(is_show=False),
-                        color=next(colors_cycle),
-                        linestyle_opts=opts.LineStyleOpts(width=1, type_="dashed"),
-                        is_symbol_show=True,
-                        symbol_size=1,
-                    )
-                check_empty = True if all(value is None for value in y1) else False
-                if check_empty is True:
-                    raise ValueError(
-                        f"There is no rolling forecasts data for {entity}..."
-                    )
-                line_chart.add_yaxis(
-                    f"{_type_to_name[type]} ({updated_dates[-1].strftime('%Y-%m-%d')})",
-                    y1,
-                    label_opts=opts.LabelOpts(is_show=False),
-                    color=next(colors_cycle),
-                    linestyle_opts=opts.LineStyleOpts(width=3),
-                    symbol_size=7,
-                )
-
-                line_chart.set_global_opts(
-                    legend_opts=opts.LegendOpts(
-                        is_show=True,
-                        orient="vertical",
-                        align="right",
-                        border_width=0,
-                        pos_right="0%",
-                        selected_map=selected_series,
-                        textstyle_opts=opts.TextStyleOpts(font_size=10),
-                    ),
-                    xaxis_opts=opts.AxisOpts(
-                        splitline_opts=opts.SplitLineOpts(is_show=False)
-                    ),
-                    yaxis_opts=opts.AxisOpts(
-                        name="Residuals",
-                        is_show=True,
-                        splitline_opts=opts.SplitLineOpts(is_show=False),
-                        offset=20,
-                        is_scale=True,
-                        axispointer_opts=opts.AxisPointerOpts(is_show=True),
-                    ),
-                )
-                output_json[entity] = line_chart.dump_options()
-        except ValueError:
+        runs = entity_to_runs.get(entity, {})
+        latest_run = runs.get(plot_dates[-1], empty_run)
+        if any(
+            all(value is None for value in latest_run[col]) for col in residual_cols
+        ):
+            # There is no rolling forecasts data for the entity
             output_json[entity] = None
+            continue
+
+        # Series of every run are plotted against the times of the latest run,
+        # missing past runs and runs of other lengths are paired up to the shorter
+        x_data = [time.isoformat() for time in latest_run["time"]]
+        series = [
+            echarts_series(
+                "line",
+                series_names[(type, date)],
+                [
+                    list(point)
+                    for point in zip(
+                        x_data, runs.get(date, empty_run)[col], strict=False
+                    )
+                ],
+                showSymbol=True,
+                label={"show": False},
+                **(latest_opts if date == plot_dates[-1] else past_opts),
+            )
+            for type, col in zip(_type_to_colors, residual_cols, strict=True)
+            for date in plot_dates
+        ]
+        chart = {
+            "backgroundColor": "white",
+            "color": colors,
+            "series": series,
+            "legend": [legend],
+            "tooltip": {
+                "show": True,
+                "trigger": "item",
+                "borderWidth": 0,
+                "padding": 5,
+            },
+            "xAxis": [{"splitLine": {"show": False}, "data": x_data}],
+            "yAxis": [y_axis],
+        }
+        output_json[entity] = dump_spec(chart)
     logger.info(
         f"✔️ All rolling forecasts charts for {objective_id} are successfully created"
     )
@@ -0,0 +1,37 @@
+from typing import Any, Dict, List, Mapping
+
+import polars as pl
+
+from indexhub.api.services.serialization import encode_json
+
+# Specs are emitted as plain dicts with only the options the charts set,
+# ECharts and Vega-Lite fill in the same defaults pyecharts and altair dump.
+
+VEGA_LITE_SCHEMA = "https://vega.github.io/schema/vega-lite/v5.json"
+
+
+def format_times(data: pl.DataFrame, fmt: str = "%Y-%m-%d") -> pl.DataFrame:
+    """Format the date and datetime columns of `data` as strings."""
+    return data.with_columns(pl.col(pl.Date).cast(pl.Datetime)).with_columns(
+        pl.col(pl.Datetime).dt.strftime(fmt)
+    )
+
+
+def to_points(x: pl.Series, y: pl.Series) -> List[List[Any]]:
+    """Pair `x` and `y` values into ECharts `[x, y]` data points."""
+    return [list(point) for point in zip(x.to_list(), y.to_list(), strict=True)]
+
+
+def echarts_series(type_: str, name: str, data: List[Any], **options) -> Dict[str, Any]:
+    """ECharts series option of `type_` with `data` and extra `options`."""
+    return {"type": type_, "name": name, "data": data, **options}
+
+
+def vega_lite_values(data: pl.DataFrame) -> Dict[str, List[Dict[str, Any]]]:
+    """Vega-Lite inline data of the rows of `data` with ISO formatted times."""
+    return {"values": format_times(data, fmt="%Y-%m-%dT%H:%M:%S").to_dicts()}
+
+
+def dump_spec(spec: Mapping[str, Any]) -> str:
+    """Dump a chart spec to a JSON string like `dump_options()` or `to_json()`."""
+    return encode_json(spec).decode()
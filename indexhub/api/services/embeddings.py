@@ -0,0 +1,158 @@
+import warnings
+from typing import Tuple, Union
+
+import numpy as np
+import polars as pl
+import pyarrow as pa
+
+# Length of the z-normalised series shape in the features
+SHAPE_LENGTH = 32
+EMB_DIM = 16
+N_CLUSTERS = 8
+RANDOM_STATE = 42
+
+
+def _to_matrix(X: Union[pl.DataFrame, pl.LazyFrame]) -> Tuple[pl.Series, np.ndarray]:
+    """Entities and their target series as rows, aligned on the latest period.
+
+    Shorter series are padded with NaN at the start.
+    """
+    entity_col, time_col, target_col = X.columns[:3]
+    series = (
+        X.lazy()
+        .sort([entity_col, time_col])
+        .groupby(entity_col, maintain_order=True)
+        .agg(pl.col(target_col).cast(pl.Float64))
+        .collect()
+    )
+    values = series.get_column(target_col)
+    lengths = values.arr.lengths().to_numpy().astype(np.int64)
+    n_rows, n_cols = len(series), int(lengths.max())
+    # Scatter the flat values into their (row, col) cells
+    rows = np.repeat(np.arange(n_rows), lengths)
+    starts = np.cumsum(lengths) - lengths
+    cols = np.arange(lengths.sum()) - np.repeat(starts, lengths)
+    cols += np.repeat(n_cols - lengths, lengths)
+    matrix = np.full((n_rows, n_cols), np.nan)
+    matrix[rows, cols] = values.explode().fill_null(np.nan).to_numpy()
+    return series.get_column(entity_col).cast(pl.Utf8), matrix
+
+
+def _resample_shape(Z: np.ndarray, length: int) -> np.ndarray:
+    """Resample rows of `Z` to `length` points, by bin means or interpolation."""
+    n_cols = Z.shape[1]
+    if n_cols >= length:
+        bins = np.linspace(0, n_cols, length + 1).astype(int)[:-1]
+        return np.add.reduceat(Z, bins, axis=1) / np.diff(np.append(bins, n_cols))
+    positions = np.linspace(0, n_cols - 1, length)
+    lower = np.floor(positions).astype(int)
+    upper = np.minimum(lower + 1, n_cols - 1)
+    weights = positions - lower
+    return Z[:, lower] * (1 - weights) + Z[:, upper] * weights
+
+
+def _create_features(matrix: np.ndarray) -> np.ndarray:
+    """Scale free shape and statistical features of each row of `matrix`."""
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        # Single period series have no differences
+        warnings.simplefilter("ignore", RuntimeWarning)
+        mean = np.nanmean(matrix, axis=1, keepdims=True)
+        std = np.nanstd(matrix, axis=1, keepdims=True)
+        Z = np.where(std > 0, (matrix - mean) / std, 0.0)
+        # Padding before the first period is set to the series mean
+        Z = np.nan_to_num(Z)
+        observed = ~np.isnan(matrix)
+        n_obs = observed.sum(axis=1)
+        t = np.where(observed, np.cumsum(observed, axis=1) - 1, 0)
+        t = (t - (n_obs[:, None] - 1) / 2) * observed
+        stats = np.column_stack(
+            [
+                # Level and relative spread
+                np.log1p(np.abs(mean[:, 0])),
+                std[:, 0] / np.abs(mean[:, 0]),
+                # Distribution shape
+                (Z**3).sum(axis=1) / n_obs,
+                (Z**4).sum(axis=1) / n_obs - 3,
+                # Lag 1 autocorrelation and roughness
+                (Z[:, 1:] * Z[:, :-1]).sum(axis=1) / n_obs,
+                np.nanstd(np.diff(np.where(observed, Z, np.nan), axis=1), axis=1),
+                # Trend as the correlation of the series with time
+                (Z * t).sum(axis=1) / np.sqrt((t**2).sum(axis=1) * n_obs),
+                # Intermittency
+                (matrix == 0).sum(axis=1) / n_obs,
+            ]
+        )
+        stats = np.nan_to_num(stats, posinf=0.0, neginf=0.0)
+        # Standardise the stats across entities to weigh them like the shape
+        stats_std = stats.std(axis=0)
+        stats = (stats - stats.mean(axis=0)) / np.where(stats_std > 0, stats_std, 1)
+    return np.hstack([_resample_shape(Z, SHAPE_LENGTH), stats])
+
+
+def _project(features: np.ndarray, dim: int, random_state: int) -> np.ndarray:
+    """Gaussian random projection of `features` to `dim` dimensions."""
+    rng = np.random.default_rng(random_state)
+    components = rng.normal(scale=1 / np.sqrt(dim), size=(features.shape[1], dim))
+    return features @ components
+
+
+def _pca(X: np.ndarray, dim: int) -> np.ndarray:
+    X = X - X.mean(axis=0)
+    _, _, vt = np.linalg.svd(X, full_matrices=False)
+    projections = X @ vt[:dim].T
+    # Pad when there are fewer components than dimensions
+    return np.pad(projections, [(0, 0), (0, dim - projections.shape[1])])
+
+
+def _kmeans(
+    X: np.ndarray, n_clusters: int, random_state: int, n_iter: int = 20
+) -> np.ndarray:
+    rng = np.random.default_rng(random_state)
+    n_clusters = min(n_clusters, len(X))
+    centers = X[rng.choice(len(X), n_clusters, replace=False)]
+    for _ in range(n_iter):
+        distances = (
+            np.square(X).sum(axis=1)[:, None]
+            - 2 * X @ centers.T
+            + np.square(centers).sum(axis=1)
+        )
+        labels = distances.argmin(axis=1)
+        counts = np.bincount(labels, minlength=n_clusters)
+        sums = np.zeros_like(centers)
+        np.add.at(sums, labels, X)
+        # Keep the previous center of empty clusters
+        nonempty = counts > 0
+        centers[nonempty] = sums[nonempty] / counts[nonempty, None]
+    return labels
+
+
+def _to_list_array(X: np.ndarray) -> pa.ListArray:
+    offsets = np.arange(0, X.size + 1, X.shape[1], dtype=np.int32)
+    return pa.ListArray.from_arrays(offsets, pa.array(X.astype(np.float32).ravel()))
+
+
+def _create_embs(
+    X: Union[pl.DataFrame, pl.LazyFrame],
+    dim: int = EMB_DIM,
+    n_clusters: int = N_CLUSTERS,
+    random_state: int = RANDOM_STATE,
+) -> pl.DataFrame:
+    """Embed the target series of each entity in the panel `X`.
+
+    Shape and statistical features of each series are randomly projected to
+    `dim` dimensions (`emb`), with 2D and 3D PCA projections for plotting
+    (`emb(n=2)`, `emb(n=3)`) and k-means clusters (`cluster_id`).
+    """
+    entity_col = X.columns[0]
+    entities, matrix = _to_matrix(X)
+    embs = _project(_create_features(matrix), dim=dim, random_state=random_state)
+    table = pa.table(
+        {
+            entity_col: entities.to_arrow(),
+            "emb": _to_list_array(embs),
+            "emb(n=2)": _to_list_array(_pca(embs, 2)),
+            "emb(n=3)": _to_list_array(_pca(embs, 3)),
+            "cluster_id": _kmeans(embs, n_clusters, random_state=random_state),
+        }
+    )
+    return pl.from_arrow(table)
@@ -0,0 +1,96 @@
+from typing import Callable, List, Optional, Union
+
+import polars as pl
+from fastapi import HTTPException
+
+
+def _make_entities_path(output_path: str) -> str:
+    """Path of the entity dimension table written next to a staging panel."""
+    return output_path.replace(".parquet", "__entities.parquet")
+
+
+def _create_entities(X: Union[pl.DataFrame, pl.LazyFrame]) -> pl.DataFrame:
+    """Map each unique merged entity in the first column of `X` to its levels."""
+    entity_col = X.columns[0]
+    entity_cols = entity_col.split("__")
+    if len(entity_cols) == 1:
+        # A single level is the entity itself
+        return (
+            X.lazy()
+            .select(pl.col(entity_col).cast(pl.Utf8).unique())
+            .sort(entity_col)
+            .collect()
+        )
+    entities = (
+        X.lazy()
+        .select(pl.col(entity_col).cast(pl.Utf8).unique())
+        # Split once per unique entity instead of once per row
+        .with_columns(
+            pl.col(entity_col)
+            .str.split_exact(" - ", len(entity_cols) - 1)
+            .struct.rename_fields(entity_cols)
+            .alias("entities")
+        )
+        .unnest("entities")
+        .sort(entity_col)
+        .collect()
+    )
+    return entities
+
+
+def _get_entity_levels(entities: pl.DataFrame) -> List[str]:
+    """Level columns of the entity dimension table `entities`.
+
+    Tables of single level entities only have the entity column.
+    """
+    return entities.columns[1:] or entities.columns[:1]
+
+
+def _read_entities(
+    read: Callable,
+    object_path: Optional[str],
+    load_panel: Callable[[], Union[pl.DataFrame, pl.LazyFrame]],
+) -> pl.DataFrame:
+    """Read the entity dimension table at `object_path`.
+
+    Panels preprocessed before the table was persisted fall back to
+    splitting the unique entities of `load_panel()`.
+    """
+    if object_path is not None:
+        try:
+            return read(object_path=object_path)
+        except HTTPException:
+            pass
+    return _create_entities(load_panel())
+
+
+def _split_entities(
+    X: Union[pl.DataFrame, pl.LazyFrame], entities: pl.DataFrame
+) -> Union[pl.DataFrame, pl.LazyFrame]:
+    """Replace the merged entity column of `X` with the level columns in `entities`."""
+    entity_col = X.columns[0]
+    entity_cols = _get_entity_levels(entities)
+    is_lazy = isinstance(X, pl.LazyFrame)
+    if entity_cols == [entity_col]:
+        X_new = X.lazy().with_columns(pl.col(entity_col).cast(pl.Utf8))
+    elif X.schema[entity_col] == pl.Categorical:
+        # Map the categorical codes of the unique entities to entity levels
+        # then join on the integer code instead of the entity string
+        codes = (
+            X.lazy()
+            .select(pl.col(entity_col).unique())
+            .with_columns(
+                pl.col(entity_col).to_physical().alias("code"),
+                pl.col(entity_col).cast(pl.Utf8),
+            )
+            .join(entities.lazy(), on=entity_col, how="left")
+            .drop(entity_col)
+            .collect()
+        )
+        X_new = X.lazy().with_columns(pl.col(entity_col).to_physical().alias("code"))
+        X_new = X_new.join(codes.lazy(), on="code", how="left").drop("code")
+    else:
+        X_new = X.lazy().with_columns(pl.col(entity_col).cast(pl.Utf8))
+        X_new = X_new.join(entities.lazy(), on=entity_col, how="left")
+    X_new = X_new.select([*entity_cols, pl.exclude([entity_col, *entity_cols])])
+    return X_new if is_lazy else X_new.collect()
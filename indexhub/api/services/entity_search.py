@@ -0,0 +1,102 @@
+import bisect
+import os
+import re
+from typing import Callable, Iterable, List, Literal, Mapping, Set
+
+import polars as pl
+from cacheout import Cache
+
+# Search indexes are kept apart from the shared CACHE so that parsed
+# artifacts do not evict them, one entry per objective
+ENTITY_SEARCH_CACHE = Cache(
+    maxsize=int(os.environ.get("ENTITY_SEARCH_CACHE_MAXSIZE", 32)), ttl=3000
+)
+
+
+class EntitySearchIndex:
+    """Keyword search index over the unique entities of an objective.
+
+    Substring queries are answered from a lowercase trigram inverted index,
+    prefix queries from a sorted list of entity tokens (levels and words).
+    """
+
+    def __init__(self, entities: Iterable[str], separator: str = " - ", n: int = 3):
+        self.entities = sorted(set(entities))
+        self.n = n
+        self._lowered = [entity.lower() for entity in self.entities]
+
+        # Inverted index of ngram -> entity ids
+        self._ngrams: Mapping[str, Set[int]] = {}
+        for i, entity in enumerate(self._lowered):
+            for j in range(len(entity) - n + 1):
+                self._ngrams.setdefault(entity[j : j + n], set()).add(i)
+
+        # Sorted (token, entity id) pairs for prefix search
+        # Tokens are the entity levels and the words within each level
+        tokens = set()
+        for i, entity in enumerate(self._lowered):
+            for level in entity.split(separator):
+                tokens.add((level, i))
+                for word in re.split(r"\W+", level):
+                    if word:
+                        tokens.add((word, i))
+        self._tokens = sorted(tokens)
+        self._token_keys = [token for token, _ in self._tokens]
+
+    def _contains(self, keyword: str) -> Set[int]:
+        keyword = keyword.lower()
+        if len(keyword) < self.n:
+            # Keyword too short for ngram lookup, scan unique entities
+            return {i for i, entity in enumerate(self._lowered) if keyword in entity}
+        # Intersect candidates from each ngram then verify the substring
+        ngrams = {keyword[j : j + self.n] for j in range(len(keyword) - self.n + 1)}
+        candidates = None
+        for ngram in sorted(ngrams, key=lambda x: len(self._ngrams.get(x, ()))):
+            ids = self._ngrams.get(ngram, set())
+            candidates = ids if candidates is None else candidates & ids
+            if not candidates:
+                return set()
+        return {i for i in candidates if keyword in self._lowered[i]}
+
+    def _startswith(self, keyword: str) -> Set[int]:
+        keyword = keyword.lower()
+        start = bisect.bisect_left(self._token_keys, keyword)
+        # Tokens starting with the keyword sort before keyword + max code point
+        end = bisect.bisect_left(self._token_keys, keyword + "\U0010ffff", lo=start)
+        return {i for _, i in self._tokens[start:end]}
+
+    def search(
+        self,
+        keywords: List[str],
+        operator: Literal["or", "and"] = "or",
+        prefix: bool = False,
+    ) -> List[str]:
+        """Return entities matching any (`or`) or all (`and`) of the keywords."""
+        match = self._startswith if prefix else self._contains
+        results = None
+        for keyword in keywords:
+            ids = match(keyword)
+            if results is None:
+                results = ids
+            elif operator == "and":
+                results = results & ids
+            else:
+                results = results | ids
+        return [self.entities[i] for i in sorted(results or [])]
+
+
+def get_entity_search_index(
+    objective_id: str, version: str, load_entities: Callable[[], pl.Series]
+) -> EntitySearchIndex:
+    """Get the cached search index of an objective, building it on a cache miss.
+
+    The index is replaced once the objective outputs change to a new `version`.
+    """
+    key = f"entity_search_index:{objective_id}"
+    cached = ENTITY_SEARCH_CACHE.get(key)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    entities = load_entities().cast(pl.Utf8).unique().drop_nulls()
+    index = EntitySearchIndex(entities.to_list())
+    ENTITY_SEARCH_CACHE.set(key, (version, index))
+    return index
@@ -1,11 +1,27 @@
+import asyncio
 import io
 import logging
 import os
-from typing import List, Optional, Union
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+    Union,
+)
 
 import boto3
 import botocore
 import polars as pl
+from cacheout import Cache
 from fastapi import HTTPException
 
 from indexhub.api.cache import CACHE
@@ -31,6 +47,21 @@ def _logger(name, level=logging.INFO):
 
 logger = _logger(name=__name__)
 
+# Dedicated executor for blocking storage calls (boto3, secrets manager)
+# so async routes do not hold the AnyIO threadpool for the full S3 latency
+IO_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("IO_MAX_WORKERS", 64)),
+    thread_name_prefix="indexhub-io",
+)
+
+# Short-lived cache of object listing pages keyed by
+# (bucket_name, prefix, limit, continuation_token), evicted on writes
+LISTING_CACHE = Cache(maxsize=256, ttl=30)
+
+# In-flight artifact reads keyed by cache key
+_INFLIGHT: Dict[str, Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
 
 FILE_EXT_TO_PARSER = {
     "xlsx": parse_excel,
@@ -164,6 +195,42 @@ def read_batch_from_s3(
     return raw_panels
 
 
+def _make_cache_key(
+    bucket_name: str, object_path: str, file_ext: str, columns: Optional[List[str]]
+) -> str:
+    key = f"{bucket_name}/{object_path}.{file_ext}"
+    if columns is not None:
+        key = f"{key}:{columns}"
+    return key
+
+
+def _single_flight(key: str, load: Callable[[], Any]) -> Any:
+    """Run `load` once for concurrent callers with the same `key`.
+
+    The first caller runs `load` and later callers wait on its result
+    (or exception) instead of starting their own download.
+    """
+    with _INFLIGHT_LOCK:
+        future = _INFLIGHT.get(key)
+        is_leader = future is None
+        if is_leader:
+            future = Future()
+            _INFLIGHT[key] = future
+    if not is_leader:
+        return future.result()
+    try:
+        result = load()
+    except BaseException as exc:
+        future.set_exception(exc)
+        raise
+    else:
+        future.set_result(result)
+        return result
+    finally:
+        with _INFLIGHT_LOCK:
+            _INFLIGHT.pop(key, None)
+
+
 def read_data_from_s3(
     bucket_name: str,
     object_path: str,
@@ -173,9 +240,37 @@ def read_data_from_s3(
     AWS_ACCESS_KEY_ID: Optional[str] = None,
     AWS_SECRET_KEY_ID: Optional[str] = None,
 ):
-    key = f"{bucket_name}/{object_path}.{file_ext}"
-    if columns is not None:
-        key = f"{key}:{columns}"
+    key = _make_cache_key(bucket_name, object_path, file_ext, columns)
+    data = CACHE.get(key)
+    if data is not None:
+        return data
+    # Concurrent misses for the same key share one download and parse
+    return _single_flight(
+        key,
+        partial(
+            _read_data_from_s3,
+            bucket_name=bucket_name,
+            object_path=object_path,
+            file_ext=file_ext,
+            columns=columns,
+            dateformat=dateformat,
+            AWS_ACCESS_KEY_ID=AWS_ACCESS_KEY_ID,
+            AWS_SECRET_KEY_ID=AWS_SECRET_KEY_ID,
+        ),
+    )
+
+
+def _read_data_from_s3(
+    bucket_name: str,
+    object_path: str,
+    file_ext: str,
+    columns: Optional[List[str]] = None,
+    dateformat: Optional[str] = None,
+    AWS_ACCESS_KEY_ID: Optional[str] = None,
+    AWS_SECRET_KEY_ID: Optional[str] = None,
+):
+    key = _make_cache_key(bucket_name, object_path, file_ext, columns)
+    # Another caller may have filled the cache since the first lookup
     data = CACHE.get(key)
     if data is not None:
         return data
@@ -259,6 +354,12 @@ def write_data_to_s3(
     body = f.read()
     try:
         s3_client.put_object(Bucket=bucket_name, Key=object_path, Body=body)
+        # Evict cached reads of the overwritten artifact
+        prefix = f"{bucket_name}/{object_path}."
+        CACHE.delete_many(lambda key: key.startswith(prefix))
+        LISTING_CACHE.delete_many(
+            lambda key: key[0] == bucket_name and object_path.startswith(key[1])
+        )
     except botocore.exceptions.ClientError as err:
         logger.exception("❌ Error occured when writing to s3 storage.")
         error_code = err.response["Error"]["Code"]
@@ -286,6 +387,140 @@ def write_data_to_s3(
     return data
 
 
+def list_objects_from_s3(
+    bucket_name: str,
+    prefix: str,
+    limit: int = 100,
+    continuation_token: Optional[str] = None,
+    AWS_ACCESS_KEY_ID: Optional[str] = None,
+    AWS_SECRET_KEY_ID: Optional[str] = None,
+) -> Mapping[str, Any]:
+    """List one page of up to `limit` objects under `prefix`.
+
+    Returns `{"objects": [{"key", "size", "last_modified"}, ...], "next_token"}`,
+    where `next_token` is passed as `continuation_token` to get the next page
+    and is None on the last page.
+    """
+    key = (bucket_name, prefix, limit, continuation_token)
+    page = LISTING_CACHE.get(key)
+    if page is not None:
+        return page
+
+    s3_client = boto3.client(
+        "s3",
+        aws_access_key_id=AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=AWS_SECRET_KEY_ID,
+        region_name=os.environ["AWS_DEFAULT_REGION"],
+    )
+    kwargs = {"ContinuationToken": continuation_token} if continuation_token else {}
+    try:
+        response = s3_client.list_objects_v2(
+            Bucket=bucket_name, Prefix=prefix, MaxKeys=limit, **kwargs
+        )
+    except botocore.exceptions.ClientError as err:
+        logger.exception("❌ Error occured when listing s3 storage.")
+        error_code = err.response["Error"]["Code"]
+        if error_code == "NoSuchBucket":
+            raise HTTPException(
+                status_code=400, detail="Invalid S3 bucket when listing storage"
+            ) from err
+        elif error_code == "InvalidArgument":
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid continuation token when listing storage",
+            ) from err
+        elif error_code == "InvalidAccessKeyId":
+            raise HTTPException(
+                status_code=400, detail="Invalid S3 access key when listing storage"
+            ) from err
+        elif error_code == "SignatureDoesNotMatch":
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid S3 access secret when listing storage",
+            ) from err
+        else:
+            raise err
+    finally:
+        s3_client.close()
+
+    page = {
+        # `Contents` is missing when there are no objects under the prefix
+        "objects": [
+            {
+                "key": obj["Key"],
+                "size": obj["Size"],
+                "last_modified": obj["LastModified"],
+            }
+            for obj in response.get("Contents", [])
+        ],
+        "next_token": response.get("NextContinuationToken"),
+    }
+    LISTING_CACHE.set(key, page)
+    return page
+
+
+def stream_data_from_s3(
+    bucket_name: str,
+    object_path: str,
+    byte_range: Optional[str] = None,
+    chunk_size: int = 1024 * 1024,
+    AWS_ACCESS_KEY_ID: Optional[str] = None,
+    AWS_SECRET_KEY_ID: Optional[str] = None,
+) -> Tuple[Iterator[bytes], Mapping[str, Any]]:
+    """Open an S3 object and stream its body in chunks without parsing it.
+
+    `byte_range` is an HTTP Range header value (e.g. `bytes=0-1023`), passed
+    through to S3. Returns the chunk iterator and the `get_object` response
+    metadata (`ContentLength`, `ContentRange`, `ETag`, ...).
+    """
+    s3_client = boto3.client(
+        "s3",
+        aws_access_key_id=AWS_ACCESS_KEY_ID,
+        aws_secret_access_key=AWS_SECRET_KEY_ID,
+        region_name=os.environ["AWS_DEFAULT_REGION"],
+    )
+    try:
+        kwargs = {"Range": byte_range} if byte_range else {}
+        obj = s3_client.get_object(Bucket=bucket_name, Key=object_path, **kwargs)
+    except botocore.exceptions.ClientError as err:
+        s3_client.close()
+        logger.exception("❌ Error occured when reading from s3 storage.")
+        error_code = err.response["Error"]["Code"]
+        if error_code == "NoSuchBucket":
+            raise HTTPException(
+                status_code=400, detail="Invalid S3 bucket when reading from storage"
+            ) from err
+        elif error_code == "NoSuchKey":
+            raise HTTPException(
+                status_code=400, detail="Invalid S3 path when reading from storage"
+            ) from err
+        elif error_code == "InvalidRange":
+            raise HTTPException(
+                status_code=416, detail="Invalid range when reading from storage"
+            ) from err
+        elif error_code == "InvalidAccessKeyId":
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid S3 access key when reading from storage",
+            ) from err
+        elif error_code == "SignatureDoesNotMatch":
+            raise HTTPException(
+                status_code=400,
+                detail="Invalid S3 access secret when reading from storage",
+            ) from err
+        else:
+            raise err
+
+    def iter_chunks() -> Iterator[bytes]:
+        try:
+            yield from obj["Body"].iter_chunks(chunk_size)
+        finally:
+            obj["Body"].close()
+            s3_client.close()
+
+    return iter_chunks(), obj
+
+
 SOURCE_TAG_TO_READER = {
     "s3": read_data_from_s3,
     "s3_batch": read_batch_from_s3,
@@ -295,3 +530,64 @@ SOURCE_TAG_TO_READER = {
 STORAGE_TAG_TO_WRITER = {
     "s3": write_data_to_s3,
 }
+
+
+STORAGE_TAG_TO_STREAMER = {
+    "s3": stream_data_from_s3,
+}
+
+
+STORAGE_TAG_TO_LISTER = {
+    "s3": list_objects_from_s3,
+}
+
+
+async def run_io(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking I/O call on the dedicated I/O executor."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(IO_EXECUTOR, partial(func, *args, **kwargs))
+
+
+async def read_data_from_s3_async(
+    bucket_name: str,
+    object_path: str,
+    file_ext: str,
+    columns: Optional[List[str]] = None,
+    dateformat: Optional[str] = None,
+    AWS_ACCESS_KEY_ID: Optional[str] = None,
+    AWS_SECRET_KEY_ID: Optional[str] = None,
+):
+    # Serve cache hits on the event loop without a thread hop
+    data = CACHE.get(_make_cache_key(bucket_name, object_path, file_ext, columns))
+    if data is not None:
+        return data
+    return await run_io(
+        read_data_from_s3,
+        bucket_name=bucket_name,
+        object_path=object_path,
+        file_ext=file_ext,
+        columns=columns,
+        dateformat=dateformat,
+        AWS_ACCESS_KEY_ID=AWS_ACCESS_KEY_ID,
+        AWS_SECRET_KEY_ID=AWS_SECRET_KEY_ID,
+    )
+
+
+async def prefetch(read: Callable, object_paths: Iterable[str]) -> None:
+    """Read artifacts concurrently into the cache with an async reader.
+
+    Missing artifacts are skipped so that the sync builders can handle
+    their own fallbacks.
+    """
+    results = await asyncio.gather(
+        *[read(object_path=path) for path in set(object_paths)],
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception) and not isinstance(result, HTTPException):
+            logger.warning(f"Prefetch failed: {result!r}")
+
+
+SOURCE_TAG_TO_ASYNC_READER = {
+    "s3": read_data_from_s3_async,
+}
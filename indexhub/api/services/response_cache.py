@@ -0,0 +1,256 @@
+import fnmatch
+import gzip
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, Iterator, Mapping, Optional
+
+from cacheout import LRUCache, RemovalCause
+from fastapi import Request, Response
+
+from indexhub.api.models.objective import Objective
+from indexhub.api.services.serialization import encode_json
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is used instead
+    brotli = None
+
+
+def _logger(name, level=logging.INFO):
+    logger = logging.getLogger(name)
+    handler = logging.StreamHandler()
+    handler.setFormatter(
+        logging.Formatter("%(levelname)s: %(asctime)s: %(name)s  %(message)s")
+    )
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False  # Prevent the modal client from double-logging.
+    return logger
+
+
+logger = _logger(name=__name__)
+
+# Responses smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+ENCODING_TO_COMPRESSOR = {
+    "gzip": lambda body: gzip.compress(body, compresslevel=6),
+    "br": lambda body: brotli.compress(body, quality=5),
+}
+
+
+def _sizeof(value: Any) -> int:
+    return len(value) if isinstance(value, bytes) else 0
+
+
+class LocalRedis:
+    """In-process LRU stand-in for the subset of the Redis client API we use.
+
+    Least recently used entries are evicted once there are more than `maxsize`
+    entries or the cached bytes exceed `maxbytes`, like Redis `maxmemory` with
+    the `volatile-lru` policy. Counters are kept apart and never evicted, like
+    Redis keys without expiry.
+    """
+
+    def __init__(self, maxsize: int = 256, maxbytes: Optional[int] = None):
+        self.maxbytes = maxbytes
+        self.nbytes = 0
+        self.evictions = 0
+        self._counters: Dict[str, int] = {}
+        self._cache = LRUCache(
+            maxsize=maxsize, on_set=self._on_set, on_delete=self._on_delete
+        )
+
+    def _on_set(self, key: str, value: Any, old_value: Any):
+        self.nbytes += _sizeof(value) - _sizeof(old_value)
+
+    def _on_delete(self, key: str, value: Any, cause: RemovalCause):
+        self.nbytes -= _sizeof(value)
+        if cause in (RemovalCause.FULL, RemovalCause.POPITEM):
+            self.evictions += 1
+
+    def get(self, key: str) -> Optional[bytes]:
+        if key in self._counters:
+            return str(self._counters[key]).encode()
+        return self._cache.get(key)
+
+    def set(self, key: str, value: bytes, ex: Optional[int] = None):
+        if self.maxbytes is not None and _sizeof(value) > self.maxbytes:
+            # Evicting everything would not make room for the value
+            self._cache.delete(key)
+            return
+        self._cache.set(key, value, ttl=ex)
+        while self.maxbytes is not None and self.nbytes > self.maxbytes:
+            self._cache.popitem()
+
+    def delete(self, *keys: str) -> int:
+        n_counters = sum(self._counters.pop(key, None) is not None for key in keys)
+        return n_counters + self._cache.delete_many(list(keys))
+
+    def incr(self, key: str) -> int:
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    def scan_iter(self, match: str = "*") -> Iterator[str]:
+        return iter([key for key in self._cache.keys() if fnmatch.fnmatch(key, match)])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": self._cache.size(),
+            "maxsize": self._cache.maxsize,
+            "bytes": self.nbytes,
+            "maxbytes": self.maxbytes,
+            "evictions": self.evictions,
+        }
+
+
+class ResponseCache:
+    """Cache of encoded route responses keyed by objective version.
+
+    The version is the objective `updated_at` plus a generation counter,
+    so a new forecast run never serves stale responses. Plan edits rewrite
+    artifacts without a new run and must call `invalidate` to bump it.
+    Generation counters are stored without expiry so they are not evicted,
+    and `epoch` distinguishes backends whose counters do not persist.
+    """
+
+    def __init__(self, client: Any, ttl: Optional[int] = 3000, epoch: str = ""):
+        self.client = client
+        self.ttl = ttl
+        self.epoch = epoch
+        self._hits = Counter()
+        self._misses = Counter()
+
+    def make_key(
+        self, objective: Objective, route: str, params: Mapping[str, Any]
+    ) -> str:
+        generation = int(self.client.get(f"response_generation:{objective.id}") or 0)
+        # Normalise params so equivalent requests share a key,
+        # unset params are the same as empty ones (e.g. `filter_by: {}`)
+        params = {
+            name: value
+            for name, value in params.items()
+            if value is not None and value != {} and value != [] and value != ""
+        }
+        params = json.dumps(params, sort_keys=True, default=str)
+        digest = hashlib.sha1(params.encode()).hexdigest()
+        version = f"{objective.updated_at.isoformat()}.{generation}{self.epoch}"
+        return f"response:{objective.id}:{version}:{route}:{digest}"
+
+    async def get_or_build(
+        self, key: str, build: Callable[[], Awaitable[Any]], route: str = ""
+    ) -> bytes:
+        """Get the encoded response for `key`, building it on a cache miss.
+
+        Responses already encoded as bytes (e.g. Arrow IPC) are stored as is,
+        other responses are JSON encoded with orjson.
+        """
+        body = self.client.get(key)
+        if body is not None:
+            self._hits[route] += 1
+        else:
+            self._misses[route] += 1
+            body = await build()
+            if not isinstance(body, bytes):
+                body = encode_json(body)
+            self.client.set(key, body, ex=self.ttl)
+        return body
+
+    def get_or_compress(self, key: str, body: bytes, encoding: str) -> bytes:
+        key = f"{key}:{encoding}"
+        compressed = self.client.get(key)
+        if compressed is None:
+            compressed = ENCODING_TO_COMPRESSOR[encoding](body)
+            self.client.set(key, compressed, ex=self.ttl)
+        return compressed
+
+    def invalidate(self, objective_id: int):
+        self.client.incr(f"response_generation:{objective_id}")
+        keys = list(self.client.scan_iter(match=f"response:{objective_id}:*"))
+        if keys:
+            self.client.delete(*keys)
+        logger.info(f"Invalidated {len(keys)} cached responses: {objective_id}")
+
+    def stats(self, route_prefix: str = "") -> Dict[str, Any]:
+        """Hits and misses of this process by route, with backend usage."""
+        routes = {
+            route: {"hits": self._hits[route], "misses": self._misses[route]}
+            for route in sorted({*self._hits, *self._misses})
+            if route.startswith(route_prefix)
+        }
+        hits = sum(route["hits"] for route in routes.values())
+        misses = sum(route["misses"] for route in routes.values())
+        stats = {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else None,
+            "routes": routes,
+        }
+        if isinstance(self.client, LocalRedis):
+            stats["backend"] = self.client.stats()
+        return stats
+
+
+def _create_response_cache() -> ResponseCache:
+    url = os.environ.get("RESPONSE_CACHE_REDIS_URL")
+    if url:
+        import redis
+
+        # The server must evict with `volatile-lru` to keep generation counters
+        return ResponseCache(redis.Redis.from_url(url))
+    client = LocalRedis(
+        maxsize=int(os.environ.get("RESPONSE_CACHE_MAXSIZE", 256)),
+        maxbytes=int(os.environ.get("RESPONSE_CACHE_MAXBYTES", 256 * 1024**2)),
+    )
+    # Counters restart from 0 with the process, so ETags issued before a
+    # restart must not match
+    return ResponseCache(client, epoch=f".{time.time_ns():x}")
+
+
+RESPONSE_CACHE = _create_response_cache()
+
+
+def _negotiate_encoding(accept_encoding: str) -> str:
+    accepted = {
+        encoding.split(";")[0].strip() for encoding in accept_encoding.split(",")
+    }
+    if "br" in accepted and brotli is not None:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return "identity"
+
+
+async def cached_response(
+    request: Optional[Request],
+    objective: Objective,
+    route: str,
+    params: Mapping[str, Any],
+    build: Callable[[], Awaitable[Any]],
+    media_type: str = "application/json",
+) -> Response:
+    """Serve a route response from the response cache.
+
+    The ETag is derived from the objective version, so revalidation returns
+    304 without building or sending the body. Large bodies are compressed
+    with brotli or gzip depending on the request `Accept-Encoding`.
+    """
+    key = RESPONSE_CACHE.make_key(objective, route, params)
+    etag = f'"{hashlib.sha1(key.encode()).hexdigest()}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if request is not None and request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    body = await RESPONSE_CACHE.get_or_build(key, build, route=route)
+    encoding = "identity"
+    if request is not None and len(body) >= MIN_COMPRESS_SIZE:
+        encoding = _negotiate_encoding(request.headers.get("accept-encoding", ""))
+    headers["Vary"] = "Accept-Encoding"
+    if encoding != "identity":
+        body = RESPONSE_CACHE.get_or_compress(key, body, encoding)
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type=media_type, headers=headers)
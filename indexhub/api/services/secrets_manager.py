@@ -10,6 +10,9 @@ from typing import Mapping
 
 import boto3
 from botocore.exceptions import ClientError
+from cacheout import Cache
+
+from indexhub.api.services.io import run_io
 
 ENV_NAME = os.environ["ENV_NAME"]
 AWS_DEFAULT_REGION = os.environ["AWS_DEFAULT_REGION"]
@@ -29,8 +32,24 @@ def _logger(name, level=logging.INFO):
 
 logger = _logger(name=__name__)
 
+# Secrets are read on every dashboard request, cache them briefly.
+# Secrets written by the API are invalidated, secrets updated or rotated
+# outside the API (e.g. in the AWS console) are served stale for up to
+# `SECRETS_CACHE_TTL` seconds.
+SECRETS_CACHE_TTL = int(os.environ.get("SECRETS_CACHE_TTL", 300))
+SECRETS_CACHE = Cache(maxsize=256, ttl=SECRETS_CACHE_TTL)
+
+
+def _make_secret_name(tag: str, secret_type: str, user_id: str) -> str:
+    return f"{ENV_NAME}/{secret_type}/{user_id.replace('|', '_')}@{tag}"
+
 
 def get_aws_secret(tag: str, secret_type: str, user_id: str):
+    secret_name = _make_secret_name(tag, secret_type, user_id)
+    secret = SECRETS_CACHE.get(secret_name)
+    if secret is not None:
+        return json.loads(secret)
+
     # Create a Secrets Manager client
     session = boto3.Session()
     client = session.client(
@@ -38,7 +57,6 @@ def get_aws_secret(tag: str, secret_type: str, user_id: str):
     )
 
     try:
-        secret_name = f"{ENV_NAME}/{secret_type}/{user_id.replace('|', '_')}@{tag}"
         response = client.get_secret_value(SecretId=secret_name)
     except ClientError as e:
         # For a list of exceptions thrown, see
@@ -48,9 +66,16 @@ def get_aws_secret(tag: str, secret_type: str, user_id: str):
 
     # Decrypts secret using the associated KMS key.
     secret = response["SecretString"]
+    SECRETS_CACHE.set(secret_name, secret)
     return json.loads(secret)
 
 
+async def get_aws_secret_async(tag: str, secret_type: str, user_id: str):
+    return await run_io(
+        get_aws_secret, tag=tag, secret_type=secret_type, user_id=user_id
+    )
+
+
 def create_aws_secret(
     tag: str, secret_type: str, user_id: str, secret: Mapping[str, str]
 ):
@@ -59,8 +84,8 @@ def create_aws_secret(
         service_name="secretsmanager", region_name=AWS_DEFAULT_REGION
     )
 
+    secret_name = _make_secret_name(tag, secret_type, user_id)
     try:
-        secret_name = f"{ENV_NAME}/{secret_type}/{user_id.replace('|', '_')}@{tag}"
         response = client.create_secret(
             Name=secret_name,
             SecretString=json.dumps(secret),
@@ -74,5 +99,8 @@ def create_aws_secret(
         # https://docs.aws.amazon.com/secretsmanager/latest/apireference/API_GetSecretValue.html
         logger.exception("❌ Error occured when creating aws secret.")
         raise e
+    finally:
+        # Invalidate even if the write failed after the secret changed
+        SECRETS_CACHE.delete(secret_name)
 
     return response
@@ -0,0 +1,39 @@
+from typing import Any, Callable, Mapping, Optional, Union
+
+import orjson
+from fastapi.encoders import jsonable_encoder
+
+# Serialise numpy arrays / scalars and non-str dict keys natively
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def encode_json(
+    content: Any,
+    default: Optional[Callable[[Any], Any]] = jsonable_encoder,
+    option: int = ORJSON_OPTIONS,
+) -> bytes:
+    """Encode `content` as JSON with orjson.
+
+    Types orjson does not support natively (e.g. pydantic models) fall back
+    to `default`, which is `jsonable_encoder` unless given.
+    """
+    return orjson.dumps(content, default=default, option=option)
+
+
+def encode_chart_json(chart: Union[str, Mapping[str, Optional[str]]]) -> bytes:
+    """Encode chart builder output without encoding its JSON a second time.
+
+    Chart builders return the chart options already dumped to a JSON string,
+    or a mapping of entity to such strings (None where the chart could not be
+    built). The JSON is embedded in the response body as is, so clients
+    receive the options as objects.
+    """
+    if isinstance(chart, str):
+        return chart.encode()
+    items = (
+        orjson.dumps(str(key))
+        + b":"
+        + (b"null" if options is None else options.encode())
+        for key, options in chart.items()
+    )
+    return b"{" + b",".join(items) + b"}"
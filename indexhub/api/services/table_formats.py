@@ -0,0 +1,45 @@
+import json
+from enum import Enum
+from typing import Any, Mapping, Union
+
+import polars as pl
+import pyarrow as pa
+
+ARROW_STREAM_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+
+
+class TableFormat(str, Enum):
+    # List of row dicts (default)
+    rows = "rows"
+    # Mapping of column name to column values
+    columns = "columns"
+    # Arrow IPC stream with the response fields in the schema metadata
+    arrow = "arrow"
+
+
+def _to_arrow_stream(rows: pl.DataFrame, metadata: Mapping[str, Any]) -> bytes:
+    table = rows.to_arrow()
+    table = table.replace_schema_metadata(
+        {key: json.dumps(value) for key, value in metadata.items()}
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def format_table(
+    rows: pl.DataFrame, format: TableFormat, **fields: Any
+) -> Union[Mapping[str, Any], bytes]:
+    """Serialise table `rows` with an `id` column alongside the response `fields`.
+
+    `rows` format returns `{**fields, "rows": [...]}`, `columns` format returns
+    `{**fields, "data": {col: [...]}}` and `arrow` format returns an Arrow IPC
+    stream.
+    """
+    rows = rows.with_row_count("id")
+    if format == TableFormat.arrow:
+        return _to_arrow_stream(rows, fields)
+    if format == TableFormat.columns:
+        return {**fields, "data": rows.to_dict(as_series=False)}
+    return {**fields, "rows": rows.to_dicts()}
@@ -0,0 +1,243 @@
+import glob
+import hashlib
+import logging
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import polars as pl
+import pyarrow as pa
+from cacheout import Cache
+from fastapi import HTTPException
+
+from indexhub.api.services.io import _single_flight
+
+
+def _logger(name, level=logging.INFO):
+    logger = logging.getLogger(name)
+    handler = logging.StreamHandler()
+    handler.setFormatter(
+        logging.Formatter("%(levelname)s: %(asctime)s: %(name)s  %(message)s")
+    )
+    logger.addHandler(handler)
+    logger.setLevel(level)
+    logger.propagate = False  # Prevent the modal client from double-logging.
+    return logger
+
+
+logger = _logger(name=__name__)
+
+# Local copies of the embeddings with their ANN index
+VECTORS_DIR = os.environ.get(
+    "VECTORS_DIR", os.path.join(tempfile.gettempdir(), "indexhub-vectors")
+)
+# Embeddings with fewer rows are searched exactly in memory,
+# which is faster than the IVF-PQ index until ~100k rows
+ANN_MIN_ROWS = int(os.environ.get("ANN_MIN_ROWS", 100_000))
+# IVF partitions probed and PQ candidates re-ranked by exact distance per query
+ANN_NPROBES = 20
+ANN_REFINE_FACTOR = 10
+
+VECTOR_COL = "emb"
+
+# Index builds train k-means over all rows, keep them off the request threads
+ANN_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="indexhub-ann")
+
+# Similarity indexes are kept apart from the shared CACHE so that other
+# artifacts do not evict them
+SIMILARITY_CACHE = Cache(
+    maxsize=int(os.environ.get("SIMILARITY_CACHE_MAXSIZE", 8)), ttl=3000
+)
+
+
+def _make_vectors_path(source_id: int, prefix: str) -> str:
+    """Path of the embeddings written by preprocess for a source."""
+    path = f"vectors/{source_id}.lance"
+    if prefix != "":
+        path = f"{prefix}/{path}"
+    return path
+
+
+def _get_vector_col(columns: List[str]) -> str:
+    """Full embedding column, else the widest `emb(n=...)` projection."""
+    if VECTOR_COL in columns:
+        return VECTOR_COL
+    projections = {
+        int(match.group(1)): col
+        for col in columns
+        if (match := re.fullmatch(r"emb\(n=(\d+)\)", col))
+    }
+    if not projections:
+        raise HTTPException(status_code=400, detail="Embeddings not found")
+    return projections[max(projections)]
+
+
+def _get_num_sub_vectors(dim: int) -> int:
+    # PQ sub-vectors must evenly divide the vector dimension,
+    # aim for 4 dimensions per sub-vector to bound the k-means training
+    return next(n for n in range(max(dim // 4, 1), 0, -1) if dim % n == 0)
+
+
+class SimilarityIndex:
+    """Nearest neighbour search over entity embeddings.
+
+    Embeddings with at least `ann_min_rows` rows are written to a local lance
+    dataset under `uri` with an IVF-PQ index built in the background, queries
+    probe the nearest partitions then re-rank candidates by exact L2
+    distance. The dataset is named by a digest of the embeddings, so an
+    index built before (e.g. before a cache eviction or restart) is reopened
+    instead of rebuilt. Smaller embeddings, and all embeddings until the
+    index is ready, are searched exactly in memory.
+    """
+
+    def __init__(
+        self,
+        entities: List[str],
+        vectors: np.ndarray,
+        uri: Optional[str] = None,
+        ann_min_rows: int = ANN_MIN_ROWS,
+    ):
+        self.entities = entities
+        self.vectors = vectors.astype(np.float32)
+        self._rows = {entity: i for i, entity in enumerate(entities)}
+        self._ann_future: Optional[Future] = None
+        if uri is not None and len(entities) >= ann_min_rows:
+            self._ann_future = ANN_EXECUTOR.submit(self._load_ann_index, uri)
+
+    @property
+    def _dataset(self):
+        future = self._ann_future
+        if future is None or not future.done() or future.exception() is not None:
+            return None
+        return future.result()
+
+    def _get_digest(self) -> str:
+        digest = hashlib.sha1(self.vectors.tobytes())
+        digest.update("\n".join(self.entities).encode())
+        return digest.hexdigest()
+
+    def _load_ann_index(self, uri: str):
+        """Reopen the index of these embeddings under `uri`, else build it."""
+        import lance
+
+        path = f"{uri}-{self._get_digest()}.lance"
+        if os.path.exists(path):
+            try:
+                dataset = lance.dataset(path)
+                if dataset.has_index:
+                    logger.info(f"Reopened ANN index: {path}")
+                    return dataset
+            except Exception as exc:
+                logger.warning(f"Rebuilding unreadable ANN index {path}: {exc}")
+        # Remove indexes of previous embeddings
+        for old_path in glob.glob(f"{glob.escape(uri)}-*.lance*"):
+            if not old_path.startswith(path):
+                shutil.rmtree(old_path, ignore_errors=True)
+        return self._build_ann_index(path)
+
+    def _build_ann_index(self, path: str):
+        import lance
+
+        n_rows, dim = self.vectors.shape
+        table = pa.table(
+            {
+                "entity": self.entities,
+                "vector": pa.FixedSizeListArray.from_arrays(
+                    pa.array(self.vectors.ravel()), dim
+                ),
+            }
+        )
+        # Build in a temporary path so that partial builds are never reopened
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            dataset = lance.write_dataset(table, tmp_path)
+            dataset.create_index(
+                "vector",
+                index_type="IVF_PQ",
+                num_partitions=min(max(int(np.sqrt(n_rows)), 1), 256),
+                num_sub_vectors=_get_num_sub_vectors(dim),
+            )
+            shutil.rmtree(path, ignore_errors=True)
+            os.rename(tmp_path, path)
+        except Exception as exc:
+            # Searches stay exact when the index cannot be built
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            logger.exception(f"Error building ANN index {path}: {exc}")
+            raise
+        logger.info(f"Built ANN index: {path}")
+        return lance.dataset(path)
+
+    def search(self, entity_id: str, k: int = 10) -> List[Dict[str, Any]]:
+        """Return the `k` entities nearest to `entity_id` with their distances."""
+        row = self._rows.get(entity_id)
+        if row is None:
+            raise HTTPException(status_code=404, detail="Entity not found")
+        query = self.vectors[row]
+        dataset = self._dataset
+        if dataset is not None:
+            # Request one more as the entity is its own nearest neighbour
+            results = dataset.to_table(
+                columns=["entity"],
+                nearest={
+                    "column": "vector",
+                    "q": query,
+                    "k": k + 1,
+                    "nprobes": ANN_NPROBES,
+                    "refine_factor": ANN_REFINE_FACTOR,
+                },
+            )
+            entities = results.column("entity").to_pylist()
+            distances = results.column("score").to_pylist()
+        else:
+            scores = np.square(self.vectors - query).sum(axis=1)
+            nearest = np.argpartition(scores, min(k + 1, len(scores) - 1))[: k + 1]
+            nearest = nearest[np.argsort(scores[nearest], kind="stable")]
+            entities = [self.entities[i] for i in nearest]
+            distances = scores[nearest].tolist()
+        similar = [
+            {"entity_id": entity, "distance": distance}
+            for entity, distance in zip(entities, distances, strict=True)
+            if entity != entity_id
+        ]
+        return similar[:k]
+
+
+def _create_similarity_index(
+    embs: pl.DataFrame, entity_col: Optional[str], uri: str
+) -> SimilarityIndex:
+    entity_col = entity_col or embs.columns[0]
+    vector_col = _get_vector_col(embs.columns)
+    embs = embs.select([pl.col(entity_col).cast(pl.Utf8), vector_col]).drop_nulls()
+    vectors = embs.get_column(vector_col).explode().to_numpy().reshape(len(embs), -1)
+    return SimilarityIndex(embs.get_column(entity_col).to_list(), vectors, uri=uri)
+
+
+def get_similarity_index(
+    key: str,
+    load_embs: Callable[[], pl.DataFrame],
+    entity_col: Optional[str] = None,
+    version: str = "",
+) -> SimilarityIndex:
+    """Get the cached similarity index for `key`, building it on a cache miss.
+
+    Indexes are cached by the `version` of their source embeddings. The
+    entities are read from `entity_col`, else the first column.
+    """
+    uri = os.path.join(VECTORS_DIR, hashlib.sha1(key.encode()).hexdigest())
+    key = f"similarity_index:{key}:{version}"
+    index = SIMILARITY_CACHE.get(key)
+    if index is None:
+
+        def load():
+            index = _create_similarity_index(load_embs(), entity_col, uri)
+            SIMILARITY_CACHE.set(key, index)
+            return index
+
+        # Concurrent misses share one index build
+        index = _single_flight(key, load)
+    return index
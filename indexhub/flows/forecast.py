@@ -17,8 +17,14 @@ from sqlmodel import Session, select
 
 from indexhub.api.db import create_sql_engine
 from indexhub.api.models.objective import Objective
+from indexhub.api.routers.objectives import get_objective
 from indexhub.api.routers.sources import get_source
-from indexhub.api.routers.stats import FREQ_TO_SP
+from indexhub.api.routers.stats import FREQ_TO_SP, _compute_forecast_results
+from indexhub.api.routers.tables import (
+    _create_forecast_table,
+    _create_forecast_table_rows,
+    _create_sparklines,
+)
 from indexhub.api.routers.users import get_user_by_id
 from indexhub.api.schemas import (
     FREQ_TO_DURATION,
@@ -27,6 +33,8 @@ from indexhub.api.schemas import (
     SUPPORTED_ERROR_TYPE,
     SUPPORTED_FREQ,
 )
+from indexhub.api.services.changes import notify_change
+from indexhub.api.services.entities import _make_entities_path, _read_entities
 from indexhub.api.services.io import SOURCE_TAG_TO_READER, STORAGE_TAG_TO_WRITER
 from indexhub.api.services.secrets_manager import get_aws_secret
 from indexhub.modal_stub import stub
@@ -423,6 +431,93 @@ def _create_best_plan(
 #     return integrations_df
 
 
+def _create_serving_views(
+    output_json: Mapping[str, Any],
+    objective_id: int,
+    read: Callable,
+    write: Callable,
+    make_path: Callable,
+) -> Mapping[str, Any]:
+    # Chart builders import the preprocess flow which registers this module on the stub
+    from indexhub.api.services.chart_builders import (
+        _create_forecast_chart_cube,
+        _create_forecast_chart_data,
+        _get_historical_dates,
+    )
+
+    logger.info("Creating serving views...")
+    response = get_objective(objective_id)
+    fields = json.loads(response["objective"].fields)
+    source_fields = response["panel_source_data_fields"]
+
+    serving = {}
+    try:
+        # Table rows with stats struct, best model and sparklines for each entity
+        table = (
+            _create_forecast_table(
+                read=read,
+                fields=fields,
+                outputs=output_json,
+                source_fields=source_fields,
+                objective_id=objective_id,
+            )
+            .collect()
+            .join(
+                _create_sparklines(read=read, outputs=output_json),
+                on="entity",
+                how="left",
+            )
+            .with_columns(pl.col("sparklines").fill_null("N/A"))
+        )
+        serving["table"] = make_path(prefix="serving__table")
+        write(table, object_path=serving["table"])
+
+        # Table view rows of forecast, baseline, quantiles and plan for each entity
+        table_view = _create_forecast_table_rows(
+            read=read,
+            fields=fields,
+            outputs=output_json,
+            objective_id=objective_id,
+        ).collect()
+        serving["table_view"] = make_path(prefix="serving__table_view")
+        write(table_view, object_path=serving["table_view"])
+
+        # Chart series of actual, baseline, ai, quantiles and best plan for each entity
+        chart = _create_forecast_chart_data(read=read, outputs=output_json)
+        serving["chart"] = make_path(prefix="serving__chart")
+        write(chart, object_path=serving["chart"])
+
+        # Chart series aggregated by time for each entity level to filter charts by
+        cube = _create_forecast_chart_cube(
+            read=read,
+            outputs=output_json,
+            objective_id=objective_id,
+            chart_data=chart,
+        )
+        serving["chart_cube"] = make_path(prefix="serving__chart_cube")
+        write(cube, object_path=serving["chart_cube"])
+        serving["historical_dates"] = _get_historical_dates(
+            read(
+                object_path=f"artifacts/{objective_id}/rolling_forecasts.parquet",
+                columns=["updated_at"],
+            )
+        )
+
+        # Stats summary is small enough to be stored with the outputs
+        serving["stats"] = _compute_forecast_results(
+            read=read,
+            outputs=output_json,
+            fields=fields,
+            source_fields=source_fields,
+            objective_id=objective_id,
+        )
+        logger.info("Serving views created.")
+    except Exception as exc:
+        # Serving views are optional, the API recomputes views from artifacts
+        logger.exception(f"Failed to create serving views: {exc}")
+    return serving
+
+
 def _make_output_path(objective_id: int, updated_at: datetime, prefix: str) -> str:
     timestamp = datetime.strftime(updated_at, "%Y%m%dT%X").replace(":", "")
     path = f"artifacts/{objective_id}/{timestamp}/{prefix}.parquet"
@@ -452,6 +547,7 @@ def _update_objective(
 
         # Add, commit and refresh the updated object
         session.add(objective)
+        notify_change(session, objective)
         session.commit()
         session.refresh(objective)
         return objective
@@ -782,6 +878,14 @@ def run_forecast(
         )
         outputs["y"] = make_path(prefix="y")
         write(y, object_path=make_path(prefix="y"))
+        # Copy the entity dimension table from preprocess into the run artifacts
+        entities = _read_entities(
+            read=read,
+            object_path=_make_entities_path(panel_path),
+            load_panel=lambda: y,
+        )
+        outputs["entities"] = make_path(prefix="entities")
+        write(entities, object_path=outputs["entities"])
 
         # Select best models
         best_models, best_forecasts, best_backtests, best_residuals, best_scores = _select_best_models(
@@ -922,6 +1026,15 @@ def run_forecast(
             write=write,
         )
 
+        # 14. Materialise serving views for the dashboard
+        outputs["serving"] = _create_serving_views(
+            output_json=outputs,
+            objective_id=objective_id,
+            read=read,
+            write=write,
+            make_path=make_path,
+        )
+
     except (Exception, pl.PolarsPanicError) as exc:
         updated_at = datetime.utcnow()
         outputs = None
@@ -1,6 +1,8 @@
 import json
 import logging
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Any, List, Literal, Mapping, Optional, Union
 
@@ -21,12 +23,16 @@ from indexhub.api.schemas import (
     SUPPORTED_DATETIME_FMT,
     SUPPORTED_FREQ,
 )
+from indexhub.api.services.changes import notify_change
+from indexhub.api.services.embeddings import _create_embs
+from indexhub.api.services.entities import _create_entities, _make_entities_path
 from indexhub.api.services.io import (
     SOURCE_TAG_TO_READER,
     STORAGE_TAG_TO_WRITER,
     check_s3_path,
 )
 from indexhub.api.services.secrets_manager import get_aws_secret
+from indexhub.api.services.vectors import _make_vectors_path
 from indexhub.modal_stub import stub
 
 
@@ -51,6 +57,9 @@ PL_NUMERIC_COLS = pl.col([*PL_FLOAT_DTYPES, *PL_INT_DTYPES])
 
 env_prefix = os.environ.get("ENV_NAME", "dev")
 
+# Concurrent file uploads per lance dataset
+UPLOAD_MAX_WORKERS = int(os.environ.get("UPLOAD_MAX_WORKERS", 16))
+
 
 def _clean_panel(
     raw_panel_data: pl.DataFrame,
@@ -258,23 +267,16 @@ def _update_source(
         source.msg = msg
         # Add, commit and refresh the updated object
         session.add(source)
+        notify_change(session, source)
         session.commit()
         session.refresh(source)
         return source
 
 
 def _embed_ts(panel_data: pl.DataFrame) -> pl.DataFrame:
-    env_prefix = os.environ.get("ENV_NAME", "dev")
-    ts_emb_flow = modal.Function.lookup(
-        f"{env_prefix}-functime-flows", "embed_cluster_time_series"
-    )
-    # Unpack panel data cols based on source type
-    entity_col = panel_data.columns[0]
-    target_col = panel_data.columns[-1]
-    # Generate embeddings for panel
-    embs = ts_emb_flow.call(
-        data=panel_data.to_arrow(), entity_col=entity_col, target_col=target_col
-    )
+    # Embed time series in process (CPU only) instead of a remote flow
+    embs = _create_embs(panel_data)
+    logger.info(f"Embedded {len(embs)} time series")
     return embs
 
 
@@ -283,30 +285,49 @@ def _upload_embs(
     source_id: int,
     storage_bucket_name: str,
     prefix: str,
+    AWS_ACCESS_KEY_ID: Optional[str] = None,
+    AWS_SECRET_KEY_ID: Optional[str] = None,
 ):
     import lance
 
-    # Export embeddings as .lance
-    uri = f"vectors/{source_id}.lance/"
-    # Change to pandas df and write to .lance due to ValueError
-    try:
-        lance.write_dataset(embs.to_pandas(), uri, mode="overwrite")
-    except OSError:
-        lance.write_dataset(embs.to_pandas(), uri, mode="create")
-    # Upload entire .lance directory to s3
-    s3 = boto3.client("s3")
-    for root, _, files in os.walk(uri):
-        for file in files:
-            file_path = os.path.join(root, file)
-            if root[-1] != "/":
-                key = prefix + "/" + root + "/" + file
-            else:
-                key = prefix + "/" + root + file
-            s3.upload_file(file_path, storage_bucket_name, key)
-    if prefix == "":
-        path = f"s3://{storage_bucket_name}/{uri}"
-    else:
-        path = f"s3://{storage_bucket_name}/{prefix}/{uri}"
+    object_path = _make_vectors_path(source_id=source_id, prefix=prefix)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # Export embeddings as .lance from arrow
+        # Lance does not support dictionary arrays of large strings
+        uri = os.path.join(tmp_dir, os.path.basename(object_path))
+        lance.write_dataset(
+            embs.with_columns(pl.col(pl.Categorical).cast(pl.Utf8)).to_arrow(),
+            uri,
+            mode="create",
+        )
+        # Upload entire .lance directory to s3
+        s3 = boto3.client(
+            "s3",
+            aws_access_key_id=AWS_ACCESS_KEY_ID,
+            aws_secret_access_key=AWS_SECRET_KEY_ID,
+        )
+
+        def upload(file: str):
+            key = f"{object_path}/{file}"
+            s3.upload_file(os.path.join(uri, file), storage_bucket_name, key)
+
+        files = [
+            os.path.relpath(os.path.join(root, file), uri)
+            for root, _, dir_files in os.walk(uri)
+            for file in dir_files
+        ]
+        manifests = sorted(
+            (file for file in files if file.endswith(".manifest")),
+            # Latest manifest points readers to the new version so goes last
+            key=lambda file: file == "_latest.manifest",
+        )
+        # Upload data files concurrently then commit the manifests,
+        # so readers never see a version with missing data files
+        with ThreadPoolExecutor(max_workers=UPLOAD_MAX_WORKERS) as executor:
+            list(executor.map(upload, set(files) - set(manifests)))
+        for file in manifests:
+            upload(file)
+    path = f"s3://{storage_bucket_name}/{object_path}"
     return path
 
 
@@ -407,15 +428,27 @@ def run_preprocess(
             object_path=output_path,
             **storage_creds,
         )
-        # TODO: Pending to fix issue in modal
+        # Write entity dimension table (merged entity -> entity levels)
+        # so that the API joins on it instead of splitting entities per request
+        write(
+            _create_entities(panel_data),
+            bucket_name=storage_bucket_name,
+            object_path=_make_entities_path(output_path),
+            **storage_creds,
+        )
         # Embed time series and write to S3
-        # embs = _embed_ts(panel_data=panel_data)
-        # _upload_embs(
-        #     pl.from_arrow(embs),
-        #     source_id=source_id,
-        #     storage_bucket_name=storage_bucket_name,
-        #     prefix=prefix,
-        # )
+        try:
+            embs = _embed_ts(panel_data=panel_data)
+            _upload_embs(
+                embs,
+                source_id=source_id,
+                storage_bucket_name=storage_bucket_name,
+                prefix=prefix,
+                **storage_creds,
+            )
+        except Exception as exc:
+            # Embeddings are only used by trends, keep the preprocessed panel
+            logger.exception(f"Error embedding time series: {exc}")
 
     except ClientError as exc:
         status = "FAILED"
@@ -0,0 +1,142 @@
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from fastapi import WebSocketDisconnect
+
+from indexhub.api.models.objective import Objective
+from indexhub.api.services import changes
+
+TABLE = Objective.__tablename__
+ROWS = {
+    1: SimpleNamespace(id=1, user_id="user_1", name="Weekly sales"),
+    2: SimpleNamespace(id=2, user_id="user_2", name="Monthly sales"),
+}
+
+
+def _payload(row_id: int, user_id: str, op: str = "update") -> str:
+    return json.dumps({"table": TABLE, "id": row_id, "user_id": user_id, "op": op})
+
+
+class FakeWebSocket:
+    def __init__(self):
+        self.requests = asyncio.Queue()
+        self.responses = asyncio.Queue()
+        self.close_code = None
+
+    async def receive_json(self):
+        request = await self.requests.get()
+        if request is None:
+            raise WebSocketDisconnect()
+        return request
+
+    async def send_text(self, text: str):
+        await self.responses.put(json.loads(text))
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+
+@pytest.fixture
+def feed(monkeypatch):
+    feed = changes.ChangeFeed()
+    # Payloads are dispatched by the tests instead of the LISTEN thread
+    monkeypatch.setattr(
+        feed, "_start", lambda: setattr(feed, "_loop", asyncio.get_running_loop())
+    )
+    monkeypatch.setattr(changes, "CHANGE_FEED", feed)
+    monkeypatch.setattr(changes, "_load_row", lambda table, row_id: ROWS[row_id])
+    return feed
+
+
+async def _published(feed: changes.ChangeFeed, *payloads: str):
+    for payload in payloads:
+        feed._dispatch(payload)
+    await asyncio.gather(*feed._tasks)
+
+
+def test_publish_to_subscribers_and_listeners(feed):
+    listened = []
+
+    async def run():
+        feed.add_listener(TABLE, lambda change, row: listened.append(row))
+        async with feed.subscribe(TABLE, "user_1") as queue:
+            await _published(
+                feed,
+                _payload(1, "user_1"),
+                _payload(2, "user_2"),
+                _payload(1, "user_1", op="delete"),
+            )
+            assert queue.get_nowait() == (1, ROWS[1])
+            assert queue.get_nowait() == (1, None)
+            assert queue.empty()
+            # Connection lost and re-established
+            feed._resync()
+            assert queue.get_nowait() is None
+        assert not feed._subscribers
+
+    asyncio.run(run())
+    # Listeners get every change of the table
+    assert listened == [ROWS[1], ROWS[2], None]
+
+
+def _list_objectives(user_id: str):
+    return {"objectives": [row for row in ROWS.values() if row.user_id == user_id]}
+
+
+async def _serve(websocket: FakeWebSocket):
+    server = asyncio.create_task(
+        changes.serve_changes(websocket, Objective, "objectives", _list_objectives)
+    )
+    await websocket.requests.put({"user_id": "user_1"})
+    response = await websocket.responses.get()
+    assert [row["id"] for row in response["objectives"]] == [1]
+    return server
+
+
+def test_serve_changes(feed):
+    async def run():
+        websocket = FakeWebSocket()
+        server = await _serve(websocket)
+        await _published(feed, _payload(2, "user_2"), _payload(1, "user_1"))
+        assert await websocket.responses.get() == {
+            "changed": [vars(ROWS[1])],
+            "deleted": [],
+        }
+        await _published(feed, _payload(1, "user_1", op="delete"))
+        assert await websocket.responses.get() == {"changed": [], "deleted": [1]}
+        # Requesting again lists all rows
+        await websocket.requests.put({"user_id": "user_1"})
+        assert "objectives" in await websocket.responses.get()
+        await websocket.requests.put(None)
+        await server
+        assert websocket.responses.empty()
+        assert not feed._subscribers
+
+    asyncio.run(run())
+
+
+def test_serve_changes_rejects_other_users(feed):
+    async def run():
+        websocket = FakeWebSocket()
+        server = await _serve(websocket)
+        await websocket.requests.put({"user_id": "user_2"})
+        await server
+        assert websocket.close_code == 1008
+        assert websocket.responses.empty()
+
+    asyncio.run(run())
+
+
+def test_serve_changes_closes_on_push_errors(feed, monkeypatch):
+    async def run():
+        websocket = FakeWebSocket()
+        server = await _serve(websocket)
+        # Changed rows that cannot be serialised stop the pusher
+        monkeypatch.setattr(changes, "_to_values", lambda row: 1 / 0)
+        await _published(feed, _payload(1, "user_1"))
+        await server
+        assert websocket.close_code == 1011
+
+    asyncio.run(run())
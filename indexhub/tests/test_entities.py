@@ -0,0 +1,74 @@
+import polars as pl
+import pytest
+
+from indexhub.api.services.entities import (
+    _create_entities,
+    _get_entity_levels,
+    _split_entities,
+)
+
+
+@pytest.fixture
+def multi_level_panel():
+    return pl.DataFrame(
+        {
+            "product__region": ["Tea - North", "Tea - South", "Coffee - North"] * 2,
+            "time": [1, 1, 1, 2, 2, 2],
+            "target": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        }
+    )
+
+
+@pytest.fixture
+def single_level_panel():
+    return pl.DataFrame(
+        {
+            "product": ["Tea", "Coffee - Decaf", "Coffee"] * 2,
+            "time": [1, 1, 1, 2, 2, 2],
+            "target": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        }
+    )
+
+
+def test_create_entities_multi_level(multi_level_panel):
+    entities = _create_entities(multi_level_panel)
+    assert entities.to_dict(as_series=False) == {
+        "product__region": ["Coffee - North", "Tea - North", "Tea - South"],
+        "product": ["Coffee", "Tea", "Tea"],
+        "region": ["North", "North", "South"],
+    }
+    assert _get_entity_levels(entities) == ["product", "region"]
+
+
+def test_create_entities_single_level(single_level_panel):
+    entities = _create_entities(single_level_panel.lazy())
+    # Single level entities are kept whole, including separators
+    assert entities.to_dict(as_series=False) == {
+        "product": ["Coffee", "Coffee - Decaf", "Tea"]
+    }
+    assert _get_entity_levels(entities) == ["product"]
+
+
+@pytest.mark.parametrize("dtype", [pl.Utf8, pl.Categorical])
+def test_split_entities_multi_level(multi_level_panel, dtype):
+    with pl.StringCache():
+        panel = multi_level_panel.with_columns(pl.col("product__region").cast(dtype))
+        entities = _create_entities(panel)
+        split = _split_entities(panel, entities=entities)
+    assert split.columns == ["product", "region", "time", "target"]
+    assert split.get_column("product").to_list() == ["Tea", "Tea", "Coffee"] * 2
+    assert split.get_column("region").to_list() == ["North", "South", "North"] * 2
+
+
+@pytest.mark.parametrize("dtype", [pl.Utf8, pl.Categorical])
+def test_split_entities_single_level(single_level_panel, dtype):
+    with pl.StringCache():
+        panel = single_level_panel.with_columns(pl.col("product").cast(dtype))
+        entities = _create_entities(panel)
+        split = _split_entities(panel.lazy(), entities=entities).collect()
+    assert split.columns == ["product", "time", "target"]
+    assert split.schema["product"] == pl.Utf8
+    assert (
+        split.get_column("product").to_list()
+        == single_level_panel.get_column("product").to_list()
+    )
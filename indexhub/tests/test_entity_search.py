@@ -0,0 +1,82 @@
+import polars as pl
+import pytest
+
+from indexhub.api.cache import CACHE
+from indexhub.api.services.entity_search import (
+    ENTITY_SEARCH_CACHE,
+    EntitySearchIndex,
+    get_entity_search_index,
+)
+
+ENTITIES = [
+    "Coffee Beans - North",
+    "Coffee Mugs - South",
+    "Green Tea - North",
+    "Tea Pots - East",
+    "Espresso Machines - South",
+]
+
+
+@pytest.fixture
+def index():
+    return EntitySearchIndex(ENTITIES)
+
+
+def test_search_or(index):
+    assert index.search(["coffee", "tea"]) == [
+        "Coffee Beans - North",
+        "Coffee Mugs - South",
+        "Green Tea - North",
+        "Tea Pots - East",
+    ]
+
+
+def test_search_and(index):
+    assert index.search(["tea", "north"], operator="and") == ["Green Tea - North"]
+    assert index.search(["coffee", "east"], operator="and") == []
+
+
+def test_search_substring(index):
+    # Short keywords are scanned, longer ones use the trigram index
+    assert index.search(["ug"]) == ["Coffee Mugs - South"]
+    assert index.search(["presso"]) == ["Espresso Machines - South"]
+
+
+def test_search_prefix(index):
+    # Prefixes match the start of entity levels and words only
+    assert index.search(["tea"], prefix=True) == [
+        "Green Tea - North",
+        "Tea Pots - East",
+    ]
+    assert index.search(["presso"], prefix=True) == []
+    assert index.search(["sou", "mach"], operator="and", prefix=True) == [
+        "Espresso Machines - South"
+    ]
+
+
+def test_cached_index_is_built_once():
+    loads = []
+
+    def load_entities():
+        loads.append(1)
+        return pl.Series("entity", ENTITIES + ENTITIES[:2], dtype=pl.Categorical)
+
+    first = get_entity_search_index("1", "run_1/forecasts.parquet", load_entities)
+    second = get_entity_search_index("1", "run_1/forecasts.parquet", load_entities)
+    assert first is second
+    assert len(loads) == 1
+    assert first.entities == sorted(ENTITIES)
+    assert first not in CACHE.values()
+
+
+def test_cached_index_is_replaced_by_new_outputs():
+    first = get_entity_search_index(
+        "2", "run_1/forecasts.parquet", lambda: pl.Series(ENTITIES)
+    )
+    second = get_entity_search_index(
+        "2", "run_2/forecasts.parquet", lambda: pl.Series(ENTITIES[:2])
+    )
+    assert second is not first
+    assert second.entities == sorted(ENTITIES[:2])
+    # Only the index of the latest outputs is kept
+    assert [index for _, index in ENTITY_SEARCH_CACHE.values()].count(first) == 0
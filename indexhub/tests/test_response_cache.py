@@ -0,0 +1,78 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Request
+
+from indexhub.api.services import response_cache
+from indexhub.api.services.response_cache import LocalRedis, ResponseCache
+
+OBJECTIVE = SimpleNamespace(id=1, updated_at=datetime(2023, 6, 1))
+
+
+def test_make_key_normalises_empty_params():
+    cache = ResponseCache(LocalRedis())
+    key = cache.make_key(
+        OBJECTIVE, "table", {"page": 1, "display_n": 5, "filter_by": None}
+    )
+    assert key == cache.make_key(
+        OBJECTIVE,
+        "table",
+        {"display_n": 5, "page": 1, "filter_by": {}, "entities_keywords": []},
+    )
+    assert key != cache.make_key(
+        OBJECTIVE, "table", {"page": 1, "display_n": 5, "filter_by": {"a": ["b"]}}
+    )
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = ResponseCache(LocalRedis(maxsize=2))
+    monkeypatch.setattr(response_cache, "RESPONSE_CACHE", cache)
+    return cache
+
+
+def _get(etag=None):
+    headers = [(b"if-none-match", etag.encode())] if etag else []
+    request = Request({"type": "http", "headers": headers})
+    builds = []
+
+    async def build():
+        builds.append(1)
+        return {"n_builds": len(builds)}
+
+    response = asyncio.run(
+        response_cache.cached_response(request, OBJECTIVE, "stats", {}, build)
+    )
+    return response, len(builds)
+
+
+def test_not_modified(cache):
+    response, n_builds = _get()
+    assert response.status_code == 200 and n_builds == 1
+    etag = response.headers["etag"]
+    response, n_builds = _get(etag)
+    assert response.status_code == 304 and n_builds == 0
+    assert response.headers["etag"] == etag
+
+
+def test_invalidate_changes_etag(cache):
+    etag = _get()[0].headers["etag"]
+    cache.invalidate(OBJECTIVE.id)
+    # Invalidated responses are removed
+    assert not list(cache.client.scan_iter(match=f"response:{OBJECTIVE.id}:*"))
+    response, n_builds = _get(etag)
+    assert response.status_code == 200 and n_builds == 1
+    assert response.headers["etag"] != etag
+
+
+def test_generation_is_not_evicted(cache):
+    cache.invalidate(OBJECTIVE.id)
+    etag = _get()[0].headers["etag"]
+    # Fill the LRU past its maxsize
+    for i in range(3):
+        cache.client.set(f"other:{i}", b"body")
+    assert cache.client.stats()["evictions"] > 0
+    response, n_builds = _get(etag)
+    assert response.status_code == 304
@@ -0,0 +1,34 @@
+from datetime import date, timedelta
+
+import polars as pl
+
+from indexhub.api.routers.tables import _create_sparklines
+
+
+def _panel(entity_to_n_periods):
+    start = date(2023, 1, 2)
+    return pl.DataFrame(
+        [
+            {"entity": entity, "time": start + timedelta(weeks=i), "target": float(i)}
+            for entity, n_periods in entity_to_n_periods.items()
+            for i in range(n_periods)
+        ]
+    )
+
+
+def test_sparklines_do_not_depend_on_page():
+    artifacts = {
+        "forecast": _panel({"short": 1, "long": 1}),
+        "y": _panel({"short": 15, "long": 40}),
+    }
+    outputs = {"forecasts": {"best_models": "forecast"}, "y": "y"}
+
+    def read(object_path):
+        return artifacts[object_path]
+
+    def sparkline(entities):
+        sparklines = _create_sparklines(read, outputs, entities=entities)
+        return sparklines.filter(pl.col("entity") == "short")["sparklines"][0]
+
+    # The last 12 periods of each entity
+    assert sparkline(["short"]) == sparkline(["short", "long"])
@@ -0,0 +1,125 @@
+import glob
+
+import numpy as np
+import polars as pl
+import pytest
+from fastapi import HTTPException
+
+from indexhub.api.cache import CACHE
+from indexhub.api.services import vectors
+from indexhub.api.services.vectors import (
+    SimilarityIndex,
+    _create_similarity_index,
+    get_similarity_index,
+)
+
+N_CLUSTERS = 20
+CLUSTER_SIZE = 50
+DIM = 16
+
+
+@pytest.fixture
+def embs():
+    """Embeddings in well separated clusters."""
+    rng = np.random.default_rng(0)
+    centers = rng.normal(scale=10, size=(N_CLUSTERS, DIM))
+    vectors = np.repeat(centers, CLUSTER_SIZE, axis=0) + rng.normal(
+        scale=0.1, size=(N_CLUSTERS * CLUSTER_SIZE, DIM)
+    )
+    return pl.DataFrame(
+        {
+            "entity": [f"entity_{i}" for i in range(len(vectors))],
+            "emb": vectors.astype(np.float32).tolist(),
+            "cluster_id": np.repeat(np.arange(N_CLUSTERS), CLUSTER_SIZE),
+        }
+    )
+
+
+@pytest.fixture
+def lance():
+    return pytest.importorskip("lance")
+
+
+def _cluster_of(entity_id: str) -> int:
+    return int(entity_id.split("_")[1]) // CLUSTER_SIZE
+
+
+def _create_ann_index(embs: pl.DataFrame, uri: str) -> SimilarityIndex:
+    exact = _create_similarity_index(embs, "entity", uri=None)
+    index = SimilarityIndex(exact.entities, exact.vectors, uri=uri, ann_min_rows=0)
+    # Wait for the index loaded in the background
+    index._ann_future.result()
+    assert index._dataset is not None
+    return index
+
+
+def test_exact_search(embs):
+    index = get_similarity_index("test_exact_search", lambda: embs)
+    similar = index.search("entity_0", k=10)
+    assert len(similar) == 10
+    assert "entity_0" not in {row["entity_id"] for row in similar}
+    assert all(_cluster_of(row["entity_id"]) == 0 for row in similar)
+    distances = [row["distance"] for row in similar]
+    assert distances == sorted(distances)
+
+
+def test_cached_by_version(embs):
+    loads = []
+
+    def load_embs():
+        loads.append(1)
+        return embs
+
+    first = get_similarity_index("test_cached", load_embs, version="1")
+    assert get_similarity_index("test_cached", load_embs, version="1") is first
+    assert get_similarity_index("test_cached", load_embs, version="2") is not first
+    assert len(loads) == 2
+
+
+def test_ann_search(embs, lance, tmp_path):
+    index = _create_ann_index(embs, str(tmp_path / "index"))
+    for entity_id in ["entity_0", "entity_333", "entity_999"]:
+        similar = index.search(entity_id, k=10)
+        assert len(similar) == 10
+        assert entity_id not in {row["entity_id"] for row in similar}
+        # Neighbours within the cluster are found through the index
+        assert all(
+            _cluster_of(row["entity_id"]) == _cluster_of(entity_id) for row in similar
+        )
+
+
+def test_ann_index_is_reopened(embs, lance, tmp_path, monkeypatch):
+    uri = str(tmp_path / "index")
+    first = _create_ann_index(embs, uri)
+
+    def build_ann_index(self, path):
+        raise AssertionError("ANN index rebuilt")
+
+    monkeypatch.setattr(SimilarityIndex, "_build_ann_index", build_ann_index)
+    second = _create_ann_index(embs, uri)
+    assert second._dataset.uri == first._dataset.uri
+    assert second.search("entity_0") == first.search("entity_0")
+
+
+def test_ann_index_is_rebuilt_for_new_embs(embs, lance, tmp_path):
+    uri = str(tmp_path / "index")
+    first = _create_ann_index(embs, uri)
+    new_embs = embs.with_columns(pl.col("entity").str.replace("entity", "product"))
+    second = _create_ann_index(new_embs, uri)
+    assert second._dataset.uri != first._dataset.uri
+    assert second.search("product_0")
+    # Indexes of previous embeddings are removed
+    assert glob.glob(f"{uri}-*") == [second._dataset.uri]
+
+
+def test_unknown_entity(embs):
+    index = get_similarity_index("test_unknown_entity", lambda: embs)
+    with pytest.raises(HTTPException) as exc_info:
+        index.search("missing")
+    assert exc_info.value.status_code == 404
+
+
+def test_similarity_cache_is_dedicated(embs):
+    index = get_similarity_index("test_dedicated", lambda: embs)
+    assert index in vectors.SIMILARITY_CACHE.values()
+    assert index not in CACHE.values()
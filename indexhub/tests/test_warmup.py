@@ -0,0 +1,44 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from indexhub.api.routers import warmup
+
+
+@pytest.fixture
+def warmed(monkeypatch):
+    warmed = []
+
+    async def warm_objective(objective_id):
+        await asyncio.sleep(0)
+        warmed.append(objective_id)
+
+    monkeypatch.setattr(warmup, "warm_objective", warm_objective)
+    return warmed
+
+
+def _change(status, op="update"):
+    objective = SimpleNamespace(id=1, status=status) if op != "delete" else None
+
+    async def change():
+        warmup._on_objective_change({"op": op}, objective)
+        # Scheduled warming is referenced until done
+        tasks = set(warmup._WARMING)
+        await asyncio.gather(*tasks)
+        assert not warmup._WARMING
+        return len(tasks)
+
+    return asyncio.run(change())
+
+
+def test_warms_on_run_completion(warmed):
+    assert _change("SUCCESS") == 1
+    assert warmed == ["1"]
+
+
+def test_skips_other_changes(warmed):
+    assert _change("RUNNING") == 0
+    assert _change("FAILED") == 0
+    assert _change(None, op="delete") == 0
+    assert warmed == []